@@ -0,0 +1,221 @@
+import re
+
+from enum import Enum
+from typing import NamedTuple
+from functools import lru_cache
+from collections import Counter
+
+# Running totals of the work done scanning .asm files, read by --profile.
+SCAN_COUNTS = Counter()
+
+class CountedPattern:
+    """A compiled regex that adds each evaluation to SCAN_COUNTS."""
+    __slots__ = ("pattern",)
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = re.compile(pattern, flags)
+
+    def match(self, string: str, pos: int = 0):
+        SCAN_COUNTS["regex_evaluations"] += 1
+        return self.pattern.match(string, pos)
+
+class TokenType(Enum):
+    LABEL = "Label"
+    DATA = "Data"
+    TMHM = "Tmhm"
+    EVO_DATA = "EvoData"
+    ABILITIES_FOR = "AbilitiesFor"
+    UNIQUE_MOVES = "UniqueMoves"
+    CONDITIONAL = "Conditional"
+    INCLUDE = "Include"
+    OTHER = "Other"
+
+class Token(NamedTuple):
+    """One meaningful line of an .asm file."""
+    type: TokenType
+    name: str               # Label name, or the lowercase directive/macro name.
+    operands: tuple         # Comma separated operands with surrounding spaces removed. Empty for OTHER directives.
+    comment: str            # Trailing comment without the leading semicolon.
+    line: int               # 1-based line number in the file.
+
+# Every directive the parsers care about. Anything else is passed through as OTHER.
+DIRECTIVE_TYPES = {
+    "db": TokenType.DATA,
+    "dn": TokenType.DATA,
+    "dp": TokenType.DATA,
+    "dw": TokenType.DATA,
+    "tmhm": TokenType.TMHM,
+    "evo_data": TokenType.EVO_DATA,
+    "abilities_for": TokenType.ABILITIES_FOR,
+    "unique_moves": TokenType.UNIQUE_MOVES,
+    "if": TokenType.CONDITIONAL,
+    "elif": TokenType.CONDITIONAL,
+    "else": TokenType.CONDITIONAL,
+    "endc": TokenType.CONDITIONAL,
+    "include": TokenType.INCLUDE,
+}
+
+# Directives whose operands are lists the parsers read. Other directives, like table_width or ev_yield, keep no operands.
+SPLIT_OPERAND_DIRECTIVES = frozenset(directive for directive, token_type in DIRECTIVE_TYPES.items() if token_type is not TokenType.CONDITIONAL)
+
+def split_operands(operands: str):
+    """Splits a directive's operand text on commas."""
+    if not operands:
+        return ()
+    return tuple(map(str.strip, operands.split(",")))
+
+# Lines like "db 1, TACKLE", "endc", or "db 0 ; no more level-up moves" repeat all over the data, so each distinct
+# line is only split up once.
+@lru_cache(maxsize=4096)
+def lex_line(line: str):
+    """Splits one line into a token's type, name, operands, and comment, or None for a blank or comment only line."""
+    # Semicolons inside quoted INCLUDE paths aren't a thing in the polishedcrystal data, so the comment split stays simple.
+    code, _, comment = line.partition(";")
+    code = code.strip()
+    if not code:
+        return None
+    if comment:
+        comment = comment.strip()
+
+    if code[-1] == ":":
+        return TokenType.LABEL, code.rstrip(":"), (), comment
+
+    directive, _, operands = code.partition(" ")
+    if "\t" in directive:
+        directive, _, operands = code.partition("\t")
+    directive = directive.lower()
+    if directive in SPLIT_OPERAND_DIRECTIVES:
+        return DIRECTIVE_TYPES[directive], directive, split_operands(operands), comment
+
+    token_type = DIRECTIVE_TYPES.get(directive, TokenType.OTHER)
+    # Conditions are kept whole since they aren't comma separated lists.
+    operands = operands.strip()
+    return token_type, directive, (operands,) if operands and token_type is TokenType.CONDITIONAL else (), comment
+
+def tokenize(contents: str):
+    """Turns the contents of an .asm file into tokens in a single scan. Blank and comment only lines are skipped.
+
+    Tokens are yielded as they're found, so a parser that stops early doesn't tokenize the rest of the file.
+    """
+    lines = contents.splitlines()
+    SCAN_COUNTS["lines_scanned"] += len(lines)
+    line_number = 0
+    for line in lines:
+        line_number += 1
+        fields = lex_line(line)
+        if fields is not None:
+            # Token's own constructor is a Python function, so the tuple is built directly. This runs for every line.
+            yield tuple.__new__(Token, (*fields, line_number))
+
+# Symbols defined when building each ROM. Faithful builds pass -DFAITHFUL to rgbasm, Polished builds define nothing.
+FAITHFUL_SYMBOLS = frozenset({"FAITHFUL"})
+POLISHED_SYMBOLS = frozenset()
+
+CONDITION_TOKEN_PATTERN = CountedPattern(r"\s*(?:DEF\s*\(\s*(?P<symbol>\w+)\s*\)|(?P<number>\d+)|(?P<operator>&&|\|\||!|\(|\)))")
+
+class ConditionError(ValueError):
+    """A conditional assembly directive that can't be evaluated, like an unsupported condition or an endc without an if."""
+
+def tokenize_condition(condition: str):
+    """Splits an if/elif condition into DEF() checks, numbers, and operators."""
+    parts = []
+    position = 0
+    condition = condition.rstrip()
+    while position < len(condition):
+        match = CONDITION_TOKEN_PATTERN.match(condition, position)
+        if not match:
+            raise ConditionError(f"""Can't evaluate condition: {condition}""")
+        parts.append(match.group("symbol", "number", "operator"))
+        position = match.end()
+    return parts
+
+# The same few conditions are repeated in every base stat file and label block, so each is only evaluated once per ROM.
+@lru_cache(maxsize=256)
+def evaluate_condition(condition: str, symbols: frozenset):
+    """Evaluates an if/elif condition made of DEF(), !, &&, ||, parentheses, and numbers against the defined symbols."""
+    parts = tokenize_condition(condition)
+    position = 0
+
+    def peek():
+        return parts[position][2] if position < len(parts) else None
+
+    def parse_or():
+        nonlocal position
+        value = parse_and()
+        while peek() == "||":
+            position += 1
+            value = parse_and() or value
+        return value
+
+    def parse_and():
+        nonlocal position
+        value = parse_unary()
+        while peek() == "&&":
+            position += 1
+            value = parse_unary() and value
+        return value
+
+    def parse_unary():
+        nonlocal position
+        if position >= len(parts):
+            raise ConditionError(f"""Can't evaluate condition: {condition}""")
+        symbol, number, operator = parts[position]
+        position += 1
+        if operator == "!":
+            return not parse_unary()
+        elif operator == "(":
+            value = parse_or()
+            if peek() != ")":
+                raise ConditionError(f"""Can't evaluate condition: {condition}""")
+            position += 1
+            return value
+        elif symbol:
+            return symbol in symbols
+        elif number:
+            return int(number) != 0
+        raise ConditionError(f"""Can't evaluate condition: {condition}""")
+
+    value = parse_or()
+    if position != len(parts):
+        raise ConditionError(f"""Can't evaluate condition: {condition}""")
+    return value
+
+def preprocess(tokens: list):
+    """Evaluates conditional assembly for the Faithful and Polished builds in one scan.
+
+    Yields (token, in_faithful, in_polished) for every token that is assembled in at least one of the builds.
+    Conditional directives themselves are consumed.
+    """
+    # Each entry is (parent active, branch already taken) for both builds.
+    stack = []
+    active = in_faithful, in_polished = (True, True)
+    # Looking up an Enum member costs more than the rest of the check, and this runs for every token.
+    conditional = TokenType.CONDITIONAL
+    for token in tokens:
+        if token.type is not conditional:
+            if in_faithful or in_polished:
+                yield token, in_faithful, in_polished
+            continue
+
+        if token.name == "if":
+            values = tuple(evaluate_condition(token.operands[0] if token.operands else "", symbols) for symbols in (FAITHFUL_SYMBOLS, POLISHED_SYMBOLS))
+            stack.append((active, values))
+            active = tuple(parent and value for parent, value in zip(active, values))
+        elif not stack:
+            raise ConditionError(f"""Line {token.line}: {token.name} without a matching if""")
+        else:
+            parent_active, taken = stack[-1]
+            if token.name == "elif":
+                values = tuple(evaluate_condition(token.operands[0] if token.operands else "", symbols) for symbols in (FAITHFUL_SYMBOLS, POLISHED_SYMBOLS))
+                active = tuple(parent and not done and value for parent, done, value in zip(parent_active, taken, values))
+                stack[-1] = (parent_active, tuple(done or value for done, value in zip(taken, values)))
+            elif token.name == "else":
+                active = tuple(parent and not done for parent, done in zip(parent_active, taken))
+                stack[-1] = (parent_active, (True, True))
+            else:
+                active = parent_active
+                stack.pop()
+        in_faithful, in_polished = active
+
+    if stack:
+        raise ConditionError("if without a matching endc")
@@ -0,0 +1,21 @@
+import os
+
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(filename: str):
+    """Gives a temporary file name next to filename to write to, and moves it over filename once writing succeeds.
+
+    Readers never see a half written file, and a run that's interrupted or fails leaves the old file alone.
+    """
+    temp_file = f"""{filename}.{os.getpid()}.tmp"""
+    # A leftover from a crashed run with the same process id would otherwise be appended to, like an SQLite database.
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+    try:
+        yield temp_file
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    os.replace(temp_file, filename)
@@ -0,0 +1,282 @@
+import os
+import json
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+
+from datetime import datetime, timezone
+
+import generate_wiki_pages as wiki
+
+# About as many base stat files as a polishedcrystal checkout has, forms included.
+REAL_POKEMON_COUNT = 300
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_RESULTS_FILE = "benchmark_results.json"
+
+TYPES = ["NORMAL", "FIRE", "WATER", "GRASS", "ELECTRIC", "ICE", "FIGHTING", "POISON", "GROUND", "FLYING", "PSYCHIC", "BUG", "ROCK", "GHOST", "DRAGON", "DARK", "STEEL", "FAIRY"]
+ABILITIES = ["OVERGROW", "BLAZE", "TORRENT", "RUN_AWAY", "ADAPTABILITY", "ANTICIPATION", "GLUTTONY", "HUSTLE", "THICK_FAT", "INTIMIDATE", "LEVITATE", "STATIC", "KEEN_EYE", "INNER_FOCUS", "SWIFT_SWIM", "CHLOROPHYLL"]
+ITEMS = ["NO_ITEM", "ORAN_BERRY", "PECHA_BERRY", "SITRUS_BERRY", "LEFTOVERS", "SOFT_SAND", "MIRACLE_SEED", "MYSTIC_WATER", "CHARCOAL", "STICK"]
+EGG_GROUPS = ["EGG_MONSTER", "EGG_WATER_1", "EGG_BUG", "EGG_FLYING", "EGG_GROUND", "EGG_FAIRY", "EGG_PLANT", "EGG_HUMANSHAPE", "EGG_MINERAL", "EGG_DRAGON"]
+LEVEL_UP_MOVES = ["TACKLE", "GROWL", "SCRATCH", "LEER", "EMBER", "WATER_GUN", "VINE_WHIP", "RAZOR_LEAF", "QUICK_ATTACK", "BITE", "GUST", "WING_ATTACK", "THUNDERSHOCK", "CONFUSION", "PSYBEAM", "SLASH", "HYPER_FANG", "SUCKER_PUNCH", "ICE_SHARD", "SLACK_OFF", "MAGICAL_LEAF", "DOUBLE_KICK", "LEAF_BLADE", "SCARY_FACE"]
+EGG_MOVES = ["CURSE", "WISH", "COUNTER", "PURSUIT", "STEEL_WING", "VINE_WHIP", "LEECH_SEED", "MACH_PUNCH", "FUTURE_SIGHT", "FINAL_GAMBIT", "HEAL_BELL", "BATON_PASS"]
+TEACHABLE_MOVES = [
+    ("DYNAMICPUNCH", "TM01"), ("CURSE", "TM03"), ("TOXIC", "TM06"), ("WILL_O_WISP", "TM11"), ("PSYCHIC_M", "TM29"),
+    ("DOUBLE_EDGE", "TM30"), ("X_SCISSOR", "TM49"), ("U_TURN", "TM50"), ("CUT", "HM01"), ("FLY", "HM02"), ("SURF", "HM03"),
+    ("MUD_SLAP", "MT01"), ("AQUA_TAIL", "MT02"), ("ZEN_HEADBUTT", "MT03"),
+]
+LOCATIONS = ["ROUTE_29", "ROUTE_30", "ILEX_FOREST", "YELLOW_FOREST", "NATIONAL_PARK", "LAKE_OF_RAGE"]
+
+def species_constant(index: int):
+    """Makes up the dex constant for the synthetic species at index."""
+    return f"""SYNMON{index:05d}"""
+
+def generate_species(pokemon_count: int, rng: random.Random):
+    """Picks species, their forms, and evolution chains until there are enough base stat files."""
+    species = []
+    file_count = 0
+    while file_count < pokemon_count:
+        index = len(species)
+        # Every tenth species has a regional form like Rattata, and chains are three species long like the starters.
+        forms = ["plain", "alolan"] if index % 10 == 9 and pokemon_count - file_count > 1 else []
+        species.append({
+            "constant": species_constant(index),
+            "forms": forms,
+            "evolves_to": species_constant(index + 1) if index % 3 != 2 else None,
+            "chain_start": index % 3 == 0,
+        })
+        file_count += len(forms) or 1
+    # The last species can't evolve into one that doesn't exist.
+    species[-1]["evolves_to"] = None
+    return species
+
+def base_stats_contents(constant: str, rng: random.Random):
+    """Writes one base stat file. Some Pokemon have different types or abilities in Faithful, like the real data."""
+    stats = [rng.randint(20, 150) for _ in range(6)]
+    first_type, second_type = rng.choice(TYPES), rng.choice(TYPES)
+    abilities = ", ".join(rng.sample(ABILITIES, 3))
+    if rng.random() < 0.2:
+        type_line = f"""if DEF(FAITHFUL)
+	db {first_type}, {first_type} ; type
+else
+	db {first_type}, {second_type} ; type
+endc"""
+    else:
+        type_line = f"""	db {first_type}, {second_type} ; type"""
+    if rng.random() < 0.2:
+        abilities_line = f"""if DEF(FAITHFUL)
+	abilities_for {constant}, {", ".join(rng.sample(ABILITIES, 3))}
+else
+	abilities_for {constant}, {abilities}
+endc"""
+    else:
+        abilities_line = f"""	abilities_for {constant}, {abilities}"""
+    teachable = ", ".join(move for move, _ in rng.sample(TEACHABLE_MOVES, rng.randint(2, 8)))
+
+    return f"""	db {", ".join(f"{stat:3d}" for stat in stats)} ; {sum(stats)} BST
+	;   hp  atk  def  spe  sat  sdf
+
+{type_line}
+	db 45 ; catch rate
+	db 64 ; base exp
+	db {rng.choice(ITEMS)}, {rng.choice(ITEMS)} ; held items
+	dn GENDER_F50, HATCH_MEDIUM_FAST ; gender ratio, step cycles to hatch
+
+{abilities_line}
+	db MEDIUM_SLOW ; growth rate
+	dn {rng.choice(EGG_GROUPS)}, {rng.choice(EGG_GROUPS)} ; egg groups
+
+	ev_yield 0, 0, 0, 0, 1, 0
+
+	; tm/hm learnset
+	tmhm {teachable}
+	; end
+"""
+
+def evos_attacks_block(label: str, evolves_to: str, rng: random.Random):
+    """Writes one Pokemon's evolutions and level up moves."""
+    lines = [f"""{label}EvosAttacks:"""]
+    if evolves_to:
+        lines.append(f"""	evo_data EVOLVE_LEVEL, {rng.randint(10, 40)}, {evolves_to}""")
+    lines.append("	db -1 ; no more evolutions")
+    level = 1
+    for move in rng.sample(LEVEL_UP_MOVES, rng.randint(4, 12)):
+        # A few moves are only learned in Polished.
+        if rng.random() < 0.1:
+            lines += ["if !DEF(FAITHFUL)", f"""	db {level}, {move}""", "endc"]
+        else:
+            lines.append(f"""	db {level}, {move}""")
+        level += rng.randint(0, 6)
+    lines += ["	db 0 ; no more level-up moves", ""]
+    return lines
+
+def generate_synthetic_data(root: str, pokemon_count: int, seed: int = 0):
+    """Writes a polishedcrystal/data tree with pokemon_count base stat files under root. Returns the files and bytes written."""
+    rng = random.Random(seed)
+    data_dir = os.path.join(root, "polishedcrystal", "data")
+    base_stats_dir = os.path.join(data_dir, "pokemon", "base_stats")
+    os.makedirs(base_stats_dir)
+    os.makedirs(os.path.join(data_dir, "moves"))
+
+    species = generate_species(pokemon_count, rng)
+    dex_order = ["NewPokedexOrder:", "	table_width 2"]
+    base_stats = ["BaseData::", "	indirect_table BASE_DATA_SIZE, 1", "	indirect_entries NUM_SPECIES, BaseData1", "", "BaseData1:"]
+    evos_attacks = ["EvosAttacks::", "	indirect_table 2, 1", "	indirect_entries NUM_SPECIES, EvosAttacks1", ""]
+    egg_moves = ["EggMovePointers::", ""]
+    evolution_moves = ["EvolutionMoves::", "	table_width 1"]
+    unique_wild_moves = ["UniqueWildMoves:"]
+    files_written = 0
+    bytes_written = 0
+
+    for pokemon in species:
+        constant = pokemon["constant"]
+        dex_order.append(f"""	dp {constant}""")
+        evolution_moves.append(f"""	db {rng.choice(LEVEL_UP_MOVES) if rng.random() < 0.2 else "NO_MOVE":<12} ; {constant}""")
+
+        for form in pokemon["forms"] or [None]:
+            file_name = f"""{constant.lower()}_{form}""" if form else constant.lower()
+            label = file_name.title().replace("_", "")
+            contents = base_stats_contents(constant, rng)
+            with open(os.path.join(base_stats_dir, f"""{file_name}.asm"""), 'w') as file:
+                file.write(contents)
+            files_written += 1
+            bytes_written += len(contents)
+            base_stats.append(f"""INCLUDE "data/pokemon/base_stats/{file_name}.asm\"""")
+
+            evos_attacks += evos_attacks_block(label, pokemon["evolves_to"], rng)
+            if pokemon["chain_start"]:
+                egg_moves += [f"""{label}EggMoves:"""] + [f"""	db {move}""" for move in rng.sample(EGG_MOVES, rng.randint(1, 4))] + ["	db $ff", ""]
+            if rng.random() < 0.05:
+                form_operand = f"""{form.upper()}_FORM, """ if form else ""
+                unique_wild_moves.append(f"""	unique_moves {rng.choice(LOCATIONS)}, {constant}, {form_operand}{rng.choice(LEVEL_UP_MOVES)}""")
+
+    dex_order.append("	assert_table_length NUM_POKEMON")
+    base_stats.append(".IndirectEnd:")
+    evos_attacks += ["EggEvosAttacks:", "	db -1 ; no more evolutions", "	db 0 ; no more level-up moves"]
+    egg_moves += ["NoEggMoves:", "	db $ff"]
+    unique_wild_moves.append("	db -1 ; end")
+    tmhm_moves = ["TechnicalMachines:", "	table_width 1"] + [f"""	db {move:<12} ; {number}""" for move, number in TEACHABLE_MOVES] + ["	db 0 ; end"]
+
+    for path, lines in (
+        (os.path.join("moves", "tmhm_moves.asm"), tmhm_moves),
+        (os.path.join("pokemon", "dex_order_new.asm"), dex_order),
+        (os.path.join("pokemon", "base_stats.asm"), base_stats),
+        (os.path.join("pokemon", "evos_attacks.asm"), evos_attacks),
+        (os.path.join("pokemon", "egg_moves.asm"), egg_moves),
+        (os.path.join("pokemon", "evolution_moves.asm"), evolution_moves),
+        (os.path.join("pokemon", "unique_wild_moves.asm"), unique_wild_moves),
+    ):
+        contents = "\n".join(lines) + "\n"
+        with open(os.path.join(data_dir, path), 'w') as file:
+            file.write(contents)
+        files_written += 1
+        bytes_written += len(contents)
+
+    return files_written, bytes_written
+
+def run_stages(cache_dir: str):
+    """Generates every page from the current folder. Returns the seconds each stage took and the CPU seconds of each parser."""
+    # The generator times its own stages for --profile, so the benchmark reads the same totals.
+    wiki.PROFILER.stages.clear()
+    wiki.PARSE_COUNTS.clear()
+
+    sources = wiki.WikiSources(wiki.DEFAULT_SOURCE_DIR, None)
+    sources.load()
+    pokemon_data_list = wiki.collate_pokemon(sources)
+    page_writer = wiki.PageWriter(".", wiki.manifest_file_for_output(cache_dir, "."))
+    wiki.render_pages(pokemon_data_list, sources["teachable_moves"], page_writer)
+    page_writer.finish()
+
+    stages = {name: totals["wall_seconds"] for name, totals in wiki.PROFILER.stages.items()}
+    parsers = {parser_name: counts["cpu_seconds"] for parser_name, counts in wiki.PARSE_COUNTS.items()}
+    return stages, parsers
+
+def benchmark_scale(scale: int, repeat: int, seed: int, keep: bool):
+    """Generates the data for one scale and times the stages, keeping the fastest of each over the repeats."""
+    pokemon_count = REAL_POKEMON_COUNT * scale
+    root = tempfile.mkdtemp(prefix=f"""wiki-benchmark-{scale}x-""")
+    cwd = os.getcwd()
+    try:
+        files_written, bytes_written = generate_synthetic_data(root, pokemon_count, seed)
+        best = {}
+        best_parsers = {}
+        for _ in range(repeat):
+            # Start each repeat from an empty wiki folder so every page really gets written.
+            wiki_dir = os.path.join(root, "wiki")
+            cache_dir = os.path.join(root, "cache")
+            shutil.rmtree(wiki_dir, ignore_errors=True)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.makedirs(wiki_dir)
+            os.chdir(wiki_dir)
+            timings, parser_timings = run_stages(cache_dir)
+            os.chdir(cwd)
+            for name, seconds in timings.items():
+                best[name] = min(best.get(name, seconds), seconds)
+            for name, seconds in parser_timings.items():
+                best_parsers[name] = min(best_parsers.get(name, seconds), seconds)
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f"""Kept the {scale}x data in {root}""")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "scale": scale,
+        "pokemon": pokemon_count,
+        "source_files": files_written,
+        "source_bytes": bytes_written,
+        "stages": best,
+        # CPU time inside each parser, already counted in the parse stage.
+        "parsers": best_parsers,
+        "total": sum(best.values()),
+    }
+
+def print_results(results: list):
+    """Prints the stage timings with a column per scale."""
+    stage_names = list(results[0]["stages"])
+    name_width = max(len(name) for name in stage_names + ["total"])
+    print(f"""{"stage":<{name_width}}""" + "".join(f"""{f"{result['scale']}x ({result['pokemon']})":>18}""" for result in results))
+    for name in stage_names:
+        print(f"""{name:<{name_width}}""" + "".join(f"""{result["stages"][name] * 1000:>15.1f} ms""" for result in results))
+    print(f"""{"total":<{name_width}}""" + "".join(f"""{result["total"] * 1000:>15.1f} ms""" for result in results))
+
+    parser_names = list(results[0]["parsers"])
+    name_width = max(len(name) for name in parser_names + ["parser CPU"])
+    print(f"""\n{"parser CPU":<{name_width}}""" + "".join(f"""{f"{result['scale']}x ({result['pokemon']})":>18}""" for result in results))
+    for name in parser_names:
+        print(f"""{name:<{name_width}}""" + "".join(f"""{result["parsers"][name] * 1000:>15.1f} ms""" for result in results))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times each stage of generate_wiki_pages.py on synthetic polishedcrystal data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help=f"""Multiples of the real Pokemon count ({REAL_POKEMON_COUNT}) to run (default: {" ".join(map(str, DEFAULT_SCALES))}).""")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scale. The fastest time of each stage is kept (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data so runs can be compared (default: 0).")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_FILE, help=f"""JSON file to write the results to (default: {DEFAULT_RESULTS_FILE}).""")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated data folders instead of deleting them.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        print(f"""Benchmarking {scale}x ({REAL_POKEMON_COUNT * scale} Pokemon)...""")
+        results.append(benchmark_scale(scale, args.repeat, args.seed, args.keep))
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser_version": wiki.PARSER_VERSION,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    print_results(results)
+    print(f"""Results written to {args.output}""")
+
+
+if __name__ == "__main__":
+    main()
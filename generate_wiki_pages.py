@@ -1,41 +1,747 @@
 import re
 import os
 import sys
-
+import pickle
+import sqlite3
+import hashlib
+import posixpath
+import argparse
+import io
+import json
+import mmap
+import time
+import logging
+import subprocess
+import threading
+import queue
+import zipfile
+import tarfile
+import tracemalloc
+
+from abc import ABC, abstractmethod
 from enum import Enum
+from array import array
+from collections import Counter, defaultdict, deque
+from collections.abc import Mapping
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, partial, wraps
+from concurrent.futures import ProcessPoolExecutor
+
+import pokemon_db
+import pokemon_snapshot
+
+from atomic_file import atomic_write
+from asm_lexer import SCAN_COUNTS, ConditionError, CountedPattern, TokenType, preprocess, tokenize
+
+# Bump whenever a parser's output changes so stale parse cache entries are ignored.
+PARSER_VERSION = 3
+
+# Kept outside the wiki folder so the cache never ends up committed to the wiki.
+DEFAULT_PARSE_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "polished-crystal-wiki")
+
+# Special case move and Pokemon names. New forms can be added here without touching the script.
+NAMES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokemon_names.json")
 
 class Mode(Enum):
     POLISHED = "Polished"
     FAITHFUL = "Faithful"
     NONE = "None"
 
+TEACHABLE_MOVE_PATTERN = CountedPattern(r"(TM\d+|HM\d+|MT\d+)", re.IGNORECASE)
+BASE_STAT_TOTAL_PATTERN = CountedPattern(r"\d{1,3} BST")
+LEVEL_UP_MOVE_PATTERN = CountedPattern(r"[A-Z_]+")
+
+# Per Pokemon progress is only shown with --verbose.
+logger = logging.getLogger("generate_wiki_pages")
+
+class SymbolTable:
+    """Interns names like moves, abilities, and types as small integer ids so learnsets can be stored as compact arrays."""
+
+    def __init__(self):
+        self.ids = {}
+        self.symbols = []
+
+    def intern(self, name: str):
+        """Gets the id for a name, adding the name if it's new."""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.symbols)
+            self.symbols.append(name)
+        return symbol_id
+
+    def intern_all(self, names: list):
+        """Gets an array of ids for a list of names."""
+        return array("H", [self.intern(name) for name in names])
+
+    def names(self, symbol_ids):
+        """Gets the names for an array of ids."""
+        return [self.symbols[symbol_id] for symbol_id in symbol_ids]
+
+MOVES = SymbolTable()
+ABILITIES = SymbolTable()
+TYPES = SymbolTable()
+
+def symbol_array():
+    """Gets an empty array of symbol ids."""
+    return array("H")
+
+@dataclass(slots=True)
+class PokemonRecord:
+    """Everything the wiki pages show about one Pokemon. Moves, abilities, and types are ids in MOVES, ABILITIES, and TYPES."""
+    name: str = ""
+    slug: str = ""
+    egg_moves_name: str = ""
+    evo_attacks_name: str = ""
+    type_faithful: array = field(default_factory=symbol_array)
+    type_polished: array = field(default_factory=symbol_array)
+    abilities_faithful: array = field(default_factory=symbol_array)
+    abilities_polished: array = field(default_factory=symbol_array)
+    stats_faithful: dict = field(default_factory=dict)
+    stats_polished: dict = field(default_factory=dict)
+    held_items: list = field(default_factory=list)
+    egg_groups: list = field(default_factory=list)
+    evo_data_faithful: list = field(default_factory=list)
+    evo_data_polished: list = field(default_factory=list)
+    unique_wild_moves: list = field(default_factory=list)
+    evolution_move: str = ""
+    # Level up moves are two parallel arrays. Faithful or Polished only moves are interned with their "(Faithful)" tag.
+    level_up_levels: array = field(default_factory=lambda: array("B"))
+    level_up_moves: array = field(default_factory=symbol_array)
+    egg_moves: array = field(default_factory=symbol_array)
+    tm_hm_moves: array = field(default_factory=symbol_array)
+
+    def set_base_stats(self, base_stats: dict):
+        """Fills in the data parsed from the Pokemon's base stat file."""
+        self.type_faithful = TYPES.intern_all(base_stats.get("type_faithful", []))
+        self.type_polished = TYPES.intern_all(base_stats.get("type_polished", []))
+        self.abilities_faithful = ABILITIES.intern_all(base_stats.get("abilities_faithful", []))
+        self.abilities_polished = ABILITIES.intern_all(base_stats.get("abilities_polished", []))
+        self.stats_faithful = base_stats.get("stats_faithful", {})
+        self.stats_polished = base_stats.get("stats_polished", {})
+        self.held_items = base_stats.get("held_items", [])
+        self.egg_groups = base_stats.get("egg_groups", [])
+        self.tm_hm_moves = MOVES.intern_all(base_stats.get("tm_hm_moves", []))
+
+    def set_evos_attacks(self, evos_attacks: dict):
+        """Fills in the evolutions and level up moves parsed from evos_attacks.asm."""
+        self.evo_data_faithful = evos_attacks["evo_data_faithful"]
+        self.evo_data_polished = evos_attacks["evo_data_polished"]
+        self.level_up_levels = array("B", [int(level) for level, _ in evos_attacks["moves"]])
+        self.level_up_moves = MOVES.intern_all([move for _, move in evos_attacks["moves"]])
+
+@dataclass(slots=True)
+class PokemonStub:
+    """What --stream keeps about every Pokemon for the whole run: its names and evolutions. Same fields as PokemonRecord."""
+    name: str
+    slug: str
+    egg_moves_name: str
+    evo_attacks_name: str
+    evo_data_faithful: list = field(default_factory=list)
+    evo_data_polished: list = field(default_factory=list)
+
+def build_mode(in_faithful: bool, in_polished: bool):
+    """Gets which ROM a line belongs to, or Mode.NONE if it's assembled in both."""
+    if in_faithful and in_polished:
+        return Mode.NONE
+    return Mode.FAITHFUL if in_faithful else Mode.POLISHED
+
+
+class Profiler:
+    """Adds up the wall and CPU time spent in each stage of a run, and counts pages rendered and written, for --profile."""
+
+    def __init__(self):
+        self.stages = {}
+        self.counts = Counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a block of code. Entering the same stage again adds to its totals."""
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            totals["wall_seconds"] += time.perf_counter() - wall_start
+            totals["cpu_seconds"] += time.process_time() - cpu_start
+            totals["calls"] += 1
+
+    def merge(self, stages: dict):
+        """Adds the stage totals a worker process sent back to this process's."""
+        for name, worker_totals in stages.items():
+            totals = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            for key, value in worker_totals.items():
+                totals[key] += value
+
+    def timed(self, name: str):
+        """Decorates a function so every call is timed as a stage."""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+PROFILER = Profiler()
+
+# What each parser read and scanned, keyed by parser name. Worker processes send theirs back with each result.
+PARSE_COUNTS = defaultdict(Counter)
+
+def read_asm_file(filename: str):
+    """Reads the raw contents of an .asm file."""
+    try:
+        with open(filename, 'rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        print(f"""{filename} not found! Quitting.""")
+        sys.exit(1)
 
-def parse_teachable_moves_by_category(filename):
-    """Parses TMs, HMs, and move tutor moves with their move category."""
-    # TODO If a TM or HM move doubles as a move tutor move, this would need changed.
+def map_asm_file(filename: str):
+    """Memory maps an .asm file so blocks of it can be read without loading the whole file."""
     try:
-        teachable_moves = {}
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-                # Stop at end of file.
-                if line.startswith("db 0 ; end"):
-                    break
-                # Check for TM.
-                elif line.startswith("db"):
-                    # db DYNAMICPUNCH ; TM01 (Chuck)
-                    pattern = re.compile(r"db\s+([A-Z_]+)\s*;\s*(TM\d+|HM\d+|MT\d+)", re.IGNORECASE)
-                    match = pattern.search(line)
-
-                    move_name = format_move_name(match.group(1))
-                    move_category = format_move_category(match.group(2))
-                    teachable_moves[move_name] =  move_category
-
-        return teachable_moves
+        with open(filename, 'rb') as file:
+            # Empty files can't be mapped.
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
     except FileNotFoundError:
         print(f"""{filename} not found! Quitting.""")
         sys.exit(1)
 
+class DirectorySource:
+    """Reads the polishedcrystal files from a checkout on disk."""
+    # Parse workers can open files on disk themselves.
+    on_disk = True
+
+    def index(self, directory: str):
+        """Maps lowercase .asm file names under a folder to their paths."""
+        return build_asm_file_index(directory)
+
+    def read(self, filename: str):
+        return read_asm_file(filename)
+
+    def map(self, filename: str):
+        return map_asm_file(filename)
+
+    def blob_id(self, filename: str):
+        """Files on disk have no hash until they're read."""
+        return None
+
+    def cache_owner(self, filename: str):
+        """Names this copy of a file for the caches that keep what each file needs."""
+        return os.path.abspath(filename)
+
+    def recall(self, parser, filename: str):
+        """Files on disk can change between loads, so nothing is remembered beyond the parse cache."""
+        return None
+
+    def remember(self, parser, filename: str, parsed):
+        pass
+
+DISK_SOURCE = DirectorySource()
+
+def index_asm_paths(paths, directory: str):
+    """Maps lowercase file names under a folder to their paths, for sources that already list every file."""
+    directory = os.path.normpath(directory)
+    asm_file_index = {}
+    for path in paths:
+        if path.startswith(directory + os.sep):
+            asm_file_index.setdefault(os.path.basename(path).lower(), []).append(path)
+    return asm_file_index
+
+def archive_root(names: list):
+    """Finds the folder holding data/ in an archive, since release archives put everything under one top folder."""
+    roots = ["/".join(parts[:idx]) for parts in (posixpath.normpath(name).split("/") for name in names) for idx, part in enumerate(parts[:-1]) if part == "data"]
+    return min(roots, key=len) if roots else None
+
+class ArchiveSource:
+    """Reads the polishedcrystal files from a .zip or .tar.gz release archive without extracting it.
+
+    Paths look like the archive is the checkout folder. Ex - polishedcrystal.zip/data/pokemon/base_stats.asm. Zip
+    members are read on demand. A .tar.gz can't be read out of order without decompressing it again, so its data files
+    are read during the one pass that lists them.
+    """
+    # Members come from this process's open archive, so parse workers can't read them.
+    on_disk = False
+
+    def __init__(self, archive_file: str):
+        self.archive_file = archive_file
+        self.zip_file = None
+        self.contents = {}
+        try:
+            if archive_file.endswith(".zip"):
+                self.zip_file = zipfile.ZipFile(archive_file)
+                names = [info.filename for info in self.zip_file.infolist() if not info.is_dir()]
+            else:
+                with tarfile.open(archive_file, 'r|gz') as archive:
+                    for member in archive:
+                        if member.isfile() and "data" in posixpath.normpath(member.name).split("/")[:-1]:
+                            self.contents[member.name] = archive.extractfile(member).read()
+                names = list(self.contents)
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as error:
+            print(f"""Couldn't read {archive_file}: {error}! Quitting.""")
+            sys.exit(1)
+
+        root = archive_root(names)
+        if root is None:
+            print(f"""{archive_file} has no data folder! Quitting.""")
+            sys.exit(1)
+        # Paths inside the archive by the path they'd have in a checkout at the archive's path.
+        self.members = {}
+        for name in names:
+            relative_name = posixpath.relpath(posixpath.normpath(name), root or ".")
+            if not relative_name.startswith(".."):
+                self.members[os.path.normpath(os.path.join(archive_file, *relative_name.split("/")))] = name
+
+    def index(self, directory: str):
+        """Maps lowercase .asm file names under a folder to their paths."""
+        return index_asm_paths(self.members, directory)
+
+    def read(self, filename: str):
+        if filename not in self.members:
+            print(f"""{filename} not found! Quitting.""")
+            sys.exit(1)
+        if self.zip_file is not None:
+            return self.zip_file.read(self.members[filename])
+        return self.contents[self.members[filename]]
+
+    # Members are read into memory, so there's nothing to map.
+    map = read
+
+    def blob_id(self, filename: str):
+        """Zip CRCs are too weak to key the parse cache on, so members are hashed once they're read."""
+        return None
+
+    def cache_owner(self, filename: str):
+        """Member paths start with the archive's path, so they already tell archives apart."""
+        return os.path.abspath(filename)
+
+    def recall(self, parser, filename: str):
+        return None
+
+    def remember(self, parser, filename: str, parsed):
+        pass
+
+def open_source(source_dir: str):
+    """Gets the source for a checkout folder or a release archive."""
+    if source_dir.endswith(ARCHIVE_TYPES):
+        return ArchiveSource(source_dir)
+    return DISK_SOURCE
+
+class GitRepository:
+    """A local polishedcrystal git repo whose files are read straight from its objects, without checking anything out."""
+
+    def __init__(self, repo_dir: str):
+        self.repo_dir = repo_dir
+        self.cat_file = None
+        # Parsed results by (parser name, blob id), shared by every revision so unchanged files are only parsed once.
+        self.parsed_blobs = {}
+
+    def git(self, *args):
+        """Runs a git command in the repo and returns its output."""
+        try:
+            return subprocess.run(["git", "-C", self.repo_dir, *args], check=True, capture_output=True).stdout
+        except (OSError, subprocess.CalledProcessError) as error:
+            print(f"""git {" ".join(args)} failed in {self.repo_dir}: {getattr(error, "stderr", b"").decode().strip() or error}! Quitting.""")
+            sys.exit(1)
+
+    def resolve(self, revision: str):
+        """Gets the commit id of a tag, branch, or commit."""
+        return self.git("rev-parse", "--verify", f"""{revision}^{{commit}}""").decode().strip()
+
+    def tree(self, commit: str, directory: str):
+        """Maps every file under a folder of a commit to its blob id. Paths are relative to the repo."""
+        blobs = {}
+        for entry in self.git("ls-tree", "-r", "-z", "--full-tree", commit, "--", directory).split(b"\0"):
+            if not entry:
+                continue
+            # <mode> <type> <blob id>\t<path>
+            info, path = entry.split(b"\t", 1)
+            _, object_type, blob_id = info.split()
+            if object_type == b"blob":
+                blobs[path.decode()] = blob_id.decode()
+        return blobs
+
+    def read_blob(self, blob_id: str):
+        """Reads a blob through one long running git cat-file, so reading many small files doesn't start a process each."""
+        if self.cat_file is None:
+            self.cat_file = subprocess.Popen(["git", "-C", self.repo_dir, "cat-file", "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.cat_file.stdin.write(f"""{blob_id}\n""".encode())
+        self.cat_file.stdin.flush()
+        # <blob id> blob <size>, then the contents and a newline.
+        size = int(self.cat_file.stdout.readline().split()[2])
+        contents = self.cat_file.stdout.read(size)
+        self.cat_file.stdout.read(1)
+        return contents
+
+    def close(self):
+        """Stops the git cat-file process."""
+        if self.cat_file is not None:
+            self.cat_file.stdin.close()
+            self.cat_file.wait()
+            self.cat_file = None
+
+class GitSource:
+    """Reads the polishedcrystal files of one revision from a GitRepository.
+
+    Paths look the same as for a checkout of the revision at the repo folder, so the rest of the script can't tell the
+    difference. Blob ids stand in for content hashes, so saved parse results are found without reading the files.
+    """
+    # Blobs come through this process's git cat-file, so parse workers can't read them.
+    on_disk = False
+
+    def __init__(self, repository: GitRepository, revision: str):
+        self.repository = repository
+        self.revision = revision
+        self.commit = repository.resolve(revision)
+        self.blobs = {os.path.normpath(os.path.join(repository.repo_dir, path)): blob_id for path, blob_id in repository.tree(self.commit, "data").items()}
+
+    def index(self, directory: str):
+        """Maps lowercase .asm file names under a folder to their paths."""
+        return index_asm_paths(self.blobs, directory)
+
+    def read(self, filename: str):
+        if filename not in self.blobs:
+            print(f"""{filename} not found in {self.revision}! Quitting.""")
+            sys.exit(1)
+        return self.repository.read_blob(self.blobs[filename])
+
+    # Blobs are already in memory, so there's nothing to map.
+    map = read
+
+    def blob_id(self, filename: str):
+        return self.blobs.get(filename)
+
+    def cache_owner(self, filename: str):
+        """Every revision has its own copy of a file. Ex - /repo/data/pokemon/evos_attacks.asm@v3.0.0."""
+        return f"""{os.path.abspath(filename)}@{self.revision}"""
+
+    def recall(self, parser, filename: str):
+        """Gets the result of parsing the same blob in an earlier revision, or None."""
+        return self.repository.parsed_blobs.get((parser.__name__, self.blob_id(filename)))
+
+    def remember(self, parser, filename: str, parsed):
+        self.repository.parsed_blobs[(parser.__name__, self.blob_id(filename))] = parsed
+
+def read_cache_entry(cache_file: str):
+    """Loads a saved cache entry, or None if it's missing or unreadable."""
+    try:
+        with open(cache_file, 'rb') as file:
+            value = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    # Entries are pruned least recently used first, so a hit counts as a use.
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return value
+
+def write_cache_entry(cache_file: str, value):
+    """Saves a cache entry."""
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    with atomic_write(cache_file) as temp_file, open(temp_file, 'wb') as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+def prune_parse_cache(parse_cache_dir: str, limit: int):
+    """Deletes the least recently used parse cache entries until the rest add up to at most limit bytes."""
+    try:
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in os.scandir(parse_cache_dir) if entry.name.endswith(".pickle") and entry.is_file()]
+    except FileNotFoundError:
+        return
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, cache_file in sorted(entries):
+        if total_size <= limit:
+            break
+        try:
+            os.remove(cache_file)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+def cached_parse(parse_cache_dir: str, parser, filename: str, source=DISK_SOURCE):
+    """Runs a parser on an .asm file, reusing the saved result if the file contents and parser version haven't changed."""
+    counts = PARSE_COUNTS[parser.__name__]
+    # Git already hashed every file, so with a blob id the saved result can be found without reading the file at all.
+    blob_id = source.blob_id(filename)
+    cache_file = None
+    if parse_cache_dir and blob_id:
+        cache_file = os.path.join(parse_cache_dir, f"""{parser.__name__}-v{PARSER_VERSION}-{NAME_TABLES_HASH}-blob-{blob_id}.pickle""")
+        parsed = read_cache_entry(cache_file)
+        if parsed is not None:
+            counts["cache_hits"] += 1
+            return parsed
+
+    contents = source.read(filename)
+    counts["files_opened"] += 1
+    counts["bytes_read"] += len(contents)
+    if not parse_cache_dir:
+        return run_parser(parser, filename, contents, counts)
+
+    if cache_file is None:
+        # The name tables feed into the parsed names, so editing them has to miss the cache too.
+        content_hash = hashlib.sha256(contents).hexdigest()
+        cache_file = os.path.join(parse_cache_dir, f"""{parser.__name__}-v{PARSER_VERSION}-{NAME_TABLES_HASH}-{content_hash}.pickle""")
+        parsed = read_cache_entry(cache_file)
+        if parsed is not None:
+            counts["cache_hits"] += 1
+            return parsed
+
+    # Missing or unreadable entries are just parsed again.
+    parsed = run_parser(parser, filename, contents, counts)
+    write_cache_entry(cache_file, parsed)
+    return parsed
+
+def run_parser(parser, filename: str, contents: bytes, counts: Counter):
+    """Runs a parser on the contents of an .asm file, adding the lines, regex evaluations, and CPU time it took to counts."""
+    lines_scanned, regex_evaluations = SCAN_COUNTS["lines_scanned"], SCAN_COUNTS["regex_evaluations"]
+    cpu_start = time.process_time()
+    try:
+        parsed = parser(contents.decode())
+    except ConditionError as error:
+        print(f"""{filename}: {error}! Quitting.""")
+        sys.exit(1)
+    counts["cpu_seconds"] += time.process_time() - cpu_start
+    counts["lines_scanned"] += SCAN_COUNTS["lines_scanned"] - lines_scanned
+    counts["regex_evaluations"] += SCAN_COUNTS["regex_evaluations"] - regex_evaluations
+    return parsed
+
+def cached_parse_in_worker(parse_cache_dir: str, parser, filename: str):
+    """Runs cached_parse in a worker process and sends back the parse counts along with the result."""
+    PARSE_COUNTS.clear()
+    parsed = cached_parse(parse_cache_dir, parser, filename)
+    return parsed, dict(PARSE_COUNTS[parser.__name__])
+
+def merge_worker_result(parser, result: tuple):
+    """Adds the parse counts from a worker to this process's and returns the parsed result."""
+    parsed, counts = result
+    PARSE_COUNTS[parser.__name__].update(counts)
+    return parsed
+
+def pool_chunksize(count: int, jobs: int):
+    """Gets how many items to send a worker at a time, so small items don't spend more time being sent than worked on."""
+    # About four chunks per worker keeps them all busy when some chunks take longer than others.
+    return max(1, count // (jobs * 4))
+
+def cached_parse_files(executor, jobs: int, parse_cache_dir: str, parser, filenames: list, source=DISK_SOURCE):
+    """Runs a parser over several .asm files, spread across the worker pool if there is one. Results stay in file order."""
+    # Workers open the files themselves, which only works for files on disk.
+    if executor is None or not source.on_disk:
+        return [cached_parse(parse_cache_dir, parser, filename, source) for filename in filenames]
+
+    results = executor.map(partial(cached_parse_in_worker, parse_cache_dir, parser), filenames, chunksize=pool_chunksize(len(filenames), jobs))
+    return [merge_worker_result(parser, result) for result in results]
+
+def index_label_blocks(data, label_suffix: str, end_label: str):
+    """Finds the byte range of every label block in a table like evos_attacks.asm, up to the end label.
+
+    Ex - ChikoritaEvosAttacks: runs from its label to the next label ending in EvosAttacks.
+    """
+    label_pattern = re.compile(rb"^[ \t]*([A-Za-z_]\w*)" + re.escape(label_suffix.encode()) + rb":", re.MULTILINE)
+    labels = []
+    end = len(data)
+    for match in label_pattern.finditer(data):
+        name = match.group(1).decode()
+        if name + label_suffix == end_label:
+            end = match.start()
+            break
+        labels.append((name, match.start()))
+
+    starts = [start for _, start in labels]
+    return {name: (start, block_end) for (name, start), block_end in zip(labels, starts[1:] + [end])}
+
+class BlockCache:
+    """Parsed label blocks saved in an SQLite file by the hash of their contents, so a lookup only loads its own block.
+
+    The cache is shared by every copy of the table, like each --revisions revision's, so it also keeps which blocks each
+    copy has. A block is only dropped once no copy has it. The file is opened on the first lookup and closed by save.
+    """
+
+    def __init__(self, cache_file: str):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        self.cache_file = cache_file
+        self.changed = False
+        self.connection = None
+
+    def connect(self):
+        """Opens the cache file if it isn't open yet."""
+        if self.connection is None:
+            try:
+                self.connection = self.open_database()
+            except sqlite3.DatabaseError:
+                # An unreadable cache is started over, same as an unreadable pickle.
+                os.remove(self.cache_file)
+                self.connection = self.open_database()
+        return self.connection
+
+    def open_database(self):
+        connection = sqlite3.connect(self.cache_file)
+        connection.execute("CREATE TABLE IF NOT EXISTS blocks (hash TEXT PRIMARY KEY, parsed BLOB NOT NULL)")
+        connection.execute("CREATE TABLE IF NOT EXISTS files (owner TEXT PRIMARY KEY, content_hash TEXT NOT NULL)")
+        connection.execute("CREATE TABLE IF NOT EXISTS file_blocks (owner TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (owner, hash))")
+        return connection
+
+    def get(self, block_hash: str):
+        """Gets a saved block, or None if it isn't saved."""
+        row = self.connect().execute("SELECT parsed FROM blocks WHERE hash = ?", (block_hash,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def add(self, block_hash: str, parsed):
+        """Saves a newly parsed block. It's kept for the next run once save is called."""
+        self.connect().execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (block_hash, pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)))
+        self.changed = True
+
+    def has_file(self, owner: str, content_hash: str):
+        """Checks if the blocks of this version of owner's file are already recorded."""
+        row = self.connect().execute("SELECT content_hash FROM files WHERE owner = ?", (owner,)).fetchone()
+        return row is not None and row[0] == content_hash
+
+    def save(self, owner: str, content_hash: str, block_hashes: set):
+        """Keeps the blocks added this run and records owner's file as having block_hashes, then closes the cache.
+
+        Blocks that were only in an older version of owner's file, and in no other copy, are dropped.
+        """
+        connection = self.connect()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?)", (owner, content_hash))
+            connection.execute("DELETE FROM file_blocks WHERE owner = ?", (owner,))
+            connection.executemany("INSERT OR IGNORE INTO file_blocks VALUES (?, ?)", ((owner, block_hash) for block_hash in block_hashes))
+            connection.execute("DELETE FROM blocks WHERE hash NOT IN (SELECT hash FROM file_blocks)")
+        self.changed = False
+        self.close()
+
+    def close(self):
+        """Closes the cache file. Blocks added since the last save are dropped."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+class LabelTable(Mapping):
+    """A big table of label blocks like evos_attacks.asm, read through a memory map and parsed one block at a time.
+
+    The byte range of every block is indexed up front, and the index is cached by the file's contents. A block is
+    parsed by the table's parser the first time it's looked up. Parsed blocks are cached by their own contents in a
+    BlockCache, so editing one Pokemon only re-parses that Pokemon's block on the next run, and a lookup only loads the
+    block it needs from the cache.
+    """
+
+    def __init__(self, parse_cache_dir: str, parser, filename: str, label_suffix: str, end_label: str, source=DISK_SOURCE):
+        self.parse_cache_dir = parse_cache_dir
+        self.parser = parser
+        self.filename = filename
+        self.counts = PARSE_COUNTS[parser.__name__]
+        self.data = source.map(filename)
+        self.counts["files_opened"] += 1
+        self.counts["bytes_read"] += len(self.data)
+        self.blocks = {}
+
+        self.index = None
+        self.content_hash = None
+        self.block_cache = None
+        self.cache_owner = source.cache_owner(filename)
+        if parse_cache_dir:
+            self.content_hash = hashlib.sha256(self.data).hexdigest()
+            index_file = os.path.join(parse_cache_dir, f"""{parser.__name__}-labels-v{PARSER_VERSION}-{self.content_hash}.pickle""")
+            self.index = read_cache_entry(index_file)
+            if self.index is None:
+                self.index = index_label_blocks(self.data, label_suffix, end_label)
+                write_cache_entry(index_file, self.index)
+            self.block_cache = BlockCache(os.path.join(parse_cache_dir, f"""{parser.__name__}-blocks-v{PARSER_VERSION}-{NAME_TABLES_HASH}.sqlite"""))
+        else:
+            self.index = index_label_blocks(self.data, label_suffix, end_label)
+
+    def __getitem__(self, name: str):
+        if name not in self.blocks:
+            self.blocks[name] = self.parse_block(name)
+        return self.blocks[name]
+
+    def parse_block(self, name: str):
+        """Parses a label block, or loads it from the parse cache, without keeping the result in memory."""
+        if name in self.blocks:
+            return self.blocks[name]
+        block = self.block(name)
+        block_hash = None
+        if self.block_cache:
+            block_hash = hashlib.sha256(block).hexdigest()
+            parsed = self.block_cache.get(block_hash)
+            if parsed is not None:
+                self.counts["cache_hits"] += 1
+                return parsed
+
+        parsed = run_parser(self.parser, f"""{self.filename} ({name})""", block, self.counts)[name]
+        if self.block_cache:
+            self.block_cache.add(block_hash, parsed)
+        return parsed
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def block(self, name: str):
+        """Gets the raw bytes of a label block."""
+        start, end = self.index[name]
+        return self.data[start:end]
+
+    def parse_heads(self, head_end: re.Pattern):
+        """Parses the start of every block, up to the first match of head_end, in one run of the table's parser.
+
+        Ex - the evolutions at the top of each evos_attacks.asm block, without the level up moves under them. The result
+        is cached by the file's contents.
+        """
+        cache_file = None
+        if self.content_hash:
+            cache_file = os.path.join(self.parse_cache_dir, f"""{self.parser.__name__}-heads-v{PARSER_VERSION}-{NAME_TABLES_HASH}-{self.content_hash}.pickle""")
+            parsed = read_cache_entry(cache_file)
+            if parsed is not None:
+                self.counts["cache_hits"] += 1
+                return parsed
+
+        heads = []
+        for start, end in self.index.values():
+            match = head_end.search(self.data, start, end)
+            heads.append(self.data[start:match.start() if match else end])
+        # Every head starts with its label, so together they read like a smaller copy of the table.
+        parsed = run_parser(self.parser, self.filename, b"\n".join(heads), self.counts)
+        if cache_file:
+            write_cache_entry(cache_file, parsed)
+        return parsed
+
+    def save(self):
+        """Saves newly parsed blocks for the next run, dropping blocks that are no longer in the file, and closes the cache."""
+        if not self.block_cache:
+            return
+        if self.block_cache.changed or not self.block_cache.has_file(self.cache_owner, self.content_hash):
+            self.block_cache.save(self.cache_owner, self.content_hash, {hashlib.sha256(self.block(name)).hexdigest() for name in self.index})
+        else:
+            self.block_cache.close()
+
+def parse_teachable_moves_by_category(contents: str):
+    """Parses TMs, HMs, and move tutor moves with their move category."""
+    # TODO If a TM or HM move doubles as a move tutor move, this would need changed.
+    teachable_moves = {}
+    for token in tokenize(contents):
+        if token.name != "db":
+            continue
+        # Stop at end of file.
+        elif token.operands == ("0",):
+            break
+        # Check for TM.
+        else:
+            # db DYNAMICPUNCH ; TM01 (Chuck)
+            match = TEACHABLE_MOVE_PATTERN.match(token.comment)
+
+            move_name = format_move_name(token.operands[0])
+            move_category = format_move_category(match.group(1))
+            teachable_moves[move_name] =  move_category
+
+    return teachable_moves
+
 def ordered_set(sequence):
     """Preserved order set."""
     seen = set()
@@ -59,15 +765,28 @@ def convert_stat_evolve(evolve_stat_const):
     }
     return mapping.get(evolve_stat_const, "Unknown")
 
-def find_asm_file(directory: str, desired_file: str):
-    """Recursively traverse polishedcrystal repo folder and find the desired .asm file."""
+def build_asm_file_index(directory: str):
+    """Walks the polishedcrystal repo folder once and maps lowercase .asm file names to their paths."""
+    asm_file_index = {}
     for dirpath, _, files in os.walk(directory):
         for file in files:
-            if desired_file.lower() in file.lower():
-                return os.path.join(dirpath, file)
+            asm_file_index.setdefault(file.lower(), []).append(os.path.normpath(os.path.join(dirpath, file)))
+    return asm_file_index
+
+def find_asm_file(asm_file_index: dict, directory: str, desired_file: str):
+    """Finds the desired .asm file under a directory using the prebuilt file index."""
+    directory = os.path.normpath(directory)
+    matches = [path for path in asm_file_index.get(desired_file.lower(), []) if path.startswith(directory + os.sep)]
 
-    print(f"""find_asm_file couldn't find: {desired_file}! Quitting.""")
-    sys.exit(1)
+    if not matches:
+        print(f"""find_asm_file couldn't find: {desired_file}! Quitting.""")
+        sys.exit(1)
+    # Exact name matches in different subfolders can't be told apart, so make the caller be more specific.
+    if len(matches) > 1:
+        print(f"""find_asm_file found multiple matches for {desired_file} in {directory}: {", ".join(matches)}! Quitting.""")
+        sys.exit(1)
+
+    return matches[0]
 
 def format_move_category(move_category: str):
     """Special name cleanup for Pokemon moves with special characters or names."""
@@ -79,138 +798,38 @@ def format_move_category(move_category: str):
         move_category = move_category.strip()
     return move_category
 
+def load_name_tables(names_file: str):
+    """Loads the special case move names and Pokemon display, egg move, and evo attack names."""
+    try:
+        with open(names_file, 'rb') as file:
+            contents = file.read()
+    except FileNotFoundError:
+        print(f"""{names_file} not found! Quitting.""")
+        sys.exit(1)
+
+    tables = json.loads(contents)
+    move_names = tables["moves"]
+    pokemon_names = {key: (entry["name"], entry["egg_moves"], entry["evo_attacks"]) for key, entry in tables["pokemon"].items()}
+    return move_names, pokemon_names, hashlib.sha256(contents).hexdigest()[:16]
+
+MOVE_NAMES, POKEMON_NAMES, NAME_TABLES_HASH = load_name_tables(NAMES_FILE)
+
+@lru_cache(maxsize=4096)
 def format_move_name(move_name: str):
     """Special name cleanup for Pokemon moves with special characters or names."""
-    if "PSYCHIC_M" in move_name:
-        move_name = "Psychic"
-    elif "X_SCISSOR" in move_name:
-        move_name = "X-Scissor"
-    elif "DOUBLE_EDGE" in move_name:
-        move_name = "Double-Edge"
-    elif "U_TURN" in move_name:
-        move_name = "U-turn"
-    elif "WILL_O_WISP" in move_name:
-        move_name = "Will-O-Wisp"
-    elif "MUD_SLAP" in move_name:
-        move_name = "Mud-Slap"
-    else:
-        move_name = move_name.strip().replace("_", " ").title()
-    return move_name
+    move_name = move_name.strip()
+    if move_name in MOVE_NAMES:
+        return MOVE_NAMES[move_name]
+    return move_name.replace("_", " ").title()
 
+@lru_cache(maxsize=4096)
 def get_pokemon_names_for_files(pokemon_name: str):
     """Name cleanup for Pokemon with special characters or forms. Also associates shared evos attacks and egg moves."""
-    egg_moves_name = ""
-    evo_attacks_name = ""
-
-    if "mime_jr_" in pokemon_name:
-        pokemon_name = "Mime Jr."
-        egg_moves_name = "MimeJr"
-        evo_attacks_name = "MimeJr"
-    elif "mr__mime_plain" in pokemon_name:
-        pokemon_name = "Mr. Mime"
-        egg_moves_name = "MimeJr"
-        evo_attacks_name = "MrMimePlain"
-    elif "mr__mime_galarian" in pokemon_name:
-        pokemon_name = "Mr. Mime Galarian"
-        egg_moves_name = "MimeJr"
-        # TODO Requires changes in Polished code because uses Rime level up moves.
-        evo_attacks_name = "MrMimeGalarian"
-    elif "mr__rime" in pokemon_name:
-        pokemon_name = "Mr. Rime"
-        egg_moves_name = "MimeJr"
-        evo_attacks_name = "MrRime"
-    elif "diglett_plain" in pokemon_name:
-        pokemon_name = "Diglett"
-        egg_moves_name = "DiglettAlolan"
-        evo_attacks_name = "DiglettPlain"
-    elif "rattata_plain" in pokemon_name:
-        pokemon_name = "Rattata"
-        egg_moves_name = "RattataAlolan"
-        evo_attacks_name = "RattataPlain"
-    elif "raticate_plain" in pokemon_name:
-        pokemon_name = "Raticate"
-        egg_moves_name = "RaticatePlain"
-        evo_attacks_name = "RaticateAlolan"
-    elif "meowth_plain" in pokemon_name:
-        pokemon_name = "Meowth"
-        egg_moves_name = "MeowthGalarian"
-        evo_attacks_name = "MeowthPlain"
-    elif "meowth_alolan" in pokemon_name:
-        pokemon_name = "Meowth (Alolan)"
-        egg_moves_name = "MeowthGalarian"
-        evo_attacks_name = "MeowthAlolan"
-    elif "growlithe_plain" == pokemon_name:
-        pokemon_name = "Growlithe"
-        egg_moves_name = "GrowlitheHisuian"
-        evo_attacks_name = "GrowlithePlain"
-    elif "geodude_plain" in pokemon_name:
-        pokemon_name = "Geodude"
-        egg_moves_name = "GeodudeAlolan"
-        evo_attacks_name = "GeodudePlain"
-    elif "slowpoke_plain" in pokemon_name:
-        pokemon_name = "Slowpoke"
-        egg_moves_name = "SlowpokeGalarian"
-        evo_attacks_name = "SlowpokePlain"
-    elif "wooper_plain" in pokemon_name:
-        pokemon_name = "Wooper"
-        egg_moves_name = "WooperPaldean"
-        evo_attacks_name = "WooperPlain"
-    elif "corsola_plain" in pokemon_name:
-        pokemon_name = "Corsola"
-        egg_moves_name = "CorsolaGalarian"
-        evo_attacks_name = "CorsolaPlain"
-    elif "girafarig" == pokemon_name:
-        pokemon_name = "Girafarig"
-        egg_moves_name = "Girafarig"
-        evo_attacks_name = "Farigiraf"
-    elif "qwilfish_plain" == pokemon_name:
-        pokemon_name = "Qwilfish"
-        egg_moves_name = "Qwilfish"
-        evo_attacks_name = "QwilfishPlain"
-    elif "sneasel_plain" == pokemon_name:
-        pokemon_name = "Sneasel"
-        egg_moves_name = "Sneasel"
-        evo_attacks_name = "SneaselPlain"
-    # TODO For FarfetchDGalarianEggMoves to work, requires FarfetchDPlainEggMoves
-    #      to be duplicated under its unique egg move db COUNTER.
-    elif "farfetch_d_plain" == pokemon_name:
-        pokemon_name = "Farfetch'd"
-        egg_moves_name = "FarfetchDPlain"
-        evo_attacks_name = "FarfetchDPlain"
-    elif "farfetch_d_galarian" == pokemon_name:
-        pokemon_name = "Farfetch'd (Galarian)"
-        egg_moves_name = "FarfetchDGalarian"
-        evo_attacks_name = "FarfetchDGalarian"
-    elif "sirfetch_d" == pokemon_name:
-        pokemon_name = "Sirfetch'd"
-        egg_moves_name = "FarfetchDGalarian"
-        evo_attacks_name = "SirfetchD"
-    elif "mewtwo_plain" == pokemon_name:
-        pokemon_name = "Mewtwo"
-        egg_moves_name = pokemon_name
-        evo_attacks_name = pokemon_name
-    elif "mewtwo_armored" == pokemon_name:
-        pokemon_name = "Mewtwo (Armored)"
-        egg_moves_name = "Mewtwo"
-        evo_attacks_name = "Mewtwo"
-    elif "ho_oh" == pokemon_name:
-        pokemon_name = "Ho-Oh"
-        egg_moves_name = "HoOh"
-        evo_attacks_name = "HoOh"
-    elif "tauros_paldean" == pokemon_name:
-        pokemon_name = "Tauros (Combat Breed) (Paldean)"
-        egg_moves_name = ""
-        evo_attacks_name = "TaurosPaldean"
-    elif "tauros_paldean_fire" == pokemon_name:
-        pokemon_name = "Tauros (Blaze Breed) (Paldean)"
-        egg_moves_name = ""
-        evo_attacks_name = "TaurosPaldeanFire"
-    elif "tauros_paldean_water" == pokemon_name:
-        pokemon_name = "Tauros (Aqua Breed) (Paldean)"
-        egg_moves_name = ""
-        evo_attacks_name = "TaurosPaldeanWater"
+    if pokemon_name in POKEMON_NAMES:
+        return POKEMON_NAMES[pokemon_name]
+
     # More general form fixes.
-    elif "plain" in pokemon_name.lower():
+    if "plain" in pokemon_name.lower():
         egg_moves_name = pokemon_name.title().replace("_", "")
         evo_attacks_name = egg_moves_name
         pokemon_name = pokemon_name.removesuffix("_plain").title()
@@ -226,259 +845,220 @@ def get_pokemon_names_for_files(pokemon_name: str):
 
     return pokemon_name, egg_moves_name, evo_attacks_name
 
-def extract_base_stat_asm_filenames(filename: str) -> list:
+def extract_base_stat_asm_filenames(contents: str) -> list:
     """Extracts base stat .asm filenames from "base_stats.asm"."""
     asm_files = []
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            # Skip Red Gyarados and three segment Dudunsparce which are cosmetic forms.
-            if "; three segment" in line or "; red" in line:
-                continue
-            match = re.search(r'([a-zA-Z0-9_]+\.asm)', line)
-            if match:
-                # Ignore egg dummy base stat data.
-                if "egg.asm" not in match.group(1):
-                    asm_files.append(match.group(1))
+    for token in tokenize(contents):
+        if token.type is not TokenType.INCLUDE:
+            continue
+        # Skip Red Gyarados and three segment Dudunsparce which are cosmetic forms.
+        if token.comment.startswith(("three segment", "red")):
+            continue
+        # INCLUDE "data/pokemon/base_stats/bulbasaur.asm"
+        asm_file = os.path.basename(token.operands[0].strip('"'))
+        # Ignore egg dummy base stat data.
+        if asm_file.endswith(".asm") and asm_file != "egg.asm":
+            asm_files.append(asm_file)
     return asm_files
 
-def parse_johto_dex(filename: str):
+def parse_johto_dex(contents: str):
     """Parses Pokémon names in Johto dex order."""
     pokemon_names = []
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            # Extract Pokémon names only if preceded by 'dp'
-            match = re.match(r'dp\s+([A-Z][A-Z0-9_]*)', line)
-            if match:
-                pokemon_names.append(match.group(1))
+    for token in tokenize(contents):
+        # Extract Pokémon names only if preceded by 'dp'
+        if token.name == "dp":
+            pokemon_names.append(token.operands[0])
     return pokemon_names
 
 def order_base_stat_files_by_dex(dex_names: list, asm_files: list):
     """Reorders the Pokemon base stat files by Pokedex order."""
-    reordered_base_stat_files = []
-
-    for name in dex_names:
-        # Normalize the name for matching.
-        normalized_name = name.lower()
-
-        # Find matching .asm files, including alternate forms.
-        matches = [file for file in asm_files if file.lower().startswith(normalized_name)]
-
-        if matches:
-            reordered_base_stat_files.extend(matches)
+    dex_index = {name.lower(): [] for name in dex_names}
+    unclaimed_files = []
+
+    for file in asm_files:
+        # Split the file name into a Pokemon and a form, trying the longest Pokemon name first so porygon_z.asm belongs
+        # to Porygon-Z instead of being a form of Porygon, and mr__mime_galarian.asm is a form of Mr. Mime.
+        base_name = os.path.splitext(file)[0].lower()
+        while base_name not in dex_index and "_" in base_name:
+            base_name = base_name[:base_name.rindex("_")]
+
+        if base_name in dex_index:
+            # Forms stay in their base_stats.asm order.
+            dex_index[base_name].append(file)
+        else:
+            unclaimed_files.append(file)
 
-        # TODO Remove asm file from list so it's not duplicated.
-        for match in matches:
-            asm_files.remove(match)
+    if unclaimed_files:
+        print(f"""Base stat files not in the Pokedex order: {", ".join(unclaimed_files)}""")
 
-    return reordered_base_stat_files
+    return [file for name in dex_index for file in dex_index[name]]
 
-def parse_egg_moves(filename):
+def parse_egg_moves(contents: str):
     """Parses egg moves."""
-    try:
-        egg_moves = {}
-        with open(filename, 'r') as file:
-            current_pokemon = None
-            for line in file:
-                line = line.strip()
-                # Stop at end of file.
-                if line.startswith("NoEggMoves:"):
-                    break
-                # Get name of the Pokemon.
-                elif line.endswith("EggMoves:"):
-                    current_pokemon = line.replace("EggMoves:", "").strip()
-                    egg_moves[current_pokemon] = []
-                # Get the egg moves for the current Pokemon.
-                elif line.startswith("db") and current_pokemon:
-                    if "$ff" in line:
-                        current_pokemon = None
-                        continue
-
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-                     # Get the move and format the name.
-                    move = line.split(" ")[1]
-                    move = format_move_name(move)
-                    egg_moves[current_pokemon].append(move)
-        return egg_moves
-    except FileNotFoundError:
-        print(f"""{filename} not found! Quitting.""")
-        sys.exit(1)
+    egg_moves = {}
+    current_pokemon = None
+    for token in tokenize(contents):
+        if token.type is TokenType.LABEL:
+            # Stop at end of file.
+            if token.name == "NoEggMoves":
+                break
+            # Get name of the Pokemon.
+            elif token.name.endswith("EggMoves"):
+                current_pokemon = token.name.removesuffix("EggMoves")
+                egg_moves[current_pokemon] = []
+        # Get the egg moves for the current Pokemon.
+        elif token.name == "db" and current_pokemon:
+            if token.operands[0] == "$ff":
+                current_pokemon = None
+                continue
 
-def parse_evos_attacks(filename):
+            # Get the move and format the name.
+            move = format_move_name(token.operands[0])
+            egg_moves[current_pokemon].append(move)
+    return egg_moves
+
+def parse_evos_attacks(contents: str):
     """Parses level up moves and evolution data."""
-    try:
-        evos_attacks = {}
-        with open(filename, 'r') as file:
-            mode = Mode.NONE
-            current_pokemon = None
-            for line in file:
-                line = line.strip()
-                if line.startswith("if !DEF(FAITHFUL)"):
-                    mode = Mode.POLISHED
-                elif line.startswith("if DEF(FAITHFUL)"):
-                    mode = Mode.FAITHFUL
-                elif line.startswith("else"):
-                    mode = Mode.POLISHED
-                elif line.startswith("endc"):
-                    mode = Mode.NONE
-                # Stop at end of file.
-                if line.startswith("EggEvosAttacks:"):
-                    break
-                # Get current Pokemon.
-                elif line.endswith("EvosAttacks:"):
-                    current_pokemon = line.replace("EvosAttacks:", "").strip()
-                    evos_attacks[current_pokemon] = {"evo_data_faithful": [], "evo_data_polished": [], "moves": []}
-                # Get evolution information.
-                elif line.startswith("evo_data") and current_pokemon:
-                    # Check if faithful or polished evolution.
-                    evo_mode = Mode.FAITHFUL.value.lower()
-                    # Tag Faithful only or Polished only move.
-                    if mode is not Mode.NONE:
-                        evo_mode = mode.value.lower()
-
-                    # Find the evolution data which is up to 5 fields.
-                    match = re.match(r"evo_data (\w+), (\w+)(?:, (\w+))?(?:, (\w+))?(?:, (\w+))?", line)
-                    evo_info = {}
-
-                    first_field = match.group(1) # Evolution type
-                    second_field =  match.group(2) # Method or time of day
-                    third_field = match.group(3) # Evolution or time of day or stat spread
-                    fourth_field = match.group(4) if match.group(4) else None # Form or evolution
-                    fifth_field = match.group(5) if match.group(5) else None # Form
-
-                    if first_field == "EVOLVE_ITEM":
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        if fourth_field:
-                            evo_info["form"] = fourth_field.strip().replace("_", " ").title()
-                    elif first_field == "EVOLVE_HOLDING":
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = fourth_field.strip().replace("_", " ").title()
-                        if fifth_field:
-                            evo_info["form"] = fifth_field.strip().replace("_", " ").title()
-                        evo_info["time_of_day"] = convert_time_of_day(third_field)
-                    elif first_field == "EVOLVE_HAPPINESS":
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = convert_time_of_day(second_field)
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        if fourth_field:
-                            evo_info["form"] = fourth_field.strip().replace("_", " ").title()
-                    elif first_field == "EVOLVE_STAT": # only for Tyrogue (no need for "EVOLVE_TYROGUE")
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = fourth_field.strip().replace("_", " ").title()
-                        evo_info["evolve_stat"] = convert_stat_evolve(third_field)
-                    elif first_field == "EVOLVE_LOCATION":
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        if fourth_field:
-                            evo_info["form"] = fourth_field.strip().replace("_", " ").title()
-                    elif first_field == "EVOLVE_MOVE":
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        if fourth_field:
-                            evo_info["form"] = fourth_field.strip().replace("_", " ").title()
-                    elif first_field == "EVOLVE_CRIT": # only for Galarian Farfetch'd
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = convert_time_of_day(second_field)
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        # Ignore PLAIN_FORM fourth_field.
-                    elif first_field == "EVOLVE_PARTY": # only for Mantyke
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                    else:
-                        # Try to assume "EVOLVE_LEVEL" for everything else.
-                        evo_info["type"] = first_field.strip().replace("_", " ").title()
-                        evo_info["method"] = second_field.strip().replace("_", " ").title()
-                        evo_info["evolution"] = third_field.strip().replace("_", " ").title()
-                        if fourth_field and not "NO_FORM" in fourth_field and not "PLAIN_FORM" in fourth_field:
-                            evo_info["form"] = fourth_field.strip().replace("_", " ").title()
-
-                    evos_attacks[current_pokemon][f"evo_data_{evo_mode}"].append(evo_info)
-
-                # Get level up move information.
-                elif re.match(r"db \d+, [A-Z_]+", line):
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-                    parts = line.split(", ")
-                    level = parts[0].split(" ")[1]
-                    # Get the move and format the name.
-                    move = parts[1]
-                    move = format_move_name(move)
-                    # Tag Faithful only or Polished only move.
-                    if mode is not Mode.NONE:
-                        move = f"{move} ({mode.value})"
-                    evos_attacks[current_pokemon]["moves"].append((level, move))
-        return evos_attacks
-    except FileNotFoundError:
-        print(f"""{filename} not found! Quitting.""")
-        sys.exit(1)
+    evos_attacks = {}
+    current_pokemon = None
+    for token, in_faithful, in_polished in preprocess(tokenize(contents)):
+        # Get level up move information. Most of the file is level up moves, so they're checked first.
+        if token.name == "db":
+            operands = token.operands
+            if len(operands) == 2 and operands[0].isdigit() and LEVEL_UP_MOVE_PATTERN.match(operands[1]):
+                level = operands[0]
+                # Get the move and format the name.
+                move = format_move_name(operands[1])
+                # Tag Faithful only or Polished only move.
+                if not (in_faithful and in_polished):
+                    move = f"{move} ({build_mode(in_faithful, in_polished).value})"
+                evos_attacks[current_pokemon]["moves"].append((level, move))
+            continue
+
+        token_type = token.type
+        if token_type is TokenType.LABEL:
+            # Stop at end of file.
+            if token.name == "EggEvosAttacks":
+                break
+            # Get current Pokemon. Skip the EvosAttacks:: pointer table label.
+            elif token.name.endswith("EvosAttacks") and token.name != "EvosAttacks":
+                current_pokemon = token.name.removesuffix("EvosAttacks")
+                evos_attacks[current_pokemon] = {"evo_data_faithful": [], "evo_data_polished": [], "moves": []}
+        # Get evolution information.
+        elif token_type is TokenType.EVO_DATA and current_pokemon:
+            # Evolutions shared by both ROMs are listed with the Faithful ones, and the Polished list only has its changes.
+            evo_mode = Mode.POLISHED.value.lower() if build_mode(in_faithful, in_polished) is Mode.POLISHED else Mode.FAITHFUL.value.lower()
+
+            # Find the evolution data which is up to 5 fields.
+            fields = token.operands + (None,) * (5 - len(token.operands))
+            evo_info = {}
+
+            first_field = fields[0] # Evolution type
+            second_field =  fields[1] # Method or time of day
+            third_field = fields[2] # Evolution or time of day or stat spread
+            fourth_field = fields[3] # Form or evolution
+            fifth_field = fields[4] # Form
+
+            if first_field == "EVOLVE_ITEM":
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                if fourth_field:
+                    evo_info["form"] = fourth_field.strip().replace("_", " ").title()
+            elif first_field == "EVOLVE_HOLDING":
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = fourth_field.strip().replace("_", " ").title()
+                if fifth_field:
+                    evo_info["form"] = fifth_field.strip().replace("_", " ").title()
+                evo_info["time_of_day"] = convert_time_of_day(third_field)
+            elif first_field == "EVOLVE_HAPPINESS":
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = convert_time_of_day(second_field)
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                if fourth_field:
+                    evo_info["form"] = fourth_field.strip().replace("_", " ").title()
+            elif first_field == "EVOLVE_STAT": # only for Tyrogue (no need for "EVOLVE_TYROGUE")
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = fourth_field.strip().replace("_", " ").title()
+                evo_info["evolve_stat"] = convert_stat_evolve(third_field)
+            elif first_field == "EVOLVE_LOCATION":
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                if fourth_field:
+                    evo_info["form"] = fourth_field.strip().replace("_", " ").title()
+            elif first_field == "EVOLVE_MOVE":
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                if fourth_field:
+                    evo_info["form"] = fourth_field.strip().replace("_", " ").title()
+            elif first_field == "EVOLVE_CRIT": # only for Galarian Farfetch'd
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = convert_time_of_day(second_field)
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                # Ignore PLAIN_FORM fourth_field.
+            elif first_field == "EVOLVE_PARTY": # only for Mantyke
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+            else:
+                # Try to assume "EVOLVE_LEVEL" for everything else.
+                evo_info["type"] = first_field.strip().replace("_", " ").title()
+                evo_info["method"] = second_field.strip().replace("_", " ").title()
+                evo_info["evolution"] = third_field.strip().replace("_", " ").title()
+                if fourth_field and not "NO_FORM" in fourth_field and not "PLAIN_FORM" in fourth_field:
+                    evo_info["form"] = fourth_field.strip().replace("_", " ").title()
 
-def parse_evolution_moves(filename):
+            evos_attacks[current_pokemon][f"evo_data_{evo_mode}"].append(evo_info)
+    return evos_attacks
+
+def parse_evolution_moves(contents: str):
     """Parses evolution moves from the file and formats the Pokemon name and form."""
     evolution_moves = {}
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            
-            # Ignore lines that do not start with 'db' or contain 'NO_MOVE'
-            if not line.startswith("db") or "NO_MOVE" in line:
-                continue
-            
-            # Extract move name and Pokémon name from the comment
-            match = re.match(r'db\s+(\w+).*;\s*(.+)', line)
-            if match:
-                # Get the move and format the name.
-                move = match.group(1)
-                move = format_move_name(move)
-
-                # Get Pokémon name and format it contains '_FORM'.
-                pokemon_name = match.group(2).strip()
-                parts = pokemon_name.split(", ")  # Split at comma and space
-                if len(parts) == 2 and "_FORM" in parts[1]:
-                    pokemon_name = parts[0].title() + parts[1].title().replace("_Form", "")
-                else:
-                    pokemon_name = pokemon_name.title()
+    for token in tokenize(contents):
+        # Ignore lines that do not start with 'db' or contain 'NO_MOVE'
+        if token.name != "db" or token.operands[0] == "NO_MOVE":
+            continue
+
+        # Extract move name and Pokémon name from the comment
+        if token.comment:
+            # Get the move and format the name.
+            move = format_move_name(token.operands[0])
+
+            # Get Pokémon name and format it contains '_FORM'.
+            pokemon_name = token.comment
+            parts = pokemon_name.split(", ")  # Split at comma and space
+            if len(parts) == 2 and "_FORM" in parts[1]:
+                pokemon_name = parts[0].title() + parts[1].title().replace("_Form", "")
+            else:
+                pokemon_name = pokemon_name.title()
 
-                evolution_moves[pokemon_name] = move
+            evolution_moves[pokemon_name] = move
 
     return evolution_moves
 
-def parse_unique_wild_moves(filename):
+def parse_unique_wild_moves(contents: str):
     """Parses unique wild moves from the file and formats the Pokemon name and form."""
     unique_wild_moves = {}
 
-    # Read the file
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-    # Loop through each line
-    for line in lines:
-        # Check if the line starts with 'unique_moves'.
-        if line.strip().startswith('unique_moves'):
-            # Remove inline comments for consistent parsing.
-            line = line.split(';')[0]
-
-            # Clean up line and split by commas.
-            parts = [part.strip() for part in line.split(',')]
+    # Loop through each unique_moves line.
+    for token in tokenize(contents):
+        if token.type is TokenType.UNIQUE_MOVES:
+            parts = token.operands
 
             # Check the number of parts to determine the structure.
             if len(parts) == 3:
                 # Format: unique_moves LOCATION, POKEMON, MOVE
-                location = parts[0].split()[1]
+                location = parts[0]
                 pokemon_name = parts[1]
                 move = parts[2]
                 form = None
             elif len(parts) == 4:
                 # Format: unique_moves LOCATION, POKEMON, FORM, MOVE
-                location = parts[0].split()[1]
+                location = parts[0]
                 pokemon_name = parts[1]
                 form = parts[2]
                 move = parts[3]
@@ -510,456 +1090,1483 @@ def parse_unique_wild_moves(filename):
 
     return unique_wild_moves
 
-def parse_pokemon_data(filename: str, pokemon_data: dict):
+def parse_pokemon_data(contents: str):
     """Parses each pokemon's base stat asm file."""
-    try:
-        with open(filename, 'r') as file:
-            mode = Mode.NONE
-            for line in file:
-                line = line.strip()
-                if line.startswith("if DEF(FAITHFUL)"):
-                    mode = Mode.FAITHFUL
-                elif line.startswith("else"):
-                    mode = Mode.POLISHED
-                elif line.startswith("endc"):
-                    mode = Mode.NONE
-                # Parse base stats.
-                elif re.search(r"; \d{1,3} BST", line):
-                    # Remove leading "db".
-                    line = re.sub(r"^db\s+", "", line)
-
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-
-                    # Split into list based on comma and remove blank spaces.
-                    stats = [item.strip() for item in line.split(",")]
-
-                    # Fill in stats.
-                    stats_keys = ["HP", "Atk", "Def", "Speed", "SAt", "SDf"]
-                    if mode is Mode.NONE:
-                        pokemon_data[f"stats_{Mode.FAITHFUL.value.lower()}"] = dict(zip(stats_keys, map(int, stats)))
-                    else:
-                        pokemon_data[f"stats_{mode.value.lower()}"] = dict(zip(stats_keys, map(int, stats)))
-                # Parse types.
-                elif "; type" in line:
-                    # Remove leading "db".
-                    line = re.sub(r"^db\s+", "", line)
-
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-
-                    # Split into list based on comma, remove blank spaces, capitalize first letter, and remove duplicate types.
-                    types = ordered_set([item.strip().title() for item in line.split(",")])
-
-                    # Fill in type.
-                    if mode is Mode.NONE:
-                        pokemon_data[f"type_{Mode.FAITHFUL.value.lower()}"] = types
-                    else:
-                        pokemon_data[f"type_{mode.value.lower()}"] = types
-                # Parse held items.
-                elif "; held items" in line:
-                    # Remove leading "db".
-                    line = re.sub(r"^db\s+", "", line)
-
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-
-                    # Split into list based on comma, remove blank spaces, capitalize first letter, and remove duplicate types.
-                    held_items = [item.strip().replace("_", " ").title() for item in line.split(",")]
-
-                    # Fill in held items.
-                    pokemon_data["held_items"] = held_items
-                # Parse abilities.
-                elif "abilities_for" in line:
-                    # Split into list based on comma, remove blank spaces, and capitalize first letter.
-                    line = [item.strip().title() for item in line.split(",")]
-
-                    # Remove leading "abilities_for POKEMON" and remove duplicate types.
-                    abilities = line[1:]
-
-                    # Fill in abilities.
-                    if mode is Mode.NONE:
-                        pokemon_data[f"abilities_{Mode.FAITHFUL.value.lower()}"] = abilities
-                    else:
-                        pokemon_data[f"abilities_{mode.value.lower()}"] = abilities
-                # Parse egg groups.
-                elif "; egg groups" in line:
-                    # Remove leading "dn".
-                    line = re.sub(r"^dn\s+", "", line)
-
-                    # Remove anything after a semicolon.
-                    line = re.sub(r";.*", "", line).strip()
-
-                    # Split into list based on comma, remove blank spaces, capitalize first letter, remove leading "EGG_", and remove duplicate groups.
-                    egg_groups = ordered_set([item.strip().title()[4:] for item in line.split(",")])
-
-                     # Fill in egg group.
-                    pokemon_data[f"egg_groups"] = egg_groups
-                # Parse TM and HM learnsets.
-                elif "tmhm" in line:
-                    # Remove leading "tmhm".
-                    # line = re.sub(r"^tmhm\s+", "", line)
-                    line = re.sub(r"^tmhm\s*", "", line)
-
-                    # Split into list based on comma, remove blank spaces, replace "_", and capitalize first letter.
-                    # TODO X-Scissor, Double-Edge, U-turn, Will-O-Wisp, and Mud-Slap have "-". Check names.asm.
-                    tm_hm_moves = [format_move_name(item) for item in line.split(",") if line]
-
-                     # Fill in TM and HM learnsets.
-                    pokemon_data[f"tm_hm_moves"] = tm_hm_moves
-
-            return pokemon_data
-
-    except FileNotFoundError:
-        print(f"""{filename} not found! Quitting.""")
-        sys.exit(1)
+    # Both ROMs are filled in from the same scan. Each line lands in whichever ROM(s) assemble it.
+    faithful, polished = {}, {}
+    for token, in_faithful, in_polished in preprocess(tokenize(contents)):
+        key = None
+        token_type = token.type
+        if token_type is TokenType.DATA:
+            comment = token.comment
+            # Parse types.
+            if comment.startswith("type"):
+                # Capitalize first letter and remove duplicate types.
+                key, value = "type", ordered_set([item.title() for item in token.operands])
+            # Parse held items.
+            elif comment.startswith("held items"):
+                # Replace "_" and capitalize first letter.
+                key, value = "held_items", [item.replace("_", " ").title() for item in token.operands]
+            # Parse egg groups.
+            elif comment.startswith("egg groups"):
+                # Capitalize first letter, remove leading "EGG_", and remove duplicate groups.
+                key, value = "egg_groups", ordered_set([item.title()[4:] for item in token.operands])
+            # Parse base stats. Most data lines aren't, so the cheaper checks above go first.
+            elif BASE_STAT_TOTAL_PATTERN.match(comment):
+                stats_keys = ["HP", "Atk", "Def", "Speed", "SAt", "SDf"]
+                key, value = "stats", dict(zip(stats_keys, map(int, token.operands)))
+        # Parse abilities.
+        elif token_type is TokenType.ABILITIES_FOR:
+            # Remove leading "abilities_for POKEMON" and capitalize first letter.
+            key, value = "abilities", [item.title() for item in token.operands[1:]]
+        # Parse TM and HM learnsets.
+        elif token_type is TokenType.TMHM:
+            # Replace "_" and capitalize first letter.
+            # TODO X-Scissor, Double-Edge, U-turn, Will-O-Wisp, and Mud-Slap have "-". Check names.asm.
+            key, value = "tm_hm_moves", [format_move_name(item) for item in token.operands]
+
+        if key:
+            if in_faithful:
+                faithful[key] = value
+            if in_polished:
+                polished[key] = value
+
+    # The pages show the Polished held items, egg groups, and TM/HM learnset.
+    pokemon_data = {key: polished[key] for key in ("held_items", "egg_groups", "tm_hm_moves") if key in polished}
+
+    # Stats, types, and abilities get a Polished entry only when Polished differs from Faithful.
+    for key in ("stats", "type", "abilities"):
+        if key in faithful:
+            pokemon_data[f"{key}_faithful"] = faithful[key]
+        if key in polished and polished[key] != faithful.get(key):
+            pokemon_data[f"{key}_polished"] = polished[key]
+
+    return pokemon_data
+
+def evolution_key(evolution_data: dict):
+    """Gets the evo attacks name an evolution points at. Ex - RATICATE, ALOLAN_FORM is RaticateAlolan."""
+    return f"""{evolution_data["evolution"]}{evolution_data.get("form", "").split(" ")[0]}""".replace(" ", "")
+
+def name_prefixes(evo_attacks_name: str):
+    """Gets every leading run of capitalized words in an evo attacks name. Ex - MrMimePlain is Mr, MrMime, MrMimePlain."""
+    return [evo_attacks_name[:match.start()] for match in re.finditer(r"(?<=.)[A-Z]", evo_attacks_name)] + [evo_attacks_name]
+
+class EvolutionGraph:
+    """Evolution families built from every Pokemon's Faithful and Polished evolution data.
+
+    Pokemon are referred to by their index in the dex ordered Pokemon list.
+    """
+
+    def __init__(self, pokemon_data_list: list):
+        self.evolutions = [[] for _ in pokemon_data_list]
+        self.pre_evolutions = [[] for _ in pokemon_data_list]
+        # (pre-evolution, evolution) links where the evolution data names the evolution's exact form.
+        self.form_links = set()
+
+        # An evolution without a form (RATICATE) matches every form of that Pokemon, so index each name by its prefixes too.
+        exact_names = {}
+        prefix_names = {}
+        for idx, pokemon_data in enumerate(pokemon_data_list):
+            exact_names.setdefault(pokemon_data.evo_attacks_name, []).append(idx)
+            for prefix in name_prefixes(pokemon_data.evo_attacks_name):
+                prefix_names.setdefault(prefix, []).append(idx)
 
-def generate_pokemon_learnset_page(pokemon_data: dict, pokemon_file, learnset_file: str, prev_pokemon_data: dict, next_pokemon_data: dict, teachable_moves_category: dict):
+        for idx, pokemon_data in enumerate(pokemon_data_list):
+            for evolution_data in pokemon_data.evo_data_faithful + pokemon_data.evo_data_polished:
+                key = evolution_key(evolution_data)
+                for evolution_idx in exact_names.get(key) or prefix_names.get(key, []):
+                    # Don't double link if a Pokemon has multiple evolution methods for the same evolution. Ex - Eevee.
+                    if evolution_idx != idx and evolution_idx not in self.evolutions[idx]:
+                        self.evolutions[idx].append(evolution_idx)
+                        self.pre_evolutions[evolution_idx].append(idx)
+                    if key in exact_names:
+                        self.form_links.add((idx, evolution_idx))
+
+    def with_pre_evolutions(self, indexes):
+        """Gets the given Pokemon along with every Pokemon they evolve from, directly or through other evolutions."""
+        found = set(indexes)
+        pending = list(found)
+        while pending:
+            for pre_evolution_idx in self.pre_evolutions[pending.pop()]:
+                if pre_evolution_idx not in found:
+                    found.add(pre_evolution_idx)
+                    pending.append(pre_evolution_idx)
+        return found
+
+    def egg_moves_source(self, idx: int, has_egg_moves):
+        """Picks the pre-evolution a Pokemon's egg moves are carried over from, or None if none of them have any.
+
+        A pre-evolution that evolves into this exact form wins, so RattataAlolan's egg moves go to RaticateAlolan even
+        though plain Rattata evolves into Raticate too. Otherwise it's the last one in dex order.
+        """
+        sources = [pre_evolution_idx for pre_evolution_idx in self.pre_evolutions[idx] if has_egg_moves(pre_evolution_idx)]
+        form_sources = [pre_evolution_idx for pre_evolution_idx in sources if (pre_evolution_idx, idx) in self.form_links]
+        return max(form_sources or sources, default=None)
+
+    def topological_order(self):
+        """Orders the Pokemon so every pre-evolution comes before its evolutions. Ties keep dex order."""
+        remaining = [len(pre_evolutions) for pre_evolutions in self.pre_evolutions]
+        ready = deque(idx for idx, count in enumerate(remaining) if count == 0)
+        order = []
+        while ready:
+            idx = ready.popleft()
+            order.append(idx)
+            for evolution_idx in self.evolutions[idx]:
+                remaining[evolution_idx] -= 1
+                if remaining[evolution_idx] == 0:
+                    ready.append(evolution_idx)
+
+        # Evolution loops shouldn't exist, but don't drop Pokemon if the data ever has one.
+        if len(order) < len(remaining):
+            ordered = set(order)
+            order.extend(idx for idx in range(len(remaining)) if idx not in ordered)
+        return order
+
+    def family_roots(self, idx: int):
+        """Gets the Pokemon at the start of every evolution line that leads to this Pokemon."""
+        roots = []
+        stack = [idx]
+        seen = {idx}
+        while stack:
+            current = stack.pop()
+            if not self.pre_evolutions[current] and current not in roots:
+                roots.append(current)
+            for pre_evolution_idx in self.pre_evolutions[current]:
+                if pre_evolution_idx not in seen:
+                    seen.add(pre_evolution_idx)
+                    stack.append(pre_evolution_idx)
+        return sorted(roots)
+
+    def family(self, idx: int):
+        """Gets every Pokemon in the same evolution family, in dex order."""
+        members = set()
+        stack = self.family_roots(idx)
+        while stack:
+            current = stack.pop()
+            if current not in members:
+                members.add(current)
+                stack.extend(self.evolutions[current])
+        return sorted(members)
+
+def propagate_egg_moves(pokemon_data_list: list, evolution_graph: EvolutionGraph):
+    """Carries egg moves from each family's first stage down to its evolutions."""
+    for idx in evolution_graph.topological_order():
+        # Egg moves are learned by the first stage, so a pre-evolution's egg moves win over the evolution's own entry.
+        pre_evolution_idx = evolution_graph.egg_moves_source(idx, lambda pre_evolution_idx: len(pokemon_data_list[pre_evolution_idx].egg_moves) > 0)
+        if pre_evolution_idx is not None:
+            # Each Pokemon gets its own copy, so changing one evolution's egg moves can't change the rest of its family.
+            pokemon_data_list[idx].egg_moves = array("H", pokemon_data_list[pre_evolution_idx].egg_moves)
+
+# Page templates. The fixed text of each page is laid out once here and rows are filled in with the bound str.format
+# methods, so rendering a page is a run of list appends joined into one string and written with a single write.
+LEARNSET_PAGE_TOP = "&#8593;&nbsp;[Back to Pokemon Learnsets](Pokemon-Learnsets)\n\n"
+PREV_LINK = "&#8592;&nbsp;[{}]({})&nbsp;&nbsp;".format
+NEXT_LINK = "[{}]({})&nbsp;&#8594;".format
+PAGE_TITLE = "\n## {}\n\n".format
+BASE_STATS_TABLE = (
+    "### Base Stats\n\n"
+    "| Version           | Type     | HP                    | Atk                    | Def                    | SAt                    | SDf                    | Speed                    |\n"
+    "|:------------------|:---------|:----------------------|:-----------------------|:-----------------------|:-----------------------|:-----------------------|:-------------------------|\n"
+)
+BASE_STATS_ROW = "| {} | {} | {} | {} | {} | {} | {} | {} |\n".format
+ABILITIES_TABLE = (
+    "### Abilities\n\n"
+    "| Version             | Abilities                  |\n"
+    "|:--------------------|:---------------------------|\n"
+)
+TWO_COLUMN_ROW = "| {} | {} |\n".format
+EVOLUTION_DATA_TITLE = "### Evolution Data\n\n"
+EVOLUTION_TABLE = "| Version | {} |\n|:--------|:- {} |\n".format
+EGG_GROUPS = "### Egg Groups\n\n{}\n\n".format
+LEARNSET_TABLE = (
+    "### Learnset\n\n"
+    "| Level | Move |\n"
+    "|--------|-------|\n"
+)
+LEARNSET_SEPARATOR = "| - | - |\n"
+LEARNSET_INDEX_LINK = "[{}]({})\n\n".format
+
+HELD_ITEMS_TABLE = (
+    "| Pokemon | Item 1 | Item 2 |\n"
+    "|:--------|:-------|:-------|\n"
+)
+HELD_ITEMS_ROW = "| {} | {} | {} |\n".format
+
+CHANGES_CONTENTS = (
+    "## Contents\n\n"
+    "- [Polished Type Changes](#polished-type-changes)\n"
+    "- [Polished Evolution Changes](#polished-evolution-changes)\n"
+    "- [Polished Ability Changes](#polished-ability-changes)\n"
+    "- [Polished Base Stat Changes](#polished-base-stat-changes)\n"
+    "\n"
+)
+TYPE_CHANGES_TABLE = (
+    "## Polished Type Changes\n\n"
+    f"""| Pokemon                | {Mode.FAITHFUL.value} | {Mode.POLISHED.value} |\n"""
+    "|:-----------------------|:----------------------|:----------------------|\n"
+)
+TYPE_CHANGES_ROW = "| {} | {}              | {}              |\n".format
+EVOLUTION_CHANGES_TITLE = "## Polished Evolution Changes\n\n"
+ABILITY_CHANGES_TITLE = "## Polished Ability Changes\n\n"
+ABILITY_CHANGES_TABLE = (
+    "#### {}\n\n"
+    "| Version | Abilities       |\n"
+    "|:--------|:----------------|\n"
+).format
+STAT_CHANGES_TITLE = "## Polished Base Stat Changes\n\n"
+STAT_CHANGES_TABLE = (
+    "#### {}\n\n"
+    "| Version           | HP                    | Atk                    | Def                    | SAt                    | SDf                    | Speed                    |\n"
+    "|:------------------|:----------------------|:-----------------------|:-----------------------|:-----------------------|:-----------------------|:-------------------------|\n"
+).format
+STAT_CHANGES_ROW = "| {} | {} | {} | {} | {} | {} | {} |\n".format
+
+STAT_COLUMNS = ("HP", "Atk", "Def", "SAt", "SDf", "Speed")
+
+def page_slug(pokemon_name: str):
+    """Gets the wiki page name for a Pokemon. Ex - Farfetch'd (Galarian) is FarfetchdGalarian."""
+    return pokemon_name.replace("(", "").replace(')', '').replace("'", "").replace(" ", "")
+
+def evolution_table(column_titles: list):
+    """Gets the header of an evolution data table."""
+    return EVOLUTION_TABLE(" | ".join(column_titles), " |:- ".join("" for key in column_titles))
+
+def evolution_row(version: str, evo: dict, column_count: int):
+    """Gets an evolution data row, padded out for evolution methods with fewer columns."""
+    column_values = list(evo.values())
+    # Account for varying number of columns for different evolution methods.
+    column_values.extend("-" * (column_count - len(column_values)))
+    return TWO_COLUMN_ROW(version, " | ".join(column_values))
+
+@PROFILER.timed("render learnset pages")
+def generate_pokemon_learnset_page(pokemon_data: PokemonRecord, prev_pokemon_data: PokemonRecord, next_pokemon_data: PokemonRecord, teachable_moves_category: dict):
     """Generates a Pokemon's learnset page with base stats, abilities, evolution data, egg groups, and learnset."""
-    with open(pokemon_file, 'w') as md_file:
-        md_file.write(f"""&#8593;&nbsp;[Back to Pokemon Learnsets](Pokemon-Learnsets)\n\n""")
-
-        if prev_pokemon_data:
-            prev_link = f"""[{prev_pokemon_data["name"]}]({prev_pokemon_data["name"].replace("(", "").replace(')', '').replace("'", "").replace(" ", "")})"""
-            md_file.write(f"""&#8592;&nbsp;{prev_link}&nbsp;&nbsp;""")
-        if next_pokemon_data: 
-            next_link = f"""[{next_pokemon_data["name"]}]({next_pokemon_data["name"].replace("(", "").replace(')', '').replace("'", "").replace(" ", "")})"""
-            md_file.write(f"""{next_link}&nbsp;&#8594;""")
-        
-        md_file.write("\n")
-
-        md_file.write(f"""## {pokemon_data.get("name")}\n\n""")
-
-        # Type and stats info.
-        md_file.write(f"### Base Stats\n\n")
-        type_f = ", ".join(pokemon_data["type_faithful"])
-        type_p = "-"
-        stats_version_f = "-"
-        stats_version_p = "-"
-        bsts_f = pokemon_data["stats_faithful"]
-        bsts_p = {}
-        # Check if Pokemon has a different Polished type.
-        if pokemon_data["type_polished"]:
-            stats_version_f = Mode.FAITHFUL.value
-            stats_version_p = Mode.POLISHED.value
-            type_p = ", ".join(pokemon_data["type_polished"])
-        # Check if Pokemon has different Polished stats.
-        if pokemon_data["stats_polished"]:
-            stats_version_f = Mode.FAITHFUL.value
-            stats_version_p = Mode.POLISHED.value
-            bsts_p = pokemon_data["stats_polished"]
-
-        md_file.write(f"| Version           | Type     | HP                    | Atk                    | Def                    | SAt                    | SDf                    | Speed                    |\n")
-        md_file.write(f"|:------------------|:---------|:----------------------|:-----------------------|:-----------------------|:-----------------------|:-----------------------|:-------------------------|\n")
-        md_file.write(f"| {stats_version_f} | {type_f} | {bsts_f.get('HP', 0)} | {bsts_f.get('Atk', 0)} | {bsts_f.get('Def', 0)} | {bsts_f.get('SAt', 0)} | {bsts_f.get('SDf', 0)} | {bsts_f.get('Speed', 0)} |\n")
-        if pokemon_data["type_polished"] or pokemon_data["stats_polished"]:
-            md_file.write(f"| {stats_version_p} | {type_p} | {bsts_p.get('HP', '-')} | {bsts_p.get('Atk', '-')} | {bsts_p.get('Def', '-')} | {bsts_p.get('SAt', '-')} | {bsts_p.get('SDf', '-')} | {bsts_p.get('Speed', '-')} |\n")
-        md_file.write("\n")
-
-        # Ability info.
-        md_file.write(f"### Abilities\n\n")
-        ability_version_f = "-"
-        ability_version_p = "-"
-        abilities_f = ", ".join(pokemon_data["abilities_faithful"]).replace("_", " ").title()
-        abilities_p = []
-        # Check if Pokemon has different Polished abilities.
-        if pokemon_data["abilities_polished"]:
-            ability_version_f = Mode.FAITHFUL.value
-            ability_version_p = Mode.POLISHED.value
-            abilities_p = ", ".join(pokemon_data["abilities_polished"]).replace("_", " ").title()
-
-        md_file.write(f"| Version             | Abilities                  |\n")
-        md_file.write(f"|:--------------------|:---------------------------|\n")
-        md_file.write(f"| {ability_version_f} | {abilities_f} |\n")
-        if pokemon_data["abilities_polished"] != []:
-            md_file.write(f"| {ability_version_p} | {abilities_p} |\n")
-        md_file.write("\n")
-
-        # Evolution info.
-        evo_version_f = "-"
-        evo_version_p = "-"
-        # Check if Pokemon has different Polished evolution info.
-        if pokemon_data["evo_data_polished"]:
-            evo_version_f = Mode.FAITHFUL.value
-            evo_version_p = Mode.POLISHED.value
-
-        if pokemon_data["evo_data_faithful"]:
-            md_file.write(f"### Evolution Data\n\n")
-            column_titles = []
-            for evolution_method in pokemon_data["evo_data_faithful"]:
-                check_column_titles = [title.replace("_", " ").title() for title in evolution_method.keys()]
-                # Account for varying number of columns for different evolution methods.
-                if len(check_column_titles) > len(column_titles):
-                    column_titles = check_column_titles
-            md_file.write(f"| Version | {' | '.join(key for key in column_titles)} |\n")
-            md_file.write(f"|:--------|:- {' |:- '.join('' for key in column_titles)} |\n")
-
-        for evo in pokemon_data["evo_data_faithful"]:
-            column_values = [value for value in evo.values()]
-            # Account for varying number of columns for different evolution methods.
-            while len(column_values) < len(column_titles):
-                column_values.append("-")
-            md_file.write(f"| {evo_version_f} | {' | '.join(value for value in column_values)} |\n")
+    page = [LEARNSET_PAGE_TOP]
+    write = page.append
+
+    if prev_pokemon_data:
+        write(PREV_LINK(prev_pokemon_data.name, prev_pokemon_data.slug))
+    if next_pokemon_data:
+        write(NEXT_LINK(next_pokemon_data.name, next_pokemon_data.slug))
+
+    write(PAGE_TITLE(pokemon_data.name))
+
+    # Type and stats info.
+    type_f = ", ".join(TYPES.names(pokemon_data.type_faithful))
+    type_p = "-"
+    stats_version_f = "-"
+    stats_version_p = "-"
+    bsts_f = pokemon_data.stats_faithful
+    bsts_p = {}
+    # Check if Pokemon has a different Polished type.
+    if pokemon_data.type_polished:
+        stats_version_f = Mode.FAITHFUL.value
+        stats_version_p = Mode.POLISHED.value
+        type_p = ", ".join(TYPES.names(pokemon_data.type_polished))
+    # Check if Pokemon has different Polished stats.
+    if pokemon_data.stats_polished:
+        stats_version_f = Mode.FAITHFUL.value
+        stats_version_p = Mode.POLISHED.value
+        bsts_p = pokemon_data.stats_polished
+
+    write(BASE_STATS_TABLE)
+    write(BASE_STATS_ROW(stats_version_f, type_f, *(bsts_f.get(key, 0) for key in STAT_COLUMNS)))
+    if pokemon_data.type_polished or pokemon_data.stats_polished:
+        write(BASE_STATS_ROW(stats_version_p, type_p, *(bsts_p.get(key, "-") for key in STAT_COLUMNS)))
+    write("\n")
 
-        for evo in pokemon_data["evo_data_polished"]:
-            column_values = [value for value in evo.values()]
+    # Ability info.
+    ability_version_f = "-"
+    abilities_f = ", ".join(ABILITIES.names(pokemon_data.abilities_faithful)).replace("_", " ").title()
+    # Check if Pokemon has different Polished abilities.
+    if pokemon_data.abilities_polished:
+        ability_version_f = Mode.FAITHFUL.value
+
+    write(ABILITIES_TABLE)
+    write(TWO_COLUMN_ROW(ability_version_f, abilities_f))
+    if pokemon_data.abilities_polished:
+        abilities_p = ", ".join(ABILITIES.names(pokemon_data.abilities_polished)).replace("_", " ").title()
+        write(TWO_COLUMN_ROW(Mode.POLISHED.value, abilities_p))
+    write("\n")
+
+    # Evolution info.
+    evo_version_f = "-"
+    evo_version_p = "-"
+    # Check if Pokemon has different Polished evolution info.
+    if pokemon_data.evo_data_polished:
+        evo_version_f = Mode.FAITHFUL.value
+        evo_version_p = Mode.POLISHED.value
+
+    column_titles = []
+    if pokemon_data.evo_data_faithful:
+        for evolution_method in pokemon_data.evo_data_faithful:
             # Account for varying number of columns for different evolution methods.
-            while len(column_values) < len(column_titles):
-                column_values.append("-")
-            md_file.write(f"| {evo_version_p} | {' | '.join(value for value in column_values)} |\n")
-
-        md_file.write("\n")
-
-        # Egg groups.
-        if pokemon_data["egg_groups"] != []:
-            egg_groups = ", ".join(pokemon_data["egg_groups"])
-            md_file.write(f"### Egg Groups\n\n")
-            md_file.write(f"""{egg_groups}\n""")
-            md_file.write("\n")
-
-        # Learnset.
-        md_file.write("### Learnset\n\n")
-        md_file.write("| Level | Move |\n")
-        md_file.write("|--------|-------|\n")
-
-        if pokemon_data["unique_wild_moves"]:
-            for unique_wild_move in pokemon_data["unique_wild_moves"]:
-                md_file.write(f"""| {unique_wild_move["location"]} | {unique_wild_move["move"]} |\n""")
-            md_file.write(f"""| - | - |\n""")
-
-        if pokemon_data["evolution_move"]:
-            md_file.write(f"""| Evolve | {pokemon_data["evolution_move"]} |\n""")
-            pokemon_data["evolution_move"]
-            md_file.write(f"""| - | - |\n""")
-
-        if pokemon_data["level_up_moves"]:
-            for level, move in pokemon_data["level_up_moves"]:
-                md_file.write(f"""| {level} | {move} |\n""")
-
-        if pokemon_data["tm_hm_moves"]:
-            move_tutor_move = False
-
-            md_file.write(f"""| - | - |\n""")
-            for move in pokemon_data["tm_hm_moves"]:
-                current_category = teachable_moves_category[move]
-
-                # Write a separator between TMs / HMs and move tutor moves
-                if not move_tutor_move and "Move Tutor" in current_category:
-                    md_file.write(f"""| - | - |\n""")
-                    move_tutor_move = True
-
-                md_file.write(f"""| {current_category} | {move} |\n""")
-
-        if pokemon_data["egg_moves"]:
-            md_file.write(f"""| - | - |\n""")
-            for move in pokemon_data["egg_moves"]:
-                md_file.write(f"""| Egg Move | {move} |\n""")
-            md_file.write("\n")
-
-        # Write links to main learnset page.
-        link_text = f"""[{pokemon_data.get("name")}]({pokemon_data.get("name").replace("(", "").replace(')', '').replace("'", "").replace(" ", "")})"""
-        learnset_file.write(f"""{link_text}""")
-        learnset_file.write("\n\n")
-
-def generate_held_item_page(pokemon_data_list: list, held_item_file: str):
-    """Generates a page showing Pokemon that can carry a held item and what item(s) they hold."""
-    held_item_file.write(f"| Pokemon | Item 1 | Item 2 |\n")
-    held_item_file.write(f"|:--------|:-------|:-------|\n")
+            if len(evolution_method) > len(column_titles):
+                column_titles = [title.replace("_", " ").title() for title in evolution_method.keys()]
+        write(EVOLUTION_DATA_TITLE)
+        write(evolution_table(column_titles))
 
-    for pokemon_data in pokemon_data_list:
-        held_item_one = pokemon_data.get("held_items", "No Item")[0]
-        held_item_two = pokemon_data.get("held_items", "No Item")[1]
-        if "No Item" not in held_item_one or "No Item" not in held_item_two:
-            held_item_file.write(f"""| {pokemon_data.get("name")} | {held_item_one} | {held_item_two} |\n""")
-
-    held_item_file.write("\n")
-
-def generate_polished_changes_page(pokemon_data_list: list, changes_file: str):
-    """Generates a page showing the differences in the Faithful vs Polished roms."""
-    # Table of Contents.
-    changes_file.write(f"""## Contents\n\n""")
-    changes_file.write(f"""- [Polished Type Changes](#polished-type-changes)\n""")
-    changes_file.write(f"""- [Polished Evolution Changes](#polished-evolution-changes)\n""")
-    changes_file.write(f"""- [Polished Ability Changes](#polished-ability-changes)\n""")
-    changes_file.write(f"""- [Polished Base Stat Changes](#polished-base-stat-changes)\n""")
-    changes_file.write("\n")
-
-    # Type changes.
-    changes_file.write(f"""## Polished Type Changes\n\n""")
-    changes_file.write(f"""| Pokemon                | {Mode.FAITHFUL.value} | {Mode.POLISHED.value} |\n""")
-    changes_file.write(f"""|:-----------------------|:----------------------|:----------------------|\n""")
-    for pokemon_data in pokemon_data_list:
-        if pokemon_data["type_polished"]:
-            type_f = ", ".join(pokemon_data["type_faithful"])
-            type_p = ", ".join(pokemon_data["type_polished"])
-            changes_file.write(f"""| {pokemon_data["name"]} | {type_f}              | {type_p}              |\n""")
-    changes_file.write("\n")
-
-    # Evolution changes.
-    changes_file.write(f"## Polished Evolution Changes\n\n")
-    for pokemon_data in pokemon_data_list:
-        if pokemon_data["evo_data_polished"]:
-            column_titles = [title.replace("_", " ").title() for title in pokemon_data["evo_data_faithful"][0].keys()]
-            changes_file.write(f"| Version | {' | '.join(key for key in column_titles)} |\n")
-            changes_file.write(f"|:--------|:- {' |:- '.join('' for key in column_titles)} |\n")
+    for evo in pokemon_data.evo_data_faithful:
+        write(evolution_row(evo_version_f, evo, len(column_titles)))
+    for evo in pokemon_data.evo_data_polished:
+        write(evolution_row(evo_version_p, evo, len(column_titles)))
+    write("\n")
 
-            for evo in pokemon_data["evo_data_faithful"]:
-                column_values = [value for value in evo.values()]
-                changes_file.write(f"| {Mode.FAITHFUL.value} | {' | '.join(value for value in column_values)} |\n")
+    # Egg groups.
+    if pokemon_data.egg_groups:
+        write(EGG_GROUPS(", ".join(pokemon_data.egg_groups)))
 
-            for evo in pokemon_data["evo_data_polished"]:
-                column_values = [value for value in evo.values()]
-                changes_file.write(f"| {Mode.POLISHED.value} | {' | '.join(value for value in column_values)} |\n")
-    changes_file.write("\n")
+    # Learnset.
+    write(LEARNSET_TABLE)
 
-    # Ability info.
-    changes_file.write(f"## Polished Ability Changes\n\n")
-    for pokemon_data in pokemon_data_list:
-        if pokemon_data["abilities_polished"]:
-            changes_file.write(f"""#### {pokemon_data.get("name")}\n\n""")
-            changes_file.write(f"| Version | Abilities       |\n")
-            changes_file.write(f"|:--------|:----------------|\n")
-            abilities_f = ", ".join(pokemon_data["abilities_faithful"]).replace("_", " ").title()
-            abilities_p = ", ".join(pokemon_data["abilities_polished"]).replace("_", " ").title()
-            changes_file.write(f"| {Mode.FAITHFUL.value} | {abilities_f} |\n")
-            changes_file.write(f"| {Mode.POLISHED.value} | {abilities_p} |\n")
-            changes_file.write("\n")
-
-    changes_file.write("\n")
-
-    # Base stat changes.
-    changes_file.write(f"""## Polished Base Stat Changes\n\n""")
-    for pokemon_data in pokemon_data_list:
-        if pokemon_data["stats_polished"]:
-            changes_file.write(f"""#### {pokemon_data.get("name")}\n\n""")
-            changes_file.write(f"| Version           | HP                    | Atk                    | Def                    | SAt                    | SDf                    | Speed                    |\n")
-            changes_file.write(f"|:------------------|:----------------------|:-----------------------|:-----------------------|:-----------------------|:-----------------------|:-------------------------|\n")
+    if pokemon_data.unique_wild_moves:
+        for unique_wild_move in pokemon_data.unique_wild_moves:
+            write(TWO_COLUMN_ROW(unique_wild_move["location"], unique_wild_move["move"]))
+        write(LEARNSET_SEPARATOR)
 
-            bsts_f = pokemon_data["stats_faithful"]
-            bsts_p = pokemon_data["stats_polished"]
-            bsts_p = {key: "-" if bsts_f[key] == bsts_p[key] else bsts_p[key] for key in bsts_f}
+    if pokemon_data.evolution_move:
+        write(TWO_COLUMN_ROW("Evolve", pokemon_data.evolution_move))
+        write(LEARNSET_SEPARATOR)
 
-            changes_file.write(f"| {Mode.FAITHFUL.value} | {bsts_f.get('HP', 0)} | {bsts_f.get('Atk', 0)} | {bsts_f.get('Def', 0)} | {bsts_f.get('SAt', 0)} | {bsts_f.get('SDf', 0)} | {bsts_f.get('Speed', 0)} |\n")
-            changes_file.write(f"| {Mode.POLISHED.value} | {bsts_p.get('HP', '-')} | {bsts_p.get('Atk', '-')} | {bsts_p.get('Def', '-')} | {bsts_p.get('SAt', '-')} | {bsts_p.get('SDf', '-')} | {bsts_p.get('Speed', '-')} |\n")
-            changes_file.write("\n")
+    for level, move in zip(pokemon_data.level_up_levels, MOVES.names(pokemon_data.level_up_moves)):
+        write(TWO_COLUMN_ROW(level, move))
 
-    changes_file.write("\n")
+    if pokemon_data.tm_hm_moves:
+        move_tutor_move = False
 
+        write(LEARNSET_SEPARATOR)
+        for move in MOVES.names(pokemon_data.tm_hm_moves):
+            current_category = teachable_moves_category[move]
 
-if __name__ == "__main__":
-    # Read TMs, HMs, and move tutor.
-    tmhm_file = find_asm_file("../polishedcrystal/data/moves/", "tmhm_moves.asm")
-    teachable_moves_category = parse_teachable_moves_by_category(tmhm_file)
-
-    # Read Johto Pokedex.
-    johto_dex_file = find_asm_file("../polishedcrystal/data/pokemon/", "dex_order_new.asm")
-    johto_dex = parse_johto_dex(johto_dex_file)
-
-    # Find Pokemon base stat files.
-    pokemon_asms = extract_base_stat_asm_filenames("../polishedcrystal/data/pokemon/base_stats.asm")
-
-    # Create list of Pokemon data dicts.
-    default_pokemon_data = {
-        "name" : "",
-        "egg_moves_name" : "",
-        "evo_attacks_name" : "",
-        "type_faithful": [],
-        "type_polished": [],
-        "abilities_faithful": [],
-        "abilities_polished": [],
-        "stats_faithful": {},
-        "stats_polished": {},
-        "held_items": [],
-        "egg_groups": [],
-        "evo_data_faithful": {},
-        "evo_data_polished": {},
-        "unique_wild_moves": [],
-        "evolution_move": "",
-        "level_up_moves": [],
-        "egg_moves": [],
-        "tm_hm_moves": [],
-    }
-    pokemon_data_list = [default_pokemon_data.copy() for asm in pokemon_asms]
+            # Write a separator between TMs / HMs and move tutor moves
+            if not move_tutor_move and "Move Tutor" in current_category:
+                write(LEARNSET_SEPARATOR)
+                move_tutor_move = True
 
-    # Associates Dex list with base stat file.
-    dex_order_base_stat_files = order_base_stat_files_by_dex(johto_dex, pokemon_asms)
+            write(TWO_COLUMN_ROW(current_category, move))
 
-    # Read level up moves and evolution methods.
-    evos_attacks_file = find_asm_file("../polishedcrystal/data/pokemon/", "evos_attacks.asm")
-    evos_attacks = parse_evos_attacks(evos_attacks_file)
+    if pokemon_data.egg_moves:
+        write(LEARNSET_SEPARATOR)
+        for move in MOVES.names(pokemon_data.egg_moves):
+            write(TWO_COLUMN_ROW("Egg Move", move))
+        write("\n")
 
-    # Read egg moves.
-    egg_moves_file = find_asm_file("../polishedcrystal/data/pokemon/", "egg_moves.asm")
-    egg_moves = parse_egg_moves(egg_moves_file)
+    return "".join(page)
 
-    # Read evolution moves.
-    evolution_moves_file = find_asm_file("../polishedcrystal/data/pokemon/", "evolution_moves.asm")
-    evolution_moves = parse_evolution_moves(evolution_moves_file)
+class SummarySink(ABC):
+    """One section of a summary page. It's fed every Pokemon in dex order and buffers its own rows."""
+    header = ""
+    footer = "\n"
 
-    # Read unique wild moves.
-    uniqe_wild_moves_file = find_asm_file("../polishedcrystal/data/pokemon/", "unique_wild_moves.asm")
-    unique_wild_moves = parse_unique_wild_moves(uniqe_wild_moves_file)
+    def __init__(self):
+        self.page = [self.header]
+        self.write = self.page.append
 
-    # Collate all relevant Pokemon data for the learnset pages.
-    evolutions_egg_moves = []
-    for base_stat_file, pokemon_data in zip(dex_order_base_stat_files, pokemon_data_list):
-        # Remove ".asm" extension.
-        pokemon_file = find_asm_file("../polishedcrystal/data/pokemon/base_stats", f"{base_stat_file}")
-        name_without_ext = os.path.splitext(base_stat_file)[0]
+    @abstractmethod
+    def add(self, pokemon_data: PokemonRecord):
+        """Adds a Pokemon's rows, if it has any in this section."""
+
+    def render(self):
+        """Gets the finished section."""
+        return "".join(self.page) + self.footer
+
+class LearnsetIndexSink(SummarySink):
+    """Links to every Pokemon's learnset page."""
+    footer = ""
 
-        # Get display name, egg move name, and evo attack name.
-        pokemon_data["name"], pokemon_data["egg_moves_name"], pokemon_data["evo_attacks_name"] = get_pokemon_names_for_files(name_without_ext)
-        print(f"""pokemon names: { pokemon_data["name"]} {pokemon_data["egg_moves_name"]} {pokemon_data["evo_attacks_name"]}""")
-
-        # Collect Pokemon data from base stat .asm file.
-        pokemon_data = parse_pokemon_data(pokemon_file, pokemon_data)
-
-        if pokemon_data["evo_attacks_name"] in evos_attacks:
-            pokemon_data["evo_data_faithful"] = evos_attacks[pokemon_data["evo_attacks_name"]]["evo_data_faithful"]
-            pokemon_data["evo_data_polished"] = evos_attacks[pokemon_data["evo_attacks_name"]]["evo_data_polished"]
-            pokemon_data["level_up_moves"] = evos_attacks[pokemon_data["evo_attacks_name"]]["moves"]
-
-        if pokemon_data["evo_attacks_name"] in evolution_moves:
-            pokemon_data["evolution_move"] = evolution_moves[pokemon_data["evo_attacks_name"]]
-
-        if pokemon_data["evo_attacks_name"] in unique_wild_moves:
-            pokemon_data["unique_wild_moves"] = unique_wild_moves[pokemon_data["evo_attacks_name"]]
-
-        if pokemon_data["egg_moves_name"] in egg_moves:
-            pokemon_data["egg_moves"] = egg_moves[pokemon_data["egg_moves_name"]]
-            # Check if this has an evolution that needs egg moves carried over.
-            for evolution_data in pokemon_data["evo_data_faithful"]:
-                save_egg_moves = (f"""{evolution_data["evolution"]}{evolution_data.get("form", "").split(" ")[0]}""", egg_moves[pokemon_data["egg_moves_name"]])
-                # Don't double save if a Pokemon has multiple evolution methods for the same evolution. Ex - Eeevee.
-                if save_egg_moves not in evolutions_egg_moves:
-                    evolutions_egg_moves.append(save_egg_moves)
-
-        # Check if this is an evolution that needs egg moves from the previous evolution carried over.
-        for load_egg_moves in evolutions_egg_moves:
-            if load_egg_moves[0] in pokemon_data["evo_attacks_name"]:
-                pokemon_data["egg_moves"] = load_egg_moves[1]
-                # Check if Pokemon has an evolution and carry over egg moves.
-                for evolution_data in pokemon_data["evo_data_faithful"]:
-                    save_egg_moves = (f"""{evolution_data["evolution"]}{evolution_data.get("form", "").split(" ")[0]}""", load_egg_moves[1])
-                    # Don't double save if a Pokemon has multiple evolution methods for the same evolution. Ex - Eeevee.
-                    if save_egg_moves not in evolutions_egg_moves:
-                        evolutions_egg_moves.append(save_egg_moves)
+    def add(self, pokemon_data: PokemonRecord):
+        self.write(LEARNSET_INDEX_LINK(pokemon_data.name, pokemon_data.slug))
+
+class HeldItemsSink(SummarySink):
+    """Pokemon that can carry a held item and what item(s) they hold."""
+    header = HELD_ITEMS_TABLE
+
+    def add(self, pokemon_data: PokemonRecord):
+        held_item_one = pokemon_data.held_items[0]
+        held_item_two = pokemon_data.held_items[1]
+        if "No Item" not in held_item_one or "No Item" not in held_item_two:
+            self.write(HELD_ITEMS_ROW(pokemon_data.name, held_item_one, held_item_two))
+
+class TypeChangesSink(SummarySink):
+    """Pokemon with a different type in Polished."""
+    header = TYPE_CHANGES_TABLE
+
+    def add(self, pokemon_data: PokemonRecord):
+        if pokemon_data.type_polished:
+            type_f = ", ".join(TYPES.names(pokemon_data.type_faithful))
+            type_p = ", ".join(TYPES.names(pokemon_data.type_polished))
+            self.write(TYPE_CHANGES_ROW(pokemon_data.name, type_f, type_p))
+
+class EvolutionChangesSink(SummarySink):
+    """Pokemon that evolve differently in Polished."""
+    header = EVOLUTION_CHANGES_TITLE
+
+    def add(self, pokemon_data: PokemonRecord):
+        if pokemon_data.evo_data_polished:
+            column_titles = [title.replace("_", " ").title() for title in pokemon_data.evo_data_faithful[0].keys()]
+            self.write(evolution_table(column_titles))
+
+            for evo in pokemon_data.evo_data_faithful:
+                self.write(TWO_COLUMN_ROW(Mode.FAITHFUL.value, " | ".join(evo.values())))
+            for evo in pokemon_data.evo_data_polished:
+                self.write(TWO_COLUMN_ROW(Mode.POLISHED.value, " | ".join(evo.values())))
+
+class AbilityChangesSink(SummarySink):
+    """Pokemon with different abilities in Polished."""
+    header = ABILITY_CHANGES_TITLE
+
+    def add(self, pokemon_data: PokemonRecord):
+        if pokemon_data.abilities_polished:
+            abilities_f = ", ".join(ABILITIES.names(pokemon_data.abilities_faithful)).replace("_", " ").title()
+            abilities_p = ", ".join(ABILITIES.names(pokemon_data.abilities_polished)).replace("_", " ").title()
+            self.write(ABILITY_CHANGES_TABLE(pokemon_data.name))
+            self.write(TWO_COLUMN_ROW(Mode.FAITHFUL.value, abilities_f))
+            self.write(TWO_COLUMN_ROW(Mode.POLISHED.value, abilities_p))
+            self.write("\n")
+
+class StatChangesSink(SummarySink):
+    """Pokemon with different base stats in Polished. Unchanged stats are shown as -."""
+    header = STAT_CHANGES_TITLE
+
+    def add(self, pokemon_data: PokemonRecord):
+        if pokemon_data.stats_polished:
+            bsts_f = pokemon_data.stats_faithful
+            bsts_p = pokemon_data.stats_polished
+            bsts_p = {key: "-" if bsts_f[key] == bsts_p[key] else bsts_p[key] for key in bsts_f}
 
+            self.write(STAT_CHANGES_TABLE(pokemon_data.name))
+            self.write(STAT_CHANGES_ROW(Mode.FAITHFUL.value, *(bsts_f.get(key, 0) for key in STAT_COLUMNS)))
+            self.write(STAT_CHANGES_ROW(Mode.POLISHED.value, *(bsts_p.get(key, "-") for key in STAT_COLUMNS)))
+            self.write("\n")
+
+# Level up moves only in one ROM are interned with the ROM in parentheses. Ex - Magical Leaf (Polished).
+MODE_TAG_PATTERN = re.compile(r"^(.*) \((Faithful|Polished)\)$")
+EVOLUTION_FIELDS = ("type", "method", "evolution", "form", "time_of_day", "evolve_stat")
+
+def rom_views(pokemon_data: PokemonRecord):
+    """Gets (mode, stats, types, abilities) for each ROM, with types and abilities as names.
+
+    The records only keep a Polished stats, type, or abilities entry when it differs, so Polished falls back to Faithful.
+    """
+    return [
+        (Mode.FAITHFUL, pokemon_data.stats_faithful, TYPES.names(pokemon_data.type_faithful), ABILITIES.names(pokemon_data.abilities_faithful)),
+        (Mode.POLISHED, pokemon_data.stats_polished or pokemon_data.stats_faithful, TYPES.names(pokemon_data.type_polished or pokemon_data.type_faithful), ABILITIES.names(pokemon_data.abilities_polished or pokemon_data.abilities_faithful)),
+    ]
+
+def evolution_entries(pokemon_data: PokemonRecord):
+    """Gets a Pokemon's evolutions as (mode, evolution data). Same as the pages, they're only split by ROM when Polished has its own list."""
+    if not pokemon_data.evo_data_polished:
+        return [(pokemon_db.BOTH, evo) for evo in pokemon_data.evo_data_faithful]
+    return [(Mode.FAITHFUL.value, evo) for evo in pokemon_data.evo_data_faithful] + [(Mode.POLISHED.value, evo) for evo in pokemon_data.evo_data_polished]
+
+def learnset_entries(pokemon_data: PokemonRecord, teachable_moves_category: dict):
+    """Gets a Pokemon's learnset as (move, method, level, detail, mode) in page order."""
+    learnset = [(unique_wild_move["move"], "wild", None, unique_wild_move["location"], pokemon_db.BOTH) for unique_wild_move in pokemon_data.unique_wild_moves]
+    if pokemon_data.evolution_move:
+        learnset.append((pokemon_data.evolution_move, "evolution", None, None, pokemon_db.BOTH))
+    for level, move in zip(pokemon_data.level_up_levels, MOVES.names(pokemon_data.level_up_moves)):
+        match = MODE_TAG_PATTERN.match(move)
+        learnset.append((match.group(1), "level", level, None, match.group(2)) if match else (move, "level", level, None, pokemon_db.BOTH))
+    # Only the Polished TM/HM learnset is parsed.
+    for move in MOVES.names(pokemon_data.tm_hm_moves):
+        category = teachable_moves_category[move]
+        method = "tutor" if category == "Move Tutor" else category[:2].lower()
+        learnset.append((move, method, None, category, Mode.POLISHED.value))
+    learnset += [(move, "egg", None, None, pokemon_db.BOTH) for move in MOVES.names(pokemon_data.egg_moves)]
+    return learnset
+
+@PROFILER.timed("export database")
+def export_pokemon_db(db_file: str, pokemon_data_list: list, teachable_moves_category: dict):
+    """Writes the collated Pokemon to a SQLite database that pokemon_db.py can query. See pokemon_db.SCHEMA for the tables."""
+    tables = {"pokemon": [], "stats": [], "types": [], "abilities": [], "evolutions": [], "moves": [], "learnset": []}
+    move_ids = {}
+
+    def move_id(move: str):
+        if move not in move_ids:
+            move_ids[move] = len(move_ids) + 1
+            tables["moves"].append((move_ids[move], move))
+        return move_ids[move]
+
+    for pokemon_id, pokemon_data in enumerate(pokemon_data_list, 1):
+        held_items = pokemon_data.held_items + [None] * (2 - len(pokemon_data.held_items))
+        tables["pokemon"].append((pokemon_id, pokemon_id, pokemon_data.name, pokemon_data.slug, held_items[0], held_items[1], ", ".join(pokemon_data.egg_groups)))
+
+        for mode, stats, types, abilities in rom_views(pokemon_data):
+            if stats:
+                tables["stats"].append((pokemon_id, mode.value, *(stats.get(key) for key in STAT_COLUMNS)))
+            tables["types"] += [(pokemon_id, mode.value, slot, type_name) for slot, type_name in enumerate(types)]
+            tables["abilities"] += [(pokemon_id, mode.value, slot, ability.replace("_", " ").title()) for slot, ability in enumerate(abilities)]
+
+        for slot, (mode, evo) in enumerate(evolution_entries(pokemon_data)):
+            tables["evolutions"].append((pokemon_id, mode, slot, *(evo.get(key) for key in EVOLUTION_FIELDS)))
+
+        tables["learnset"] += [(pokemon_id, move_id(move), method, level, detail, mode, slot) for slot, (move, method, level, detail, mode) in enumerate(learnset_entries(pokemon_data, teachable_moves_category))]
+
+    # Build the database next to the old one and swap it in, so readers never see a half written export.
+    with atomic_write(db_file) as temp_file:
+        connection = sqlite3.connect(temp_file)
+        try:
+            connection.executescript(pokemon_db.SCHEMA)
+            for table, rows in tables.items():
+                if rows:
+                    connection.executemany(f"""INSERT INTO {table} VALUES ({", ".join("?" * len(rows[0]))})""", rows)
+            connection.commit()
+        finally:
+            connection.close()
+
+@PROFILER.timed("write snapshot")
+def write_snapshot(snapshot_file: str, pokemon_data_list: list, teachable_moves_category: dict):
+    """Writes the collated Pokemon to a snapshot that pokemon_snapshot.py can compare against other runs."""
+    snapshot = {"version": pokemon_snapshot.SNAPSHOT_VERSION, "pokemon": {}}
+    for dex_order, pokemon_data in enumerate(pokemon_data_list, 1):
+        entry = {"name": pokemon_data.name, "dex": dex_order, "held_items": pokemon_data.held_items, "egg_groups": pokemon_data.egg_groups}
+        for mode, stats, types, abilities in rom_views(pokemon_data):
+            entry[mode.value] = {"stats": stats or {}, "types": types, "abilities": [ability.replace("_", " ").title() for ability in abilities]}
+        entry["evolutions"] = [[mode, evo] for mode, evo in evolution_entries(pokemon_data)]
+        entry["learnset"] = [list(learnset_entry) for learnset_entry in learnset_entries(pokemon_data, teachable_moves_category)]
+        snapshot["pokemon"][pokemon_data.slug] = entry
+    pokemon_snapshot.save_snapshot(snapshot_file, snapshot)
+
+def export_collated_data(args, pokemon_data_list: list, teachable_moves_category: dict):
+    """Writes the --export-db database and --snapshot file, if they were asked for."""
+    if args.export_db:
+        export_pokemon_db(args.export_db, pokemon_data_list, teachable_moves_category)
+    if args.snapshot:
+        write_snapshot(args.snapshot, pokemon_data_list, teachable_moves_category)
+
+def manifest_file_for_output(cache_dir: str, output_dir: str):
+    """Gets the page manifest path for an output folder, kept with the cache so it stays out of the wiki repo."""
+    output_key = hashlib.sha256(os.path.abspath(output_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, "manifests", f"""{output_key}.json""")
+
+class PageWriter:
+    """Writes generated pages, skipping the ones that haven't changed since the previous run.
+
+    With writers, pages are handed to that many threads through a queue of at most queue_depth pages, so rendering
+    carries on while earlier pages are hashed and written. Rendering waits whenever the queue is full.
+
+    Used as a context manager, a run that fails before finish is aborted so no writer threads are left behind.
+    """
+
+    def __init__(self, output_dir: str, manifest_file: str, writers: int = 0, queue_depth: int = 64):
+        self.output_dir = output_dir
+        self.manifest_file = manifest_file
+        self.manifest = {}
+        self.report = {"added": [], "changed": [], "unchanged": [], "removed": []}
+        try:
+            with open(manifest_file, 'r') as file:
+                self.previous_manifest = json.load(file)
+        except (OSError, ValueError):
+            self.previous_manifest = {}
+        self.start_writers(writers, queue_depth)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error is not None:
+            self.abort(error)
+        return False
+
+    def start_writers(self, writers: int, queue_depth: int):
+        """Starts the writer threads, if there are any."""
+        self.lock = threading.Lock()
+        self.errors = []
+        self.queue = None
+        self.threads = []
+        if writers:
+            self.queue = queue.Queue(maxsize=queue_depth)
+            self.threads = [threading.Thread(target=self.write_queued_pages, daemon=True) for _ in range(writers)]
+            for thread in self.threads:
+                thread.start()
+
+    @PROFILER.timed("write pages")
+    def write_page(self, page_name: str, contents: str):
+        """Writes a page, or queues it for the writer threads if there are any."""
+        PROFILER.counts["pages_rendered"] += 1
+        if self.queue is None:
+            self.save_page(page_name, contents)
+        else:
+            self.queue.put((page_name, contents))
+
+    def write_queued_pages(self):
+        """Writes pages from the queue until it gets None. Runs in each writer thread."""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.save_page(*item)
+            except Exception as error:
+                # Errors are raised in the main thread by flush, so the pages behind a failed one still get written.
+                with self.lock:
+                    self.errors.append(error)
+            finally:
+                self.queue.task_done()
+
+    def save_page(self, page_name: str, contents: str):
+        """Writes a page if its contents differ from the last run or the file was changed outside of this script."""
+        data = contents.encode()
+        page_hash = hashlib.sha256(data).hexdigest()
+        page_file = os.path.join(self.output_dir, page_name)
+        previous = self.previous_manifest.get(page_name)
+
+        # The recorded size and mtime catch pages edited or deleted by hand since the last run.
+        if previous and previous["hash"] == page_hash:
+            try:
+                stat = os.stat(page_file)
+                if stat.st_size == previous["size"] and stat.st_mtime_ns == previous["mtime_ns"]:
+                    with self.lock:
+                        self.manifest[page_name] = previous
+                        self.report["unchanged"].append(page_name)
+                    return
+            except OSError:
+                pass
+
+        with atomic_write(page_file) as temp_file, open(temp_file, 'wb') as file:
+            file.write(data)
+
+        stat = os.stat(page_file)
+        with self.lock:
+            self.report["changed" if previous else "added"].append(page_name)
+            self.manifest[page_name] = {"hash": page_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            PROFILER.counts["pages_written"] += 1
+
+    def flush(self):
+        """Waits until every queued page is written, then raises the first error a writer thread hit."""
+        if self.queue is not None:
+            self.queue.join()
+        if self.errors:
+            raise self.errors[0]
+
+    @PROFILER.timed("write pages")
+    def finish(self, partial: bool = False):
+        """Saves the manifest for the next run and returns which pages were added, changed, removed, or unchanged.
+
+        A partial run only rendered some of the pages, so the rest keep their entries instead of being reported as removed.
+        """
+        try:
+            self.flush()
+        finally:
+            self.stop_writers()
+
+        if partial:
+            for page_name, previous in self.previous_manifest.items():
+                self.manifest.setdefault(page_name, previous)
+        # Pages from the last run that weren't generated this time belong to Pokemon that no longer exist.
+        self.report["removed"] = sorted(page_name for page_name in self.previous_manifest if page_name not in self.manifest)
+        # Writer threads finish in any order, so sort the lists to keep the report the same between runs.
+        for page_names in self.report.values():
+            page_names.sort()
+
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        with atomic_write(self.manifest_file) as temp_file, open(temp_file, 'w') as file:
+            json.dump(self.manifest, file, indent=1, sort_keys=True)
+
+        return self.report
+
+    def stop_writers(self):
+        """Tells the writer threads to stop once the queue is empty and waits for them."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def abort(self, error: BaseException):
+        """Stops the writer threads after a failed run, dropping the pages still queued. The manifest isn't saved."""
+        if self.threads:
+            # Pages nobody picked up yet are dropped so the writers get to the stop signal right away.
+            try:
+                while True:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+            except queue.Empty:
+                pass
+        self.stop_writers()
+
+# Archive types --archive can write, by file extension.
+ARCHIVE_TYPES = (".zip", ".tar.gz", ".tgz")
+
+class ArchiveWriter(PageWriter):
+    """Streams generated pages straight into a .zip or .tar.gz archive instead of writing loose files.
+
+    Every page goes into the archive since there's nothing on disk to compare against. With writers, a single thread
+    compresses pages while the next ones render, so the archive members stay in render order.
+    """
+
+    def __init__(self, archive_file: str, writers: int = 0, queue_depth: int = 64):
+        self.archive_file = archive_file
+        self.report = {"added": [], "changed": [], "unchanged": [], "removed": []}
+        self.date_time = time.localtime()
+        # Build the archive next to the old one and swap it in when finish closes the stack, same as the pages.
+        self.exit_stack = ExitStack()
+        temp_file = self.exit_stack.enter_context(atomic_write(archive_file))
+        if archive_file.endswith(".zip"):
+            self.archive = zipfile.ZipFile(temp_file, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = tarfile.open(temp_file, 'w:gz')
+        self.start_writers(min(writers, 1), queue_depth)
+
+    def save_page(self, page_name: str, contents: str):
+        """Adds a page to the archive."""
+        data = contents.encode()
+        if isinstance(self.archive, zipfile.ZipFile):
+            info = zipfile.ZipInfo(page_name, self.date_time[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            self.archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(page_name)
+            info.size = len(data)
+            info.mtime = time.mktime(self.date_time)
+            info.mode = 0o644
+            self.archive.addfile(info, io.BytesIO(data))
+
+        with self.lock:
+            self.report["added"].append(page_name)
+            PROFILER.counts["pages_written"] += 1
+
+    @PROFILER.timed("write pages")
+    def finish(self, partial: bool = False):
+        """Closes the archive and moves it into place. Only the pages that were rendered are in it."""
+        with self.exit_stack:
+            try:
+                self.flush()
+            finally:
+                self.stop_writers()
+                self.archive.close()
+        return self.report
+
+    def abort(self, error: BaseException):
+        """Stops the writer threads and closes the archive, leaving any earlier archive in place of the half written one."""
+        try:
+            super().abort(error)
+            self.archive.close()
+        finally:
+            # Passing the error on makes atomic_write remove the temporary file instead of moving it into place.
+            self.exit_stack.__exit__(type(error), error, error.__traceback__)
+
+def print_page_report(report: dict):
+    """Prints how many pages a run added, changed, removed, or left alone."""
+    print(f"""Pages: {len(report["added"])} added, {len(report["changed"])} changed, {len(report["removed"])} removed, {len(report["unchanged"])} unchanged.""")
+    if report["removed"]:
+        print(f"""Orphaned pages for Pokemon that no longer exist: {", ".join(report["removed"])}""")
+
+LEARNSET_INDEX_PAGE = "Pokemon-Learnsets.md"
+HELD_ITEMS_PAGE = "Wild-Held-Items.md"
+CHANGES_PAGE = "Pokemon-Type,-Evolution,-Ability,-and-Stat-Changes.md"
+
+# Each summary page is its fixed top followed by the sections its sinks build. A new summary page only needs an entry
+# here, since every sink is fed from the same walk over the Pokemon.
+SUMMARY_PAGES = {
+    LEARNSET_INDEX_PAGE: ("", (LearnsetIndexSink,)),
+    # TODO The online wiki added text to the top of the held items page. Every time this script runs it will overwrite
+    #      the file with only the parsed information, so make sure to double check changes.
+    HELD_ITEMS_PAGE: ("", (HeldItemsSink,)),
+    CHANGES_PAGE: (CHANGES_CONTENTS, (TypeChangesSink, EvolutionChangesSink, AbilityChangesSink, StatChangesSink)),
+}
+
+def summary_sinks(page_names=None):
+    """Gets new sinks for every summary page, or only the ones in page_names, by page name."""
+    return {page_name: [sink() for sink in page_sinks] for page_name, (_, page_sinks) in SUMMARY_PAGES.items() if page_names is None or page_name in page_names}
+
+def render_summary_sinks(sinks: dict):
+    """Gets the finished summary pages from their sinks, by page name."""
+    return {page_name: SUMMARY_PAGES[page_name][0] + "".join(sink.render() for sink in page_sinks) for page_name, page_sinks in sinks.items()}
+
+@PROFILER.timed("render summary pages")
+def generate_summary_pages(pokemon_data_list: list, page_names=None):
+    """Generates the summary pages in one pass over the Pokemon. If page_names is given, only those pages are generated."""
+    sinks = summary_sinks(page_names)
+    every_sink = [sink for page_sinks in sinks.values() for sink in page_sinks]
+    for pokemon_data in pokemon_data_list:
+        for sink in every_sink:
+            sink.add(pokemon_data)
+    return render_summary_sinks(sinks)
+
+# Which pages --pages can pick. Learnsets covers every Pokemon's page and the index linking them.
+PAGE_TYPES = ("learnsets", "held-items", "changes")
+
+DEFAULT_SOURCE_DIR = "../polishedcrystal"
+BASE_STATS_DIR = os.path.join("pokemon", "base_stats")
+WATCHED_DIRS = ["pokemon", "moves"]
+
+# The files every page is built from, as (name used in the script, folder under data, file name, parser).
+SOURCE_TABLES = [
+    ("teachable_moves", "moves", "tmhm_moves.asm", parse_teachable_moves_by_category),
+    ("johto_dex", "pokemon", "dex_order_new.asm", parse_johto_dex),
+    ("base_stats", "pokemon", "base_stats.asm", extract_base_stat_asm_filenames),
+    ("evos_attacks", "pokemon", "evos_attacks.asm", parse_evos_attacks),
+    ("egg_moves", "pokemon", "egg_moves.asm", parse_egg_moves),
+    ("evolution_moves", "pokemon", "evolution_moves.asm", parse_evolution_moves),
+    ("unique_wild_moves", "pokemon", "unique_wild_moves.asm", parse_unique_wild_moves),
+]
+
+# The big tables that are read as a LabelTable a block at a time, as parser: (label suffix, label after the last block).
+LABEL_TABLES = {
+    parse_evos_attacks: ("EvosAttacks", "EggEvosAttacks"),
+    parse_egg_moves: ("EggMoves", "NoEggMoves"),
+}
+
+# Each evos_attacks.asm block lists its evolutions first, ending with this line before the level up moves.
+EVOLUTIONS_END_PATTERN = re.compile(rb"^[ \t]*db -1\b", re.MULTILINE)
+
+def evolutions_by_label(evos_attacks):
+    """Gets every Pokemon's evolution data from the parsed evos_attacks.asm, by label.
+
+    Read as a LabelTable, only the evolutions at the top of each block are parsed, not the level up moves.
+    """
+    if isinstance(evos_attacks, LabelTable):
+        return evos_attacks.parse_heads(EVOLUTIONS_END_PATTERN)
+    return evos_attacks
+
+# The first db line of an egg_moves.asm block is its first egg move, or $ff when it has none.
+FIRST_EGG_MOVE_PATTERN = re.compile(rb"^[ \t]*db[ \t]+([^\s;]+)", re.MULTILINE)
+
+def has_egg_moves(egg_moves, label: str):
+    """Checks if a label in the parsed egg_moves.asm has any egg moves. Read as a LabelTable, the block isn't parsed."""
+    if label not in egg_moves:
+        return False
+    if isinstance(egg_moves, LabelTable):
+        match = FIRST_EGG_MOVE_PATTERN.search(egg_moves.block(label))
+        return match is not None and match.group(1) != b"$ff"
+    return len(egg_moves[label]) > 0
+
+def select_base_stat_files(base_stat_files: list, pokemon_names: list):
+    """Gets the base stat files for the Pokemon picked with --only.
+
+    Pokemon can be given by base stat file name (rattata_alolan), display name (Rattata (Alolan)), or page name
+    (RattataAlolan), ignoring case.
+    """
+    lookup = {}
+    for base_stat_file in base_stat_files:
+        name_without_ext = os.path.splitext(base_stat_file)[0]
+        display_name = get_pokemon_names_for_files(name_without_ext)[0]
+        for name in (name_without_ext, display_name, page_slug(display_name)):
+            lookup.setdefault(name.lower(), set()).add(base_stat_file)
+
+    selected = set()
+    unknown = []
+    for pokemon_name in pokemon_names:
+        if pokemon_name.lower() in lookup:
+            selected |= lookup[pokemon_name.lower()]
+        else:
+            unknown.append(pokemon_name)
+    if unknown:
+        print(f"""--only couldn't find: {", ".join(unknown)}! Quitting.""")
+        sys.exit(1)
+    return selected
+
+class WikiSources:
+    """The parsed polishedcrystal files the pages are built from, kept by path so single files can be parsed again.
+
+    With only set, just those Pokemon's base stat files are parsed. Every Pokemon still gets a record with its names,
+    evolutions, and egg moves so prev/next links and egg moves carried over by evolutions stay correct.
+
+    A full run needs every block of evos_attacks.asm and egg_moves.asm, so each is parsed whole in one go. With only or
+    stream, they're read as a LabelTable instead and just the blocks that get looked up are parsed.
+
+    The files are read from a checkout on disk unless another source, like one revision of a GitRepository, is given.
+    """
+
+    def __init__(self, source_dir: str, parse_cache_dir: str, executor=None, jobs: int = 1, only: list = None, source=DISK_SOURCE, stream: bool = False):
+        self.data_dir = os.path.join(source_dir, "data")
+        self.source = source
+        self.parse_cache_dir = parse_cache_dir
+        self.executor = executor
+        self.jobs = jobs
+        self.only = only
+        self.label_tables = only is not None or stream
+        self.selected_files = None
+        self.files = {}
+        self.parsers = {}
+        self.parsed = {}
+        self.base_stat_files = []
+        self.pokemon_files = []
+
+    def __getitem__(self, name: str):
+        return self.parsed[self.files[name]]
+
+    def load(self, parse_pokemon_files: bool = True):
+        """Finds and parses every source file. Without parse_pokemon_files, the base stat files are left for parse()."""
+        self.files, self.parsers, self.parsed = {}, {}, {}
+
+        # Index the polishedcrystal data files once so lookups don't walk the tree again.
+        with PROFILER.stage("discovery"):
+            asm_file_index = self.source.index(self.data_dir)
+            for name, directory, file_name, parser in SOURCE_TABLES:
+                self.files[name] = find_asm_file(asm_file_index, os.path.join(self.data_dir, directory), file_name)
+                self.parsers[self.files[name]] = parser
+
+        with PROFILER.stage("parse"):
+            for name in ("teachable_moves", "johto_dex", "base_stats"):
+                self.reparse(self.files[name])
+
+        # Associates Dex list with base stat file, then reads each Pokemon's base stat file in dex order.
+        with PROFILER.stage("dex order"):
+            self.base_stat_files = order_base_stat_files_by_dex(self["johto_dex"], self["base_stats"])
+            self.pokemon_files = [find_asm_file(asm_file_index, os.path.join(self.data_dir, BASE_STATS_DIR), base_stat_file) for base_stat_file in self.base_stat_files]
+            if self.only is not None:
+                self.selected_files = select_base_stat_files(self.base_stat_files, self.only)
+
+        with PROFILER.stage("parse"):
+            # Full runs parse the two big tables whole, so the pool works on them alongside the base stat files.
+            table_futures = {}
+            if parse_pokemon_files and self.executor is not None and self.source.on_disk and not self.label_tables:
+                for name in ("evos_attacks", "egg_moves"):
+                    filename = self.files[name]
+                    table_futures[filename] = self.executor.submit(cached_parse_in_worker, self.parse_cache_dir, self.parsers[filename], filename)
+
+            pokemon_files = [pokemon_file for base_stat_file, pokemon_file in zip(self.base_stat_files, self.pokemon_files) if self.is_selected(base_stat_file)]
+            for pokemon_file in pokemon_files:
+                self.parsers[pokemon_file] = parse_pokemon_data
+            if parse_pokemon_files:
+                for pokemon_file in pokemon_files:
+                    self.parsed[pokemon_file] = self.recall(pokemon_file)
+                missing_files = [pokemon_file for pokemon_file in pokemon_files if self.parsed[pokemon_file] is None]
+                for pokemon_file, parsed in zip(missing_files, cached_parse_files(self.executor, self.jobs, self.parse_cache_dir, parse_pokemon_data, missing_files, self.source)):
+                    self.parsed[pokemon_file] = parsed
+                    self.source.remember(parse_pokemon_data, pokemon_file, parsed)
+
+            for filename, future in table_futures.items():
+                self.parsed[filename] = merge_worker_result(self.parsers[filename], future.result())
+            for name in ("evos_attacks", "egg_moves", "evolution_moves", "unique_wild_moves"):
+                if self.files[name] not in table_futures:
+                    self.reparse(self.files[name])
+
+    def is_selected(self, base_stat_file: str):
+        """Checks if a Pokemon's pages are being generated."""
+        return self.selected_files is None or base_stat_file in self.selected_files
+
+    def watched_dirs(self):
+        """Gets the folders watch mode checks for changes."""
+        return [os.path.join(self.data_dir, directory) for directory in WATCHED_DIRS]
+
+    def recall(self, filename: str):
+        """Gets a file's parsed result from an earlier revision of the same git repo, or None."""
+        parser = self.parsers[filename]
+        parsed = self.source.recall(parser, filename)
+        if parsed is not None:
+            PARSE_COUNTS[parser.__name__]["cache_hits"] += 1
+        return parsed
+
+    def parse(self, filename: str):
+        """Parses one source file without keeping the result in parsed."""
+        parser = self.parsers[filename]
+        parsed = self.recall(filename)
+        if parsed is None:
+            if parser in LABEL_TABLES and self.label_tables:
+                parsed = LabelTable(self.parse_cache_dir, parser, filename, *LABEL_TABLES[parser], self.source)
+            else:
+                parsed = cached_parse(self.parse_cache_dir, parser, filename, self.source)
+            self.source.remember(parser, filename, parsed)
+        return parsed
+
+    def reparse(self, filename: str):
+        """Parses one source file again after it changed."""
+        self.parsed[filename] = self.parse(filename)
+
+    def save(self):
+        """Saves the label blocks parsed so far for the next run."""
+        for parsed in self.parsed.values():
+            if isinstance(parsed, LabelTable):
+                parsed.save()
+
+def pokemon_names(base_stat_file: str):
+    """Gets a Pokemon's display name, page name, egg moves name, and evos attacks name, the first fields of its record."""
+    # Remove ".asm" extension.
+    name_without_ext = os.path.splitext(base_stat_file)[0]
+
+    # Get display name, egg move name, and evo attack name.
+    name, egg_moves_name, evo_attacks_name = get_pokemon_names_for_files(name_without_ext)
+    logger.debug("pokemon names: %s %s %s", name, egg_moves_name, evo_attacks_name)
+    return name, page_slug(name), egg_moves_name, evo_attacks_name
+
+def fill_pokemon_record(pokemon_data: PokemonRecord, sources: WikiSources, base_stats: dict, evos_attacks: dict, egg_moves: list):
+    """Fills in a Pokemon's data from its parsed base stat file and label blocks. Any of them can be None if missing."""
+    # Collect Pokemon data from base stat .asm file. Pokemon left out by --only just keep their names.
+    if base_stats is not None:
+        pokemon_data.set_base_stats(base_stats)
+
+    if evos_attacks is not None:
+        pokemon_data.set_evos_attacks(evos_attacks)
+
+    if pokemon_data.evo_attacks_name in sources["evolution_moves"]:
+        pokemon_data.evolution_move = sources["evolution_moves"][pokemon_data.evo_attacks_name]
+
+    if pokemon_data.evo_attacks_name in sources["unique_wild_moves"]:
+        pokemon_data.unique_wild_moves = sources["unique_wild_moves"][pokemon_data.evo_attacks_name]
+
+    if egg_moves is not None:
+        pokemon_data.egg_moves = MOVES.intern_all(egg_moves)
+
+@PROFILER.timed("collation")
+def collate_pokemon(sources: WikiSources):
+    """Collates all relevant Pokemon data for the learnset pages, in Johto Pokedex order.
+
+    With only set, the other Pokemon just get their names and evolutions, except for the pre-evolutions the selected
+    Pokemon carry egg moves over from. Only the label blocks of those Pokemon are parsed.
+    """
+    evos_attacks = sources["evos_attacks"]
+    egg_moves = sources["egg_moves"]
+
+    pokemon_data_list = [PokemonRecord(*pokemon_names(base_stat_file)) for base_stat_file in sources.base_stat_files]
+    evolution_graph = None
+    wanted = range(len(pokemon_data_list))
+    if sources.selected_files is not None:
+        evolutions = evolutions_by_label(evos_attacks)
+        for pokemon_data in pokemon_data_list:
+            if pokemon_data.evo_attacks_name in evolutions:
+                pokemon_data.evo_data_faithful = evolutions[pokemon_data.evo_attacks_name]["evo_data_faithful"]
+                pokemon_data.evo_data_polished = evolutions[pokemon_data.evo_attacks_name]["evo_data_polished"]
+        evolution_graph = EvolutionGraph(pokemon_data_list)
+        wanted = evolution_graph.with_pre_evolutions(idx for idx, base_stat_file in enumerate(sources.base_stat_files) if sources.is_selected(base_stat_file))
+
+    for idx, (pokemon_data, pokemon_file) in enumerate(zip(pokemon_data_list, sources.pokemon_files)):
+        if idx in wanted:
+            fill_pokemon_record(pokemon_data, sources, sources.parsed.get(pokemon_file), evos_attacks.get(pokemon_data.evo_attacks_name), egg_moves.get(pokemon_data.egg_moves_name))
+        else:
+            fill_pokemon_record(pokemon_data, sources, None, None, None)
+
+    # Carry egg moves over to evolutions once every Pokemon is known, so dex order doesn't matter.
+    propagate_egg_moves(pokemon_data_list, evolution_graph or EvolutionGraph(pokemon_data_list))
+
+    return pokemon_data_list
+
+@PROFILER.timed("collation")
+def plan_pokemon_stream(sources: WikiSources):
+    """Gets what streaming has to know about every Pokemon before the first page.
+
+    That's a stub per Pokemon with only its names and evolutions, for the prev/next links and evolution families, and
+    the egg moves label each Pokemon's egg moves come from once they're carried over from pre-evolutions.
+    """
+    evos_attacks = sources["evos_attacks"]
+    egg_moves = sources["egg_moves"]
+
+    evolutions = evolutions_by_label(evos_attacks)
+
+    pokemon_stubs = []
+    for base_stat_file in sources.base_stat_files:
+        pokemon_stub = PokemonStub(*pokemon_names(base_stat_file))
+        if pokemon_stub.evo_attacks_name in evolutions:
+            pokemon_stub.evo_data_faithful = evolutions[pokemon_stub.evo_attacks_name]["evo_data_faithful"]
+            pokemon_stub.evo_data_polished = evolutions[pokemon_stub.evo_attacks_name]["evo_data_polished"]
+        pokemon_stubs.append(pokemon_stub)
+
+    # Same as propagate_egg_moves, but following labels instead of the moves themselves.
+    evolution_graph = EvolutionGraph(pokemon_stubs)
+    # Only the blocks of the Pokemon being streamed get parsed, so the rest are checked for egg moves without parsing them.
+    egg_move_labels = [pokemon_stub.egg_moves_name if has_egg_moves(egg_moves, pokemon_stub.egg_moves_name) else None for pokemon_stub in pokemon_stubs]
+    for idx in evolution_graph.topological_order():
+        pre_evolution_idx = evolution_graph.egg_moves_source(idx, lambda pre_evolution_idx: egg_move_labels[pre_evolution_idx] is not None)
+        if pre_evolution_idx is not None:
+            egg_move_labels[idx] = egg_move_labels[pre_evolution_idx]
+
+    return pokemon_stubs, egg_move_labels
+
+def stream_pokemon(sources: WikiSources, pokemon_stubs: list, egg_move_labels: list, wanted):
+    """Collates the wanted Pokemon one at a time in Johto Pokedex order, parsing each base stat file as it's reached.
+
+    Yields (index, record), and nothing about a Pokemon is kept once the next one starts.
+    """
+    evos_attacks = sources["evos_attacks"]
+    egg_moves = sources["egg_moves"]
+
+    for idx, (pokemon_stub, base_stat_file, pokemon_file) in enumerate(zip(pokemon_stubs, sources.base_stat_files, sources.pokemon_files)):
+        if not wanted(idx):
+            continue
+        pokemon_data = PokemonRecord(pokemon_stub.name, pokemon_stub.slug, pokemon_stub.egg_moves_name, pokemon_stub.evo_attacks_name)
+        fill_pokemon_record(
+            pokemon_data,
+            sources,
+            sources.parse(pokemon_file) if sources.is_selected(base_stat_file) else None,
+            evos_attacks.parse_block(pokemon_data.evo_attacks_name) if pokemon_data.evo_attacks_name in evos_attacks else None,
+            egg_moves.parse_block(egg_move_labels[idx]) if egg_move_labels[idx] else None,
+        )
+        yield idx, pokemon_data
+
+# Sending pages to the workers and back costs more than rendering a handful of them, like a watch mode update, so fewer
+# stay serial.
+PARALLEL_RENDER_MIN_PAGES = 200
+
+def set_render_context(symbol_tables: list):
+    """Gives a render worker this process's interned move, ability, and type names."""
+    for table, symbols in zip((MOVES, ABILITIES, TYPES), symbol_tables):
+        table.symbols = symbols
+        table.ids = {name: symbol_id for symbol_id, name in enumerate(symbols)}
+
+def render_learnset_chunk(symbol_tables: list, teachable_moves_category: dict, chunk: list):
+    """Renders a chunk of (Pokemon, prev Pokemon, next Pokemon) learnset pages in a worker process.
+
+    The interned names come with every chunk since the pool is shared and outlives any one render. The worker's render
+    timings are sent back along with the pages.
+    """
+    set_render_context(symbol_tables)
+    PROFILER.stages.clear()
+    rendered_pages = [generate_pokemon_learnset_page(pokemon_data, prev_pokemon_stub, next_pokemon_stub, teachable_moves_category) for pokemon_data, prev_pokemon_stub, next_pokemon_stub in chunk]
+    return rendered_pages, PROFILER.stages
+
+def name_stub(pokemon_data):
+    """Gets the bit of a Pokemon's record a prev/next link needs, so neighbours aren't sent to render workers whole."""
+    return pokemon_data and PokemonStub(pokemon_data.name, pokemon_data.slug, pokemon_data.egg_moves_name, pokemon_data.evo_attacks_name)
+
+@PROFILER.timed("render pool")
+def render_learnset_pages_in_parallel(executor, jobs: int, learnset_pages: list, teachable_moves_category: dict, page_writer: PageWriter):
+    """Renders (Pokemon, prev Pokemon, next Pokemon) learnset pages across the worker pool, in chunks sized for jobs.
+
+    Chunks come back in order, so pages are written in Johto Pokedex order same as a serial run.
+    """
+    chunksize = pool_chunksize(len(learnset_pages), jobs)
+    chunks = [[(pokemon_data, name_stub(prev_pokemon_data), name_stub(next_pokemon_data)) for pokemon_data, prev_pokemon_data, next_pokemon_data in learnset_pages[start:start + chunksize]] for start in range(0, len(learnset_pages), chunksize)]
+    symbol_tables = [table.symbols for table in (MOVES, ABILITIES, TYPES)]
+    results = executor.map(partial(render_learnset_chunk, symbol_tables, teachable_moves_category), chunks)
+    for chunk, (rendered_pages, stages) in zip(chunks, results):
+        PROFILER.merge(stages)
+        for (pokemon_data, _, _), contents in zip(chunk, rendered_pages):
+            page_writer.write_page(f"""{pokemon_data.slug}.md""", contents)
+
+def render_pages(pokemon_data_list: list, teachable_moves_category: dict, page_writer: PageWriter, pages: set = None, executor=None, render_jobs: int = 1):
+    """Renders the wiki pages into the page writer. If pages is given, only those pages are rendered.
+
+    With render_jobs, enough learnset pages are rendered across the worker pool.
+    """
     # Generate Pokemon learnset pages in Johto Pokedex order.
-    with open("Pokemon-Learnsets.md", 'w') as learnset_file:
-        for idx, pokemon_data in enumerate(pokemon_data_list):
-            prev_pokemon_data = pokemon_data_list[idx - 1] if idx > 0 else {}
-            next_pokemon_data = pokemon_data_list[idx + 1] if idx < len(pokemon_data_list) - 1 else {}
+    learnset_pages = []
+    for idx, pokemon_data in enumerate(pokemon_data_list):
+        if pages is not None and f"""{pokemon_data.slug}.md""" not in pages:
+            continue
+        prev_pokemon_data = pokemon_data_list[idx - 1] if idx > 0 else None
+        next_pokemon_data = pokemon_data_list[idx + 1] if idx < len(pokemon_data_list) - 1 else None
+        learnset_pages.append((pokemon_data, prev_pokemon_data, next_pokemon_data))
+
+    if executor is not None and render_jobs > 1 and len(learnset_pages) >= PARALLEL_RENDER_MIN_PAGES:
+        render_learnset_pages_in_parallel(executor, render_jobs, learnset_pages, teachable_moves_category, page_writer)
+    else:
+        for pokemon_data, prev_pokemon_data, next_pokemon_data in learnset_pages:
+            page_writer.write_page(f"""{pokemon_data.slug}.md""", generate_pokemon_learnset_page(pokemon_data, prev_pokemon_data, next_pokemon_data, teachable_moves_category))
+
+    # The index, held items, and Polished differences pages all come from one more pass over the Pokemon.
+    for page_name, contents in generate_summary_pages(pokemon_data_list, pages).items():
+        page_writer.write_page(page_name, contents)
+
+def stream_pages(sources: WikiSources, pokemon_stubs: list, egg_move_labels: list, page_writer: PageWriter, pages: set = None):
+    """Collates, renders, and writes each Pokemon's learnset page before moving on to the next one.
+
+    The summary pages are folded into their sinks along the way and written at the end. If pages is given, only those
+    pages are rendered, and Pokemon that aren't on any of them aren't collated at all. Each stub is dropped once the
+    pages that link to it are written.
+    """
+    teachable_moves_category = sources["teachable_moves"]
+    sinks = summary_sinks(pages)
+    every_sink = [sink for page_sinks in sinks.values() for sink in page_sinks]
+
+    def learnset_page_wanted(idx: int):
+        return pages is None or f"""{pokemon_stubs[idx].slug}.md""" in pages
+
+    released = 0
+    for idx, pokemon_data in stream_pokemon(sources, pokemon_stubs, egg_move_labels, lambda idx: every_sink or learnset_page_wanted(idx)):
+        # Only this Pokemon's page and the next one still link to the stub before it.
+        while released < idx - 1:
+            pokemon_stubs[released] = None
+            released += 1
+        if learnset_page_wanted(idx):
+            # The prev/next links only need names, which the stubs already have.
+            prev_pokemon_stub = pokemon_stubs[idx - 1] if idx > 0 else None
+            next_pokemon_stub = pokemon_stubs[idx + 1] if idx < len(pokemon_stubs) - 1 else None
+            page_writer.write_page(f"""{pokemon_data.slug}.md""", generate_pokemon_learnset_page(pokemon_data, prev_pokemon_stub, next_pokemon_stub, teachable_moves_category))
+        with PROFILER.stage("render summary pages"):
+            for sink in every_sink:
+                sink.add(pokemon_data)
+
+    for page_name, contents in render_summary_sinks(sinks).items():
+        page_writer.write_page(page_name, contents)
+
+def build_page_dependencies(sources: WikiSources, pokemon_data_list: list):
+    """Maps each source file to the pages built from it."""
+    learnset_pages = {f"""{pokemon_data.slug}.md""" for pokemon_data in pokemon_data_list}
+    summary_pages = {HELD_ITEMS_PAGE, CHANGES_PAGE}
+    every_page = learnset_pages | summary_pages | {LEARNSET_INDEX_PAGE}
+
+    dependencies = {
+        # The dex order and base stat file list decide which pages exist and their prev/next links.
+        sources.files["johto_dex"]: every_page,
+        sources.files["base_stats"]: every_page,
+        sources.files["teachable_moves"]: learnset_pages,
+        # Evolutions also carry egg moves between pages, so the shared tables can feed any learnset page.
+        sources.files["evos_attacks"]: learnset_pages | {CHANGES_PAGE},
+        sources.files["egg_moves"]: learnset_pages,
+        sources.files["evolution_moves"]: learnset_pages,
+        sources.files["unique_wild_moves"]: learnset_pages,
+    }
+    for pokemon_file, pokemon_data in zip(sources.pokemon_files, pokemon_data_list):
+        if pokemon_file in sources.parsed:
+            dependencies[pokemon_file] = {f"""{pokemon_data.slug}.md"""} | summary_pages
+    return dependencies
+
+def selected_pages(sources: WikiSources, pokemon_data_list: list, page_types: list):
+    """Gets the names of the pages picked with --pages and --only, or None if every page is generated.
+
+    The index and summary pages list every Pokemon, so they're left alone when only some Pokemon are generated.
+    """
+    if sources.selected_files is None and set(page_types) == set(PAGE_TYPES):
+        return None
+
+    pages = set()
+    if "learnsets" in page_types:
+        pages.update(f"""{pokemon_data.slug}.md""" for base_stat_file, pokemon_data in zip(sources.base_stat_files, pokemon_data_list) if sources.is_selected(base_stat_file))
+    if sources.selected_files is None:
+        pages.update(page_name for page_type, page_name in (("learnsets", LEARNSET_INDEX_PAGE), ("held-items", HELD_ITEMS_PAGE), ("changes", CHANGES_PAGE)) if page_type in page_types)
+    return pages
+
+def parse_page_types(value: str):
+    """Splits the --pages list and checks each page type."""
+    page_types = [page_type.strip() for page_type in value.split(",") if page_type.strip()]
+    for page_type in page_types:
+        if page_type not in PAGE_TYPES:
+            raise argparse.ArgumentTypeError(f"""unknown page type {page_type} (choose from {", ".join(PAGE_TYPES)})""")
+    return page_types
+
+def snapshot_source_files(directories: list):
+    """Gets the modification time of every file under the watched folders."""
+    mtimes = {}
+    for directory in directories:
+        for dirpath, _, files in os.walk(directory):
+            for file in files:
+                path = os.path.normpath(os.path.join(dirpath, file))
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+    return mtimes
+
+def profile_report(wall_seconds: float, cpu_seconds: float):
+    """Collects the --profile report for the run."""
+    return {
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "stages": PROFILER.stages,
+        "parsers": {parser_name: dict(counts) for parser_name, counts in sorted(PARSE_COUNTS.items())},
+        "pages": {"rendered": PROFILER.counts["pages_rendered"], "written": PROFILER.counts["pages_written"]},
+        # tracemalloc only sees this process, not the parse workers.
+        "peak_memory_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+    }
 
-            md_file_name = f"""{pokemon_data.get("name").replace("(", "").replace(')', '').replace("'", "").replace(" ", "")}.md"""
-            generate_pokemon_learnset_page(pokemon_data, md_file_name, learnset_file, prev_pokemon_data, next_pokemon_data, teachable_moves_category)
+def print_profile(profile: dict):
+    """Prints the --profile report as tables."""
+    print(f"""\n{"Stage":<24}{"Wall ms":>12}{"CPU ms":>12}{"Calls":>10}""")
+    for name, totals in profile["stages"].items():
+        print(f"""{name:<24}{totals["wall_seconds"] * 1000:>12.1f}{totals["cpu_seconds"] * 1000:>12.1f}{totals["calls"]:>10}""")
+    print(f"""{"total":<24}{profile["wall_seconds"] * 1000:>12.1f}{profile["cpu_seconds"] * 1000:>12.1f}""")
+
+    print(f"""\n{"Parser":<36}{"Files":>8}{"Bytes":>12}{"Lines":>10}{"Regex":>10}{"Cached":>8}{"CPU ms":>10}""")
+    for name, counts in profile["parsers"].items():
+        print(f"""{name:<36}{counts.get("files_opened", 0):>8}{counts.get("bytes_read", 0):>12}{counts.get("lines_scanned", 0):>10}{counts.get("regex_evaluations", 0):>10}{counts.get("cache_hits", 0):>8}{counts.get("cpu_seconds", 0) * 1000:>10.1f}""")
+
+    print(f"""\nPages: {profile["pages"]["rendered"]} rendered, {profile["pages"]["written"]} written.""")
+    if profile["peak_memory_bytes"] is not None:
+        print(f"""Peak memory: {profile["peak_memory_bytes"] / 1024 / 1024:.1f} MiB (main process).""")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generates Polished Crystal wiki pages from the polishedcrystal .asm data files.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE_DIR, help=f"""The polishedcrystal repo folder, or a {", ".join(ARCHIVE_TYPES)} release archive of it (default: {DEFAULT_SOURCE_DIR}).""")
+    parser.add_argument("--output", default=".", help="Folder to write the wiki pages to (default: the current folder).")
+    parser.add_argument("--archive", metavar="FILE", help=f"""Write the pages into a new archive instead of --output ({", ".join(ARCHIVE_TYPES)}).""")
+    parser.add_argument("--pages", type=parse_page_types, default=list(PAGE_TYPES), help=f"""Comma separated page types to generate (default: {",".join(PAGE_TYPES)}).""")
+    parser.add_argument("--only", nargs="+", metavar="POKEMON", help="Only generate the learnset pages of these Pokemon, by base stat file name, display name, or page name.")
+    parser.add_argument("--revisions", nargs="+", metavar="REV", help="Treat --source as a git repo and generate a folder of pages under --output for each of these tags, branches, or commits, read straight from git.")
+    parser.add_argument("--export-db", metavar="FILE", help="Also write the collated Pokemon to a SQLite database that pokemon_db.py can query.")
+    parser.add_argument("--snapshot", metavar="FILE", help="Also write the collated Pokemon to a snapshot that pokemon_snapshot.py can diff against another run.")
+    parser.add_argument("--stream", action="store_true", help="Collate, render, and write one Pokemon at a time instead of collating every Pokemon first, to keep memory flat.")
+    parser.add_argument("--cache-dir", default=DEFAULT_PARSE_CACHE_DIR, help=f"""Folder for saved parse results (default: {DEFAULT_PARSE_CACHE_DIR}).""")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file from scratch without reading or writing the parse cache.")
+    parser.add_argument("--cache-limit", type=int, default=256, metavar="MB", help="Most megabytes of saved parse results to keep, dropping the least recently used first (default: 256).")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes used to parse the .asm files (default: 1).")
+    parser.add_argument("--render-jobs", type=int, default=1, help=f"""Number of worker processes used to render the learnset pages when there are at least {PARALLEL_RENDER_MIN_PAGES} (default: 1).""")
+    parser.add_argument("--writers", type=int, default=0, help="Number of threads writing pages while the next ones render (default: 0, write in the main thread).")
+    parser.add_argument("--write-queue", type=int, default=64, help="Most rendered pages waiting for the --writers threads before rendering pauses (default: 64).")
+    parser.add_argument("--watch", action="store_true", help="Keep running and regenerate the affected pages whenever a data file changes.")
+    parser.add_argument("--watch-interval", type=float, default=0.5, help="Seconds between checks for changed files in watch mode (default: 0.5).")
+    parser.add_argument("--profile", action="store_true", help="Print the time, file reads, and memory used by each stage when done.")
+    parser.add_argument("--profile-json", metavar="FILE", help="Write the --profile report to a JSON file. Implies --profile.")
+    parser.add_argument("--verbose", "-v", action="count", default=0, help="Show progress. Use -vv to also list every Pokemon as it's collated.")
+    args = parser.parse_args(argv)
+    if args.export_db and args.only:
+        parser.error("--export-db needs every Pokemon, so it can't be combined with --only")
+    if args.snapshot and args.only:
+        parser.error("--snapshot needs every Pokemon, so it can't be combined with --only")
+    if args.jobs < 1 or args.render_jobs < 1:
+        parser.error("--jobs and --render-jobs have to be at least 1")
+    if args.writers < 0 or args.write_queue < 1:
+        parser.error("--writers can't be negative and --write-queue has to be at least 1")
+    if args.archive and not args.archive.endswith(ARCHIVE_TYPES):
+        parser.error(f"""--archive has to end in {", ".join(ARCHIVE_TYPES)}""")
+    if args.archive and (args.watch or args.revisions):
+        parser.error("--archive writes one archive per run, so it can't be combined with --watch or --revisions")
+    if args.source.endswith(ARCHIVE_TYPES) and (args.watch or args.revisions):
+        parser.error("an archive --source doesn't change and isn't a git repo, so it can't be combined with --watch or --revisions")
+    if args.stream and (args.watch or args.export_db or args.snapshot):
+        parser.error("--stream doesn't keep the collated Pokemon, so it can't be combined with --watch, --export-db, or --snapshot")
+    if args.revisions and args.watch:
+        parser.error("--revisions reads old commits that don't change, so it can't be combined with --watch")
+    parse_cache_dir = None if args.no_cache else args.cache_dir
+    profile = args.profile or args.profile_json
+
+    logging.basicConfig(format="%(message)s", level=max(logging.DEBUG, logging.WARNING - 10 * args.verbose))
+    if profile:
+        tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    # Everything the workers parse or render is independent, so one pool covers the base stat files and the learnset
+    # pages, and it's kept for every watch mode update.
+    workers = max(args.jobs, args.render_jobs)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if args.watch:
+            watch_wiki_pages(args, parse_cache_dir, executor)
+        elif args.revisions:
+            generate_revisions(args, parse_cache_dir, executor)
+        else:
+            generate_wiki_pages(args, parse_cache_dir, executor, open_source(args.source))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # Every changed file leaves a new entry behind, so the cache is trimmed back down once the run is over.
+    if parse_cache_dir:
+        prune_parse_cache(parse_cache_dir, args.cache_limit * 1024 * 1024)
+
+    if profile:
+        report = profile_report(time.perf_counter() - wall_start, time.process_time() - cpu_start)
+        print_profile(report)
+        if args.profile_json:
+            with open(args.profile_json, 'w') as file:
+                json.dump(report, file, indent=2)
+
+def generate_wiki_pages(args, parse_cache_dir: str, executor, source=DISK_SOURCE):
+    """Parses the polishedcrystal data files and writes every wiki page."""
+    # The pool can be there just for --render-jobs, so parsing only uses it with --jobs.
+    sources = WikiSources(args.source, parse_cache_dir, executor if args.jobs > 1 else None, args.jobs, args.only, source, args.stream)
+
+    if args.stream:
+        # Base stat files are parsed as each Pokemon is reached instead of all up front.
+        sources.load(parse_pokemon_files=False)
+        with open_page_writer(args) as page_writer:
+            pokemon_stubs, egg_move_labels = plan_pokemon_stream(sources)
+            pages = selected_pages(sources, pokemon_stubs, args.pages)
+            stream_pages(sources, pokemon_stubs, egg_move_labels, page_writer, pages)
+            sources.save()
+            print_page_report(page_writer.finish(partial=pages is not None))
+        return sources, None
+
+    sources.load()
+    logger.info("Parsed %d base stat files.", len(sources.parsed) - len(SOURCE_TABLES))
+    pokemon_data_list = collate_pokemon(sources)
+    sources.save()
+    logger.info("Collated %d Pokemon.", len(pokemon_data_list))
+
+    pages = selected_pages(sources, pokemon_data_list, args.pages)
+    with open_page_writer(args) as page_writer:
+        render_pages(pokemon_data_list, sources["teachable_moves"], page_writer, pages, executor, args.render_jobs)
+        print_page_report(page_writer.finish(partial=pages is not None))
+
+    export_collated_data(args, pokemon_data_list, sources["teachable_moves"])
+
+    return sources, pokemon_data_list
+
+def open_page_writer(args):
+    """Gets the page writer for --archive or the --output folder."""
+    if args.archive:
+        return ArchiveWriter(args.archive, args.writers, args.write_queue)
+    # Only pages whose contents changed since the last run get written.
+    os.makedirs(args.output, exist_ok=True)
+    return PageWriter(args.output, manifest_file_for_output(args.cache_dir, args.output), args.writers, args.write_queue)
+
+def revision_folder(revision: str):
+    """Gets the output folder name for a revision. Ex - origin/master is origin_master."""
+    return re.sub(r"[^\w.-]", "_", revision)
+
+def generate_revisions(args, parse_cache_dir: str, executor):
+    """Writes a folder of pages for each revision in --revisions, reading the files straight from the git repo.
+
+    Every revision shares the parsed results of the ones before it by blob id, so only files that changed between
+    revisions are parsed again. --export-db and --snapshot files are written into each revision's folder.
+    """
+    repository = GitRepository(args.source)
+    try:
+        for revision in args.revisions:
+            source = GitSource(repository, revision)
+            output_dir = os.path.join(args.output, revision_folder(revision))
+            print(f"""{revision} ({source.commit[:10]}) -> {output_dir}""")
+            revision_args = argparse.Namespace(**{
+                **vars(args),
+                "output": output_dir,
+                "export_db": args.export_db and os.path.join(output_dir, os.path.basename(args.export_db)),
+                "snapshot": args.snapshot and os.path.join(output_dir, os.path.basename(args.snapshot)),
+            })
+            generate_wiki_pages(revision_args, parse_cache_dir, executor, source)
+    finally:
+        repository.close()
+
+def watch_wiki_pages(args, parse_cache_dir: str, executor):
+    """Generates every page, then keeps the parsed data in memory and regenerates only the pages each change affects."""
+    sources, pokemon_data_list = generate_wiki_pages(args, parse_cache_dir, executor)
+    dependencies = build_page_dependencies(sources, pokemon_data_list)
+    mtimes = snapshot_source_files(sources.watched_dirs())
+    print(f"""Watching {", ".join(sources.watched_dirs())} for changes. Press Ctrl+C to stop.""")
+
+    while True:
+        time.sleep(args.watch_interval)
+        new_mtimes = snapshot_source_files(sources.watched_dirs())
+        changed_files = {path for path in mtimes.keys() | new_mtimes.keys() if mtimes.get(path) != new_mtimes.get(path)}
+        mtimes = new_mtimes
+
+        # Files nothing is built from, like cries or sprites, don't need anything regenerated.
+        changed_files &= dependencies.keys()
+        if not changed_files:
+            continue
+
+        start_time = time.perf_counter()
+        try:
+            if sources.files["johto_dex"] in changed_files or sources.files["base_stats"] in changed_files:
+                # The set of pages and their order can change, so start over from the file index.
+                sources.load()
+                pokemon_data_list = collate_pokemon(sources)
+                sources.save()
+                dependencies = build_page_dependencies(sources, pokemon_data_list)
+                pages = selected_pages(sources, pokemon_data_list, args.pages)
+            else:
+                for path in changed_files:
+                    sources.reparse(path)
+                previous_pokemon_data_list = pokemon_data_list
+                pokemon_data_list = collate_pokemon(sources)
+                sources.save()
+                pages = set().union(*(dependencies[path] for path in changed_files))
+
+                # Only Pokemon whose collated data changed need their learnset page again. TM/HM categories aren't part
+                # of the collated data, so a change to tmhm_moves.asm still regenerates every page.
+                if sources.files["teachable_moves"] not in changed_files:
+                    changed_pages = {f"""{pokemon_data.slug}.md""" for previous, pokemon_data in zip(previous_pokemon_data_list, pokemon_data_list) if previous != pokemon_data}
+                    pages = {page for page in pages if page in changed_pages or page in (LEARNSET_INDEX_PAGE, HELD_ITEMS_PAGE, CHANGES_PAGE)}
+
+                # Stay within the pages picked with --pages and --only.
+                allowed_pages = selected_pages(sources, pokemon_data_list, args.pages)
+                if allowed_pages is not None:
+                    pages &= allowed_pages
+
+            with PageWriter(args.output, manifest_file_for_output(args.cache_dir, args.output), args.writers, args.write_queue) as page_writer:
+                render_pages(pokemon_data_list, sources["teachable_moves"], page_writer, pages, executor, args.render_jobs)
+                report = page_writer.finish(partial=pages is not None)
+            export_collated_data(args, pokemon_data_list, sources["teachable_moves"])
+        except (Exception, SystemExit) as error:
+            # A half saved file shouldn't stop the watcher. The next save gets another try.
+            print(f"""Couldn't regenerate pages for {", ".join(sorted(changed_files))}: {error}""")
+            continue
+
+        print(f"""{", ".join(sorted(changed_files))} changed, regenerated in {(time.perf_counter() - start_time) * 1000:.0f} ms.""")
+        print_page_report(report)
 
-    # Write held items file.
-    # TODO The online wiki added text to the top of this file. Every time this script runs it will overwrite the file with
-    #      only the parsed information, so make sure to double check changes.
-    with open("Wild-Held-Items.md", 'w') as held_items_file:
-        generate_held_item_page(pokemon_data_list, held_items_file)
 
-    # Write Polished differences file.
-    with open("Pokemon-Type,-Evolution,-Ability,-and-Stat-Changes.md", 'w') as changes_file:
-        generate_polished_changes_page(pokemon_data_list, changes_file)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import sys
+import sqlite3
+import argparse
+
+# Bump whenever the tables change so old exports can be told apart.
+SCHEMA_VERSION = 1
+
+# Stats, types, and abilities have a row for each ROM. Learnset entries and evolutions are marked Both unless they're
+# only in one ROM. TM, HM, and move tutor learnsets are only parsed for Polished.
+MODES = ("Faithful", "Polished")
+BOTH = "Both"
+METHODS = ("level", "evolution", "wild", "tm", "hm", "tutor", "egg")
+
+SCHEMA = f"""
+PRAGMA user_version = {SCHEMA_VERSION};
+
+CREATE TABLE pokemon (
+    id INTEGER PRIMARY KEY,
+    dex_order INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    held_item_1 TEXT,
+    held_item_2 TEXT,
+    egg_groups TEXT
+);
+CREATE INDEX pokemon_name ON pokemon (name COLLATE NOCASE);
+CREATE INDEX pokemon_slug ON pokemon (slug COLLATE NOCASE);
+
+CREATE TABLE stats (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon (id),
+    mode TEXT NOT NULL,
+    hp INTEGER, atk INTEGER, def INTEGER, sat INTEGER, sdf INTEGER, speed INTEGER,
+    PRIMARY KEY (pokemon_id, mode)
+);
+
+CREATE TABLE types (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon (id),
+    mode TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (pokemon_id, mode, slot)
+);
+CREATE INDEX types_type ON types (type, mode);
+
+CREATE TABLE abilities (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon (id),
+    mode TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    ability TEXT NOT NULL,
+    PRIMARY KEY (pokemon_id, mode, slot)
+);
+CREATE INDEX abilities_ability ON abilities (ability, mode);
+
+CREATE TABLE evolutions (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon (id),
+    mode TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    type TEXT,
+    method TEXT,
+    evolution TEXT,
+    form TEXT,
+    time_of_day TEXT,
+    evolve_stat TEXT,
+    PRIMARY KEY (pokemon_id, mode, slot)
+);
+
+CREATE TABLE moves (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+
+CREATE TABLE learnset (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon (id),
+    move_id INTEGER NOT NULL REFERENCES moves (id),
+    method TEXT NOT NULL,
+    level INTEGER,
+    detail TEXT,
+    mode TEXT NOT NULL,
+    slot INTEGER NOT NULL
+);
+CREATE INDEX learnset_move ON learnset (move_id, method, mode);
+CREATE INDEX learnset_pokemon ON learnset (pokemon_id, slot);
+"""
+
+def connect(db_file: str):
+    """Opens an exported database read only."""
+    connection = sqlite3.connect(f"""file:{db_file}?mode=ro""", uri=True)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+def mode_filter(mode: str):
+    """Gets the learnset modes that count for a ROM. Both ROM entries count for either one."""
+    if mode is None:
+        return (BOTH,) + MODES
+    return (BOTH, mode.title())
+
+def find_pokemon(connection, pokemon: str):
+    """Finds a Pokemon by display name or page name, ignoring case."""
+    row = connection.execute(
+        "SELECT * FROM pokemon WHERE name = ?1 COLLATE NOCASE OR slug = ?1 COLLATE NOCASE ORDER BY dex_order LIMIT 1",
+        (pokemon,),
+    ).fetchone()
+    if row is None:
+        raise KeyError(pokemon)
+    return row
+
+def pokemon_with_move(connection, move: str, method: str = None, mode: str = None):
+    """Gets every Pokemon that learns a move, optionally only by one method (like tm) or in one ROM, in dex order."""
+    modes = mode_filter(mode)
+    query = f"""
+        SELECT pokemon.name, learnset.method, learnset.level, learnset.detail, learnset.mode
+        FROM moves
+        JOIN learnset ON learnset.move_id = moves.id
+        JOIN pokemon ON pokemon.id = learnset.pokemon_id
+        WHERE moves.name = ? AND learnset.mode IN ({", ".join("?" * len(modes))})
+    """
+    parameters = [move, *modes]
+    if method:
+        query += " AND learnset.method = ?"
+        parameters.append(method)
+    query += " ORDER BY pokemon.dex_order, learnset.slot"
+    return connection.execute(query, parameters).fetchall()
+
+def learnset(connection, pokemon: str, mode: str = None):
+    """Gets a Pokemon's learnset in page order."""
+    modes = mode_filter(mode)
+    return connection.execute(
+        f"""
+        SELECT moves.name AS move, learnset.method, learnset.level, learnset.detail, learnset.mode
+        FROM learnset
+        JOIN moves ON moves.id = learnset.move_id
+        WHERE learnset.pokemon_id = ? AND learnset.mode IN ({", ".join("?" * len(modes))})
+        ORDER BY learnset.slot
+        """,
+        (find_pokemon(connection, pokemon)["id"], *modes),
+    ).fetchall()
+
+def pokemon_info(connection, pokemon: str):
+    """Gets a Pokemon's stats, types, and abilities in each ROM, and its evolutions."""
+    row = find_pokemon(connection, pokemon)
+    info = {"name": row["name"], "held_items": [row["held_item_1"], row["held_item_2"]], "egg_groups": row["egg_groups"]}
+    for mode in MODES:
+        stats = connection.execute("SELECT hp, atk, def, sat, sdf, speed FROM stats WHERE pokemon_id = ? AND mode = ?", (row["id"], mode)).fetchone()
+        info[mode] = {
+            "stats": dict(stats) if stats else {},
+            "types": [type_row["type"] for type_row in connection.execute("SELECT type FROM types WHERE pokemon_id = ? AND mode = ? ORDER BY slot", (row["id"], mode))],
+            "abilities": [ability_row["ability"] for ability_row in connection.execute("SELECT ability FROM abilities WHERE pokemon_id = ? AND mode = ? ORDER BY slot", (row["id"], mode))],
+        }
+    info["evolutions"] = [dict(evolution) for evolution in connection.execute("SELECT mode, type, method, evolution, form, time_of_day, evolve_stat FROM evolutions WHERE pokemon_id = ? ORDER BY slot", (row["id"],))]
+    return info
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queries a database exported with generate_wiki_pages.py --export-db.")
+    parser.add_argument("database", help="The exported .db file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    move_parser = subparsers.add_parser("move", help="List the Pokemon that learn a move.")
+    move_parser.add_argument("move", help="Move name, like Will-O-Wisp.")
+    move_parser.add_argument("--method", choices=METHODS, help="Only count one way of learning the move.")
+    move_parser.add_argument("--mode", choices=[mode.lower() for mode in MODES], help="Only count one ROM.")
+    learnset_parser = subparsers.add_parser("learnset", help="List a Pokemon's learnset.")
+    learnset_parser.add_argument("pokemon", help="Display name or page name, like \"Rattata (Alolan)\".")
+    learnset_parser.add_argument("--mode", choices=[mode.lower() for mode in MODES], help="Only count one ROM.")
+    args = parser.parse_args(argv)
+
+    connection = connect(args.database)
+    try:
+        if args.command == "move":
+            rows = pokemon_with_move(connection, args.move, args.method, args.mode)
+        else:
+            rows = learnset(connection, args.pokemon, args.mode)
+    except KeyError as error:
+        print(f"""Couldn't find {error}! Quitting.""")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+    for row in rows:
+        print(" | ".join("-" if value is None else str(value) for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import sys
+import gzip
+import json
+import argparse
+
+from collections import Counter
+
+from atomic_file import atomic_write
+
+# Bump whenever the snapshot layout changes.
+SNAPSHOT_VERSION = 1
+
+MODES = ("Faithful", "Polished")
+BOTH = "Both"
+STAT_COLUMNS = ("HP", "Atk", "Def", "SAt", "SDf", "Speed")
+
+# Only the Polished TM, HM, and move tutor learnsets are parsed, so they can't be compared between the ROMs.
+POLISHED_ONLY_METHODS = ("tm", "hm", "tutor")
+
+def save_snapshot(snapshot_file: str, snapshot: dict):
+    """Writes a snapshot as gzipped JSON."""
+    with atomic_write(snapshot_file) as temp_file, gzip.open(temp_file, 'wt', encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+
+def load_snapshot(snapshot_file: str):
+    """Reads a snapshot written by generate_wiki_pages.py --snapshot."""
+    try:
+        with gzip.open(snapshot_file, 'rt', encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except FileNotFoundError:
+        print(f"""{snapshot_file} not found! Quitting.""")
+        sys.exit(1)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        print(f"""{snapshot_file} is snapshot version {snapshot.get("version")}, expected {SNAPSHOT_VERSION}! Regenerate it. Quitting.""")
+        sys.exit(1)
+    return snapshot
+
+def evolution_key(evolution: list):
+    """Turns a snapshot evolution entry into something hashable."""
+    mode, evo = evolution
+    return mode, tuple(sorted(evo.items()))
+
+def changed_list(old: list, new: list):
+    """Gets {"old", "new"} if two lists differ, otherwise None."""
+    return None if old == new else {"old": old, "new": new}
+
+def changed_stats(old: dict, new: dict):
+    """Gets {stat: {"old", "new"}} for every stat that differs."""
+    return {stat: {"old": old.get(stat), "new": new.get(stat)} for stat in STAT_COLUMNS if old.get(stat) != new.get(stat)}
+
+def multiset_changes(old: list, new: list):
+    """Gets the entries added and removed between two lists, counting duplicates."""
+    old_counts, new_counts = Counter(old), Counter(new)
+    return list((new_counts - old_counts).elements()), list((old_counts - new_counts).elements())
+
+def diff_pokemon(old: dict, new: dict):
+    """Compares one Pokemon between two snapshots. Only the parts that changed are in the result."""
+    changes = {}
+    for mode in MODES:
+        mode_changes = {}
+        for key in ("types", "abilities"):
+            change = changed_list(old[mode][key], new[mode][key])
+            if change:
+                mode_changes[key] = change
+        stats = changed_stats(old[mode]["stats"], new[mode]["stats"])
+        if stats:
+            mode_changes["stats"] = stats
+        if mode_changes:
+            changes[mode] = mode_changes
+
+    added, removed = multiset_changes([evolution_key(evolution) for evolution in old["evolutions"]], [evolution_key(evolution) for evolution in new["evolutions"]])
+    if added or removed:
+        changes["evolutions"] = {"added": [[mode, dict(evo)] for mode, evo in added], "removed": [[mode, dict(evo)] for mode, evo in removed]}
+
+    added, removed = multiset_changes([tuple(entry) for entry in old["learnset"]], [tuple(entry) for entry in new["learnset"]])
+    if added or removed:
+        changes["learnset"] = {"added": [list(entry) for entry in added], "removed": [list(entry) for entry in removed]}
+    return changes
+
+def diff_snapshots(old_snapshot: dict, new_snapshot: dict):
+    """Compares two snapshots in one pass over the new one, joining each Pokemon to the old one by page name."""
+    old_pokemon = old_snapshot["pokemon"]
+    diff = {"added": [], "removed": [], "changed": {}}
+    for slug, new in new_snapshot["pokemon"].items():
+        old = old_pokemon.get(slug)
+        if old is None:
+            diff["added"].append(new["name"])
+            continue
+        changes = diff_pokemon(old, new)
+        if changes:
+            diff["changed"][new["name"]] = changes
+    diff["removed"] = [old["name"] for slug, old in old_pokemon.items() if slug not in new_snapshot["pokemon"]]
+    return diff
+
+def diff_modes(snapshot: dict):
+    """Compares Faithful and Polished for every Pokemon in one snapshot. Polished is treated as the new side."""
+    diff = {}
+    for pokemon in snapshot["pokemon"].values():
+        changes = {}
+        for key in ("types", "abilities"):
+            change = changed_list(pokemon[MODES[0]][key], pokemon[MODES[1]][key])
+            if change:
+                changes[key] = change
+        stats = changed_stats(pokemon[MODES[0]]["stats"], pokemon[MODES[1]]["stats"])
+        if stats:
+            changes["stats"] = stats
+
+        # Both ROM entries are the same on each side, so only the single ROM entries can differ.
+        evolutions = {mode: [evo for evolution_mode, evo in pokemon["evolutions"] if evolution_mode == mode] for mode in MODES}
+        if evolutions[MODES[0]] != evolutions[MODES[1]] and evolutions[MODES[1]]:
+            changes["evolutions"] = {"old": evolutions[MODES[0]], "new": evolutions[MODES[1]]}
+
+        learnset = {mode: [entry[:4] for entry in pokemon["learnset"] if entry[4] == mode and entry[1] not in POLISHED_ONLY_METHODS] for mode in MODES}
+        if learnset[MODES[0]] or learnset[MODES[1]]:
+            changes["learnset"] = {"added": learnset[MODES[1]], "removed": learnset[MODES[0]]}
+
+        if changes:
+            diff[pokemon["name"]] = changes
+    return diff
+
+def format_learnset_entry(entry: list):
+    """Formats a learnset entry like the learnset pages, with the ROM if it's only in one. Ex - Level 9 Magical Leaf (Polished)."""
+    move, method, level, detail = entry[:4]
+    rom = f""" ({entry[4]})""" if len(entry) > 4 and entry[4] != BOTH else ""
+    if method == "level":
+        return f"""Level {level} {move}{rom}"""
+    if method == "egg":
+        return f"""{move} (Egg Move){rom}"""
+    if method == "evolution":
+        return f"""{move} (Evolve){rom}"""
+    return f"""{move} ({detail}){rom}"""
+
+def format_evolution(evo: dict):
+    """Formats an evolution. Ex - Vaporeon (Evolve Item, Water Stone)."""
+    details = ", ".join(str(value) for key, value in evo.items() if key != "evolution")
+    return f"""{evo.get("evolution", "-")} ({details})"""
+
+def format_changes(changes: dict):
+    """Formats one Pokemon's changes as Markdown list items."""
+    lines = []
+    for mode in MODES:
+        for key, change in changes.get(mode, {}).items():
+            lines.append(format_change(f"""{mode} {key}""", key, change))
+    for key in ("types", "abilities", "stats"):
+        if key in changes:
+            lines.append(format_change(key.title(), key, changes[key]))
+
+    evolutions = changes.get("evolutions", {})
+    if "old" in evolutions:
+        lines.append(f"""- Evolutions: {", ".join(map(format_evolution, evolutions["old"])) or "-"} → {", ".join(map(format_evolution, evolutions["new"])) or "-"}""")
+    for mode, evo in evolutions.get("added", []):
+        lines.append(f"""- Evolution added: {format_evolution(evo)}{"" if mode == BOTH else f" ({mode})"}""")
+    for mode, evo in evolutions.get("removed", []):
+        lines.append(f"""- Evolution removed: {format_evolution(evo)}{"" if mode == BOTH else f" ({mode})"}""")
+
+    learnset = changes.get("learnset", {})
+    if learnset.get("added"):
+        lines.append(f"""- Learnset added: {", ".join(map(format_learnset_entry, learnset["added"]))}""")
+    if learnset.get("removed"):
+        lines.append(f"""- Learnset removed: {", ".join(map(format_learnset_entry, learnset["removed"]))}""")
+    return lines
+
+def format_change(title: str, key: str, change: dict):
+    """Formats a types, abilities, or stats change as a Markdown list item."""
+    if key == "stats":
+        return f"""- {title}: {", ".join(f"{stat} {values['old']} → {values['new']}" for stat, values in change.items())}"""
+    return f"""- {title}: {", ".join(change["old"]) or "-"} → {", ".join(change["new"]) or "-"}"""
+
+def format_diff(diff: dict, title: str):
+    """Formats a diff as a Markdown page."""
+    lines = [f"""## {title}""", ""]
+    changed = diff["changed"] if "changed" in diff else diff
+    for heading, names in (("Added Pokemon", diff.get("added")), ("Removed Pokemon", diff.get("removed"))):
+        if names:
+            lines += [f"""### {heading}""", ""] + [f"""- {name}""" for name in names] + [""]
+    for name, changes in changed.items():
+        lines += [f"""### {name}""", ""] + format_changes(changes) + [""]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares snapshots written with generate_wiki_pages.py --snapshot.")
+    parser.add_argument("snapshots", nargs="+", help="Two snapshots to compare old to new, or one with --modes.")
+    parser.add_argument("--modes", action="store_true", help="Compare Faithful to Polished in a single snapshot instead.")
+    parser.add_argument("--json", action="store_true", help="Print the differences as JSON instead of Markdown.")
+    args = parser.parse_args(argv)
+
+    if args.modes:
+        if len(args.snapshots) != 1:
+            parser.error("--modes takes one snapshot")
+        diff = diff_modes(load_snapshot(args.snapshots[0]))
+        title = "Faithful vs Polished Changes"
+    else:
+        if len(args.snapshots) != 2:
+            parser.error("give an old and a new snapshot")
+        diff = diff_snapshots(load_snapshot(args.snapshots[0]), load_snapshot(args.snapshots[1]))
+        title = "Changes"
+
+    print(json.dumps(diff, indent=2) if args.json else format_diff(diff, title))
+
+
+if __name__ == "__main__":
+    main()
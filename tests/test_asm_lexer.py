@@ -0,0 +1,105 @@
+import unittest
+
+from asm_lexer import FAITHFUL_SYMBOLS, POLISHED_SYMBOLS, ConditionError, evaluate_condition, preprocess, tokenize
+
+def assembled(contents: str):
+    """Gets the names of the db operands assembled in Faithful and in Polished."""
+    faithful, polished = [], []
+    for token, in_faithful, in_polished in preprocess(tokenize(contents)):
+        if token.name != "db":
+            continue
+        if in_faithful:
+            faithful.append(token.operands[0])
+        if in_polished:
+            polished.append(token.operands[0])
+    return faithful, polished
+
+class EvaluateConditionTest(unittest.TestCase):
+    def test_def(self):
+        self.assertTrue(evaluate_condition("DEF(FAITHFUL)", FAITHFUL_SYMBOLS))
+        self.assertFalse(evaluate_condition("DEF(FAITHFUL)", POLISHED_SYMBOLS))
+        self.assertTrue(evaluate_condition("DEF( FAITHFUL )", FAITHFUL_SYMBOLS))
+
+    def test_not(self):
+        self.assertFalse(evaluate_condition("!DEF(FAITHFUL)", FAITHFUL_SYMBOLS))
+        self.assertTrue(evaluate_condition("!DEF(FAITHFUL)", POLISHED_SYMBOLS))
+        self.assertTrue(evaluate_condition("!!DEF(FAITHFUL)", FAITHFUL_SYMBOLS))
+
+    def test_and_or(self):
+        symbols = frozenset({"FAITHFUL", "DEBUG"})
+        self.assertTrue(evaluate_condition("DEF(FAITHFUL) && DEF(DEBUG)", symbols))
+        self.assertFalse(evaluate_condition("DEF(FAITHFUL) && DEF(HARD)", symbols))
+        self.assertTrue(evaluate_condition("DEF(HARD) || DEF(DEBUG)", symbols))
+        self.assertFalse(evaluate_condition("DEF(HARD) || DEF(EASY)", symbols))
+
+    def test_and_binds_tighter_than_or(self):
+        symbols = frozenset({"FAITHFUL"})
+        self.assertTrue(evaluate_condition("DEF(FAITHFUL) || DEF(HARD) && DEF(EASY)", symbols))
+        self.assertFalse(evaluate_condition("(DEF(FAITHFUL) || DEF(HARD)) && DEF(EASY)", symbols))
+        self.assertTrue(evaluate_condition("!DEF(HARD) && (DEF(EASY) || DEF(FAITHFUL))", symbols))
+
+    def test_numbers(self):
+        self.assertTrue(evaluate_condition("1", POLISHED_SYMBOLS))
+        self.assertFalse(evaluate_condition("0", POLISHED_SYMBOLS))
+        self.assertTrue(evaluate_condition("0 || !0", POLISHED_SYMBOLS))
+
+    def test_bad_conditions(self):
+        for condition in ("", "DEF(FAITHFUL", "(DEF(FAITHFUL)", "DEF(FAITHFUL))", "DEF(FAITHFUL) &&", "FAITHFUL", "DEF(FAITHFUL) == 1"):
+            with self.subTest(condition=condition), self.assertRaises(ConditionError):
+                evaluate_condition(condition, FAITHFUL_SYMBOLS)
+
+class PreprocessTest(unittest.TestCase):
+    def test_unconditional_lines_are_in_both(self):
+        self.assertEqual(assembled("Label:\n\tdb A\n\tdb B\n"), (["A", "B"], ["A", "B"]))
+
+    def test_if_else(self):
+        contents = "\tdb A\nif DEF(FAITHFUL)\n\tdb B\nelse\n\tdb C\nendc\n\tdb D\n"
+        self.assertEqual(assembled(contents), (["A", "B", "D"], ["A", "C", "D"]))
+
+    def test_elif_after_a_taken_branch_is_skipped(self):
+        contents = "if DEF(FAITHFUL)\n\tdb A\nelif !DEF(FAITHFUL)\n\tdb B\nelif 1\n\tdb C\nelse\n\tdb D\nendc\n"
+        self.assertEqual(assembled(contents), (["A"], ["B"]))
+
+    def test_else_after_no_branch_taken(self):
+        contents = "if DEF(HARD)\n\tdb A\nelif DEF(EASY)\n\tdb B\nelse\n\tdb C\nendc\n"
+        self.assertEqual(assembled(contents), (["C"], ["C"]))
+
+    def test_nested(self):
+        contents = (
+            "if DEF(FAITHFUL)\n"
+            "\tdb A\n"
+            "\tif 0\n"
+            "\t\tdb B\n"
+            "\telse\n"
+            "\t\tdb C\n"
+            "\tendc\n"
+            "else\n"
+            "\tif !DEF(FAITHFUL)\n"
+            "\t\tdb D\n"
+            "\telif 1\n"
+            "\t\tdb E\n"
+            "\tendc\n"
+            "endc\n"
+            "\tdb F\n"
+        )
+        self.assertEqual(assembled(contents), (["A", "C", "F"], ["D", "F"]))
+
+    def test_inner_branch_of_an_inactive_outer_branch_stays_inactive(self):
+        contents = "if DEF(HARD)\nif 1\n\tdb A\nelse\n\tdb B\nendc\nendc\n"
+        self.assertEqual(assembled(contents), ([], []))
+
+    def test_unmatched_endc(self):
+        with self.assertRaisesRegex(ConditionError, "Line 2: endc without a matching if"):
+            assembled("\tdb A\nendc\n")
+
+    def test_unmatched_else_and_elif(self):
+        for directive in ("else", "elif 1"):
+            with self.subTest(directive=directive), self.assertRaises(ConditionError):
+                assembled(f"""if 1\n\tdb A\nendc\n{directive}\n""")
+
+    def test_missing_endc(self):
+        with self.assertRaisesRegex(ConditionError, "if without a matching endc"):
+            assembled("if DEF(FAITHFUL)\n\tdb A\n")
+
+if __name__ == "__main__":
+    unittest.main()
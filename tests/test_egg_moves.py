@@ -0,0 +1,71 @@
+import unittest
+
+from array import array
+
+from generate_wiki_pages import EvolutionGraph, PokemonRecord, propagate_egg_moves
+
+def pokemon(evo_attacks_name: str, egg_moves=(), evolutions=()):
+    """Makes a record with just what egg move propagation looks at. Evolutions are (evolution, form) pairs."""
+    return PokemonRecord(
+        name=evo_attacks_name,
+        evo_attacks_name=evo_attacks_name,
+        egg_moves=array("H", egg_moves),
+        evo_data_faithful=[{"evolution": evolution, "form": form} if form else {"evolution": evolution} for evolution, form in evolutions],
+    )
+
+def propagate(pokemon_data_list: list):
+    propagate_egg_moves(pokemon_data_list, EvolutionGraph(pokemon_data_list))
+    return [list(pokemon_data.egg_moves) for pokemon_data in pokemon_data_list]
+
+class PropagateEggMovesTest(unittest.TestCase):
+    def test_carries_egg_moves_down_the_whole_family(self):
+        egg_moves = propagate([
+            pokemon("Bulbasaur", [1, 2], [("Ivysaur", None)]),
+            pokemon("Ivysaur", [], [("Venusaur", None)]),
+            pokemon("Venusaur"),
+        ])
+        self.assertEqual(egg_moves, [[1, 2], [1, 2], [1, 2]])
+
+    def test_pre_evolution_egg_moves_win_over_the_evolutions_own(self):
+        self.assertEqual(propagate([pokemon("Pichu", [1]), pokemon("Pikachu", [2])]), [[1], [2]])
+        self.assertEqual(propagate([pokemon("Pichu", [1], [("Pikachu", None)]), pokemon("Pikachu", [2])]), [[1], [1]])
+
+    def test_pre_evolution_without_egg_moves_keeps_the_evolutions_own(self):
+        self.assertEqual(propagate([pokemon("Pichu", [], [("Pikachu", None)]), pokemon("Pikachu", [2])]), [[], [2]])
+
+    def test_each_form_gets_the_egg_moves_of_the_same_form(self):
+        egg_moves = propagate([
+            pokemon("RattataPlain", [1], [("Raticate", "Plain Form")]),
+            pokemon("RattataAlolan", [2], [("Raticate", "Alolan Form")]),
+            pokemon("RaticatePlain"),
+            pokemon("RaticateAlolan"),
+        ])
+        self.assertEqual(egg_moves, [[1], [2], [1], [2]])
+
+    def test_exact_form_wins_over_an_evolution_without_a_form(self):
+        # The plain form evolves into every Raticate, the Alolan form only into its own.
+        egg_moves = propagate([
+            pokemon("RattataPlain", [1], [("Raticate", None)]),
+            pokemon("RattataAlolan", [2], [("Raticate", "Alolan Form")]),
+            pokemon("RaticatePlain"),
+            pokemon("RaticateAlolan"),
+        ])
+        self.assertEqual(egg_moves, [[1], [2], [1], [2]])
+
+    def test_last_pre_evolution_in_dex_order_wins_without_a_form_match(self):
+        egg_moves = propagate([
+            pokemon("Azurill", [1], [("Marill", None)]),
+            pokemon("Wooper", [2], [("Marill", None)]),
+            pokemon("Marill"),
+        ])
+        self.assertEqual(egg_moves[2], [2])
+
+    def test_evolutions_get_their_own_copy(self):
+        pokemon_data_list = [pokemon("Eevee", [1], [("Vaporeon", None), ("Jolteon", None)]), pokemon("Vaporeon"), pokemon("Jolteon")]
+        propagate(pokemon_data_list)
+        pokemon_data_list[1].egg_moves.append(2)
+        self.assertEqual(list(pokemon_data_list[2].egg_moves), [1])
+        self.assertEqual(list(pokemon_data_list[0].egg_moves), [1])
+
+if __name__ == "__main__":
+    unittest.main()
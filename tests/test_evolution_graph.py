@@ -0,0 +1,74 @@
+import unittest
+
+from generate_wiki_pages import EvolutionGraph, PokemonStub, evolution_key, name_prefixes
+
+def pokemon(evo_attacks_name: str, faithful=(), polished=()):
+    """Makes a stub with just what the evolution graph looks at. Evolutions are (evolution, form) pairs."""
+    def evolutions(pairs):
+        return [{"evolution": evolution, "form": form} if form else {"evolution": evolution} for evolution, form in pairs]
+    return PokemonStub(evo_attacks_name, evo_attacks_name, "", evo_attacks_name, evolutions(faithful), evolutions(polished))
+
+class EvolutionKeyTest(unittest.TestCase):
+    def test_form_is_added_to_the_name(self):
+        self.assertEqual(evolution_key({"evolution": "Raticate", "form": "Alolan Form"}), "RaticateAlolan")
+        self.assertEqual(evolution_key({"evolution": "Mr Mime"}), "MrMime")
+
+    def test_name_prefixes(self):
+        self.assertEqual(name_prefixes("MrMimePlain"), ["Mr", "MrMime", "MrMimePlain"])
+        self.assertEqual(name_prefixes("Eevee"), ["Eevee"])
+
+class EvolutionGraphTest(unittest.TestCase):
+    def test_links_both_roms_once(self):
+        graph = EvolutionGraph([
+            pokemon("Eevee", [("Vaporeon", None), ("Vaporeon", None)], [("Vaporeon", None), ("Sylveon", None)]),
+            pokemon("Vaporeon"),
+            pokemon("Sylveon"),
+        ])
+        self.assertEqual(graph.evolutions, [[1, 2], [], []])
+        self.assertEqual(graph.pre_evolutions, [[], [0], [0]])
+
+    def test_evolution_without_a_form_links_every_form(self):
+        graph = EvolutionGraph([pokemon("RattataPlain", [("Raticate", None)]), pokemon("RaticatePlain"), pokemon("RaticateAlolan")])
+        self.assertEqual(graph.evolutions[0], [1, 2])
+        self.assertEqual(graph.form_links, set())
+
+    def test_evolution_with_a_form_links_only_that_form(self):
+        graph = EvolutionGraph([pokemon("RattataAlolan", [("Raticate", "Alolan Form")]), pokemon("RaticatePlain"), pokemon("RaticateAlolan")])
+        self.assertEqual(graph.evolutions[0], [2])
+        self.assertEqual(graph.form_links, {(0, 2)})
+
+    def test_exact_name_wins_over_prefixes(self):
+        graph = EvolutionGraph([pokemon("Pichu", [("Pikachu", None)]), pokemon("Pikachu"), pokemon("PikachuCosplay")])
+        self.assertEqual(graph.evolutions[0], [1])
+
+    def test_unknown_evolutions_are_ignored(self):
+        graph = EvolutionGraph([pokemon("Pichu", [("Missingno", None)])])
+        self.assertEqual(graph.evolutions, [[]])
+
+    def test_with_pre_evolutions(self):
+        graph = EvolutionGraph([
+            pokemon("Venusaur"),
+            pokemon("Ivysaur", [("Venusaur", None)]),
+            pokemon("Bulbasaur", [("Ivysaur", None)]),
+            pokemon("Pidgey"),
+        ])
+        self.assertEqual(graph.with_pre_evolutions([0]), {0, 1, 2})
+        self.assertEqual(graph.with_pre_evolutions([1, 3]), {1, 2, 3})
+        self.assertEqual(graph.family_roots(0), [2])
+
+    def test_topological_order_puts_pre_evolutions_first(self):
+        graph = EvolutionGraph([
+            pokemon("Venusaur"),
+            pokemon("Pidgey"),
+            pokemon("Ivysaur", [("Venusaur", None)]),
+            pokemon("Bulbasaur", [("Ivysaur", None)]),
+        ])
+        self.assertEqual(graph.topological_order(), [1, 3, 2, 0])
+
+    def test_topological_order_keeps_every_pokemon_in_a_loop(self):
+        graph = EvolutionGraph([pokemon("Ditto", [("Mew", None)]), pokemon("Mew", [("Ditto", None)]), pokemon("Pidgey")])
+        self.assertEqual(sorted(graph.topological_order()), [0, 1, 2])
+        self.assertEqual(graph.topological_order()[0], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import tempfile
+import unittest
+
+from generate_wiki_pages import PARSE_COUNTS, BlockCache, LabelTable, has_egg_moves, index_label_blocks, parse_egg_moves
+
+EGG_MOVES = b"""EggMovePointers::
+
+ChikoritaEggMoves:
+\tdb VINE_WHIP
+\tdb LEECH_SEED
+\tdb $ff
+
+PidgeyEggMoves:
+\tdb PURSUIT ; comment
+\tdb $ff
+
+EmptyEggMoves:
+\tdb $ff
+
+NoEggMoves:
+\tdb $ff
+
+AfterEggMoves:
+\tdb TACKLE
+\tdb $ff
+"""
+
+class IndexLabelBlocksTest(unittest.TestCase):
+    def test_blocks_run_to_the_next_label(self):
+        index = index_label_blocks(EGG_MOVES, "EggMoves", "NoEggMoves")
+        self.assertEqual(list(index), ["Chikorita", "Pidgey", "Empty"])
+        start, end = index["Chikorita"]
+        self.assertEqual(EGG_MOVES[start:end], b"ChikoritaEggMoves:\n\tdb VINE_WHIP\n\tdb LEECH_SEED\n\tdb $ff\n\n")
+
+    def test_last_block_ends_at_the_end_label(self):
+        start, end = index_label_blocks(EGG_MOVES, "EggMoves", "NoEggMoves")["Empty"]
+        self.assertEqual(EGG_MOVES[start:end], b"EmptyEggMoves:\n\tdb $ff\n\n")
+
+    def test_last_block_ends_at_the_end_of_the_file_without_an_end_label(self):
+        index = index_label_blocks(EGG_MOVES, "EggMoves", "MissingEggMoves")
+        self.assertEqual(list(index), ["Chikorita", "Pidgey", "Empty", "No", "After"])
+        self.assertEqual(index["After"][1], len(EGG_MOVES))
+
+    def test_indented_labels(self):
+        data = b"  FooEggMoves:\n\tdb A\n\tBarEggMoves:\n\tdb B\n"
+        bar_start = data.index(b"\tBar")
+        self.assertEqual(index_label_blocks(data, "EggMoves", "NoEggMoves"), {"Foo": (0, bar_start), "Bar": (bar_start, len(data))})
+
+class LabelTableTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.filename = os.path.join(self.temp_dir, "egg_moves.asm")
+        self.write(EGG_MOVES)
+
+    def write(self, contents: bytes):
+        with open(self.filename, 'wb') as file:
+            file.write(contents)
+
+    def open_table(self, parse_cache_dir=None):
+        table = LabelTable(parse_cache_dir, parse_egg_moves, self.filename, "EggMoves", "NoEggMoves")
+        self.addCleanup(table.save if parse_cache_dir else lambda: None)
+        return table
+
+    def cache_hits(self):
+        return PARSE_COUNTS["parse_egg_moves"]["cache_hits"]
+
+    def test_mapping(self):
+        table = self.open_table()
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table), ["Chikorita", "Pidgey", "Empty"])
+        self.assertIn("Pidgey", table)
+        self.assertNotIn("After", table)
+        self.assertEqual(table["Chikorita"], ["Vine Whip", "Leech Seed"])
+        self.assertEqual(table.parse_block("Pidgey"), ["Pursuit"])
+        self.assertEqual(table["Empty"], [])
+
+    def test_blocks_are_cached_by_contents(self):
+        table = self.open_table(self.cache_dir)
+        self.assertEqual(table.parse_block("Chikorita"), ["Vine Whip", "Leech Seed"])
+        table.save()
+
+        cache_hits = self.cache_hits()
+        self.assertEqual(self.open_table(self.cache_dir).parse_block("Chikorita"), ["Vine Whip", "Leech Seed"])
+        self.assertEqual(self.cache_hits(), cache_hits + 1)
+
+    def test_save_drops_blocks_no_copy_of_the_file_has(self):
+        table = self.open_table(self.cache_dir)
+        table.parse_block("Chikorita")
+        table.parse_block("Pidgey")
+        table.save()
+
+        self.write(EGG_MOVES.replace(b"PURSUIT", b"GUST"))
+        table = self.open_table(self.cache_dir)
+        table.parse_block("Pidgey")
+        table.save()
+
+        # The first Pidgey block is gone, the unchanged Chikorita block is kept.
+        block_cache = table.block_cache
+        self.addCleanup(block_cache.close)
+        saved = {block_hash for block_hash, in block_cache.connect().execute("SELECT hash FROM blocks")}
+        self.assertEqual(saved, {hashlib.sha256(table.block(name)).hexdigest() for name in ("Chikorita", "Pidgey")})
+
+    def test_blocks_of_other_copies_are_kept(self):
+        cache_file = os.path.join(self.cache_dir, "blocks.sqlite")
+        block_cache = BlockCache(cache_file)
+        self.addCleanup(block_cache.close)
+        block_cache.add("a", ["A"])
+        block_cache.add("b", ["B"])
+        block_cache.save("file@v1", "1", {"a", "b"})
+        block_cache.add("c", ["C"])
+        block_cache.save("file@v2", "2", {"b", "c"})
+        self.assertEqual([block_cache.get(block_hash) for block_hash in "abc"], [["A"], ["B"], ["C"]])
+
+        # v1 still has b after v2 drops it, and b goes once v1 drops it too.
+        block_cache.save("file@v2", "3", {"c"})
+        self.assertEqual([block_cache.get(block_hash) for block_hash in "abc"], [["A"], ["B"], ["C"]])
+        block_cache.save("file@v1", "4", {"a"})
+        self.assertEqual([block_cache.get(block_hash) for block_hash in "abc"], [["A"], None, ["C"]])
+        self.assertTrue(block_cache.has_file("file@v2", "3"))
+        self.assertFalse(block_cache.has_file("file@v2", "2"))
+
+    def test_has_egg_moves_reads_the_block_without_parsing_it(self):
+        table = self.open_table()
+        self.assertTrue(has_egg_moves(table, "Chikorita"))
+        self.assertTrue(has_egg_moves(table, "Pidgey"))
+        self.assertFalse(has_egg_moves(table, "Empty"))
+        self.assertFalse(has_egg_moves(table, "Missing"))
+        self.assertEqual(table.blocks, {})
+        self.assertEqual(has_egg_moves(parse_egg_moves(EGG_MOVES.decode()), "Empty"), has_egg_moves(table, "Empty"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import copy
+import os
+import tempfile
+import unittest
+
+import pokemon_snapshot
+
+from pokemon_snapshot import diff_modes, diff_pokemon, diff_snapshots, format_diff, load_snapshot, multiset_changes, save_snapshot
+
+STATS = {"HP": 45, "Atk": 49, "Def": 49, "SAt": 65, "SDf": 65, "Speed": 45}
+
+def pokemon(name: str = "Bulbasaur"):
+    """Makes a snapshot entry with the same data in both ROMs."""
+    mode_data = {"types": ["Grass", "Poison"], "abilities": ["Overgrow", "Chlorophyll"], "stats": dict(STATS)}
+    return {
+        "name": name,
+        "Faithful": copy.deepcopy(mode_data),
+        "Polished": copy.deepcopy(mode_data),
+        "evolutions": [["Both", {"evolution": "Ivysaur", "type": "Evolve Level", "method": 16}]],
+        "learnset": [["Tackle", "level", 1, "", "Both"], ["Growl", "level", 3, "", "Both"], ["Cut", "hm", "", "HM01", "Polished"]],
+    }
+
+def snapshot(*pokemon_list):
+    return {"version": pokemon_snapshot.SNAPSHOT_VERSION, "pokemon": {entry["name"]: entry for entry in pokemon_list}}
+
+class MultisetChangesTest(unittest.TestCase):
+    def test_counts_duplicates(self):
+        self.assertEqual(multiset_changes(["a", "b", "b"], ["b", "c", "c"]), (["c", "c"], ["a", "b"]))
+        self.assertEqual(multiset_changes(["a", "b"], ["b", "a"]), ([], []))
+
+class DiffPokemonTest(unittest.TestCase):
+    def test_unchanged(self):
+        self.assertEqual(diff_pokemon(pokemon(), pokemon()), {})
+
+    def test_only_changed_parts_are_listed(self):
+        new = pokemon()
+        new["Polished"]["types"] = ["Grass", "Fairy"]
+        new["Faithful"]["stats"]["Speed"] = 50
+        self.assertEqual(diff_pokemon(pokemon(), new), {
+            "Faithful": {"stats": {"Speed": {"old": 45, "new": 50}}},
+            "Polished": {"types": {"old": ["Grass", "Poison"], "new": ["Grass", "Fairy"]}},
+        })
+
+    def test_learnset_order_doesnt_matter(self):
+        new = pokemon()
+        new["learnset"].reverse()
+        self.assertEqual(diff_pokemon(pokemon(), new), {})
+
+    def test_learnset_and_evolution_changes(self):
+        new = pokemon()
+        new["learnset"][1] = ["Growl", "level", 4, "", "Both"]
+        new["evolutions"] = [["Polished", {"evolution": "Ivysaur", "type": "Evolve Level", "method": 18}]]
+        changes = diff_pokemon(pokemon(), new)
+        self.assertEqual(changes["learnset"], {"added": [["Growl", "level", 4, "", "Both"]], "removed": [["Growl", "level", 3, "", "Both"]]})
+        self.assertEqual(changes["evolutions"]["added"], [["Polished", {"evolution": "Ivysaur", "method": 18, "type": "Evolve Level"}]])
+        self.assertEqual(changes["evolutions"]["removed"], [["Both", {"evolution": "Ivysaur", "method": 16, "type": "Evolve Level"}]])
+
+class DiffSnapshotsTest(unittest.TestCase):
+    def test_added_removed_and_changed(self):
+        changed = pokemon("Ivysaur")
+        changed["Faithful"]["abilities"] = ["Overgrow"]
+        diff = diff_snapshots(snapshot(pokemon("Bulbasaur"), pokemon("Ivysaur"), pokemon("Pidgey")), snapshot(pokemon("Bulbasaur"), changed, pokemon("Chikorita")))
+        self.assertEqual(diff["added"], ["Chikorita"])
+        self.assertEqual(diff["removed"], ["Pidgey"])
+        self.assertEqual(list(diff["changed"]), ["Ivysaur"])
+
+        page = format_diff(diff, "Changes")
+        self.assertIn("### Added Pokemon\n\n- Chikorita", page)
+        self.assertIn("- Faithful abilities: Overgrow, Chlorophyll → Overgrow", page)
+
+    def test_diff_modes_skips_polished_only_learnsets(self):
+        entry = pokemon()
+        entry["Polished"]["stats"]["Atk"] = 52
+        entry["learnset"].append(["Razor Leaf", "level", 9, "", "Faithful"])
+        self.assertEqual(diff_modes(snapshot(entry)), {"Bulbasaur": {
+            "stats": {"Atk": {"old": 49, "new": 52}},
+            "learnset": {"added": [], "removed": [["Razor Leaf", "level", 9, ""]]},
+        }})
+
+class SaveSnapshotTest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_file = os.path.join(temp_dir, "snapshot.json.gz")
+            save_snapshot(snapshot_file, snapshot(pokemon()))
+            self.assertEqual(load_snapshot(snapshot_file), snapshot(pokemon()))
+
+    def test_other_versions_are_refused(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_file = os.path.join(temp_dir, "snapshot.json.gz")
+            save_snapshot(snapshot_file, {"version": pokemon_snapshot.SNAPSHOT_VERSION + 1, "pokemon": {}})
+            with self.assertRaises(SystemExit):
+                load_snapshot(snapshot_file)
+
+if __name__ == "__main__":
+    unittest.main()